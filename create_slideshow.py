@@ -12,8 +12,16 @@ from pathlib import Path
 import copy  # Added for deep copying slide data
 import shutil  # Added for copying image files
 
+from triangle_slideshow import kernels
 from triangle_slideshow.processor import process_images
-from triangle_slideshow.slideshow import Slideshow, save_slideshow, save_slideshow_split
+from triangle_slideshow.slideshow import (
+    Slideshow,
+    TransitionSink,
+    save_slideshow,
+    save_slideshow_split,
+)
+from triangle_slideshow.transition import COST_MATRIX_POOL, normalize_cost_weights
+from triangle_slideshow.transition_cache import TransitionCache
 
 
 def main():
@@ -53,8 +61,9 @@ def main():
         "--max-triangles",
         "-m",
         type=int,
-        default=5000,
-        help="Maximum number of triangles for transitions (default: 5000)",
+        default=None,
+        help="Maximum number of triangles for transitions (default: 5000, "
+        "or all with --transition-memory-budget)",
     )
 
     parser.add_argument(
@@ -71,6 +80,15 @@ def main():
         help="Disable round-robin transitions (last slide transitions back to first)",
     )
 
+    parser.add_argument(
+        "--order",
+        choices=["name", "optimal"],
+        default="name",
+        help="Slide order: by image filename, or 'optimal' to place similar "
+        "slides next to each other using cheap slide distance estimates "
+        "(default: name)",
+    )
+
     parser.add_argument(
         "--square-size",
         "-s",
@@ -94,6 +112,109 @@ def main():
         help="Copy original images to output directory (default: True)",
     )
 
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Number of processes for computing transitions in parallel (default: 1)",
+    )
+
+    parser.add_argument(
+        "--transition-cache",
+        help="Directory for caching computed transitions between builds (default: no cache)",
+    )
+
+    parser.add_argument(
+        "--transition-cache-size",
+        type=int,
+        default=512,
+        help="Size cap of the transition cache in MB; least recently used entries are evicted (default: 512)",
+    )
+
+    parser.add_argument(
+        "--transition-memory-budget",
+        type=int,
+        help="Memory per transition in MB; picks the dense, sparse or multilevel "
+        "solver to fit it and pairs every triangle, and --workers transitions may "
+        "use it at once (default: dense with --max-triangles)",
+    )
+
+    parser.add_argument(
+        "--cost-weight",
+        action="append",
+        metavar="TERM=WEIGHT",
+        help="Weight of a transition cost term (position, rgb, color, area, orientation); "
+        "repeat for several terms (default: position=1)",
+    )
+
+    parser.add_argument(
+        "--transition-deadline",
+        type=float,
+        help="Seconds each transition solve may take before it is abandoned and "
+        "solved greedily instead; such transitions are marked approximate in "
+        "the manifest (default: no limit)",
+    )
+
+    parser.add_argument(
+        "--refine-transitions",
+        type=float,
+        metavar="SECONDS",
+        help="Seconds to spend per transition improving the solved pairings by "
+        "swapping the targets of nearby pairs; useful with --fast-transitions, "
+        "--transition-memory-budget or --transition-deadline (default: no refinement)",
+    )
+
+    parser.add_argument(
+        "--bidirectional",
+        action="store_true",
+        help="Also create the reverse of every transition for backward navigation "
+        "(derived from the forward pairings, no extra solving)",
+    )
+
+    parser.add_argument(
+        "--canonical",
+        action="store_true",
+        help="Reorder all slides to a shared triangle index so any slide morphs "
+        "into any other without transition files (uses all triangles)",
+    )
+
+    parser.add_argument(
+        "--stream-transitions",
+        action="store_true",
+        help="Write each transition file as soon as it is solved and keep only "
+        "a small descriptor in memory (split output only)",
+    )
+
+    parser.add_argument(
+        "--no-dummy-triangles",
+        action="store_true",
+        help="Keep each slide's own triangle count and let surplus triangles "
+        "fade out or spawn from their nearest partner (ignored with --canonical)",
+    )
+
+    parser.add_argument(
+        "--fast-transitions",
+        action="store_true",
+        help="Pair triangles greedily by nearest centroids instead of solving "
+        "exactly; much faster but longer paths, for previews",
+    )
+
+    parser.add_argument(
+        "--estimate-gap",
+        action="store_true",
+        help="Estimate a lower bound and optimality gap for transitions whose "
+        "solver proves none (greedy, partitioned or multilevel); loose, and adds "
+        "about 0.3 s per 20k-triangle transition",
+    )
+
+    parser.add_argument(
+        "--compare-exact",
+        action="store_true",
+        help="With --fast-transitions, also solve every transition exactly and "
+        "print the total distance ratio",
+    )
+
     args = parser.parse_args()
 
     # Process input args
@@ -117,16 +238,60 @@ def main():
     # Parse extensions
     extensions = args.extensions.split(",")
 
+    # A memory budget replaces the default triangle cap: all triangles are paired
+    memory_budget = None
+    max_triangles = args.max_triangles
+    if args.transition_memory_budget:
+        memory_budget = args.transition_memory_budget * 1024 * 1024
+    elif max_triangles is None:
+        max_triangles = 5000
+    # Each worker may use the per-transition budget, so the pool admits
+    # running transitions against the sum
+    pool_memory_budget = None
+    if memory_budget is not None:
+        pool_memory_budget = memory_budget * max(args.workers, 1)
+
     print(f"Processing images from {input_dir}")
     print(f"Output directory: {output_dir}")
     print(f"Output slideshow: {output_file}")
     print(f"Using {args.points} points for triangulation")
-    print(f"Max triangles for transitions: {args.max_triangles}")
+    print(f"Max triangles for transitions: {max_triangles or 'all'}")
+    print(f"Transition kernels: {kernels.get_backend()}")
+    if memory_budget is not None:
+        print(
+            f"Selecting transition solvers for a budget of "
+            f"{args.transition_memory_budget} MB per transition"
+        )
+    if args.fast_transitions:
+        print("Using greedy nearest-neighbour transitions (fast preview)")
+    if args.workers > 1:
+        print(f"Computing transitions with {args.workers} worker processes")
+    if args.transition_cache:
+        print(f"Caching transitions in {args.transition_cache}")
     print(f"Cropping images to {sq_size}x{sq_size} squares")
     if args.copy_images:
         print("Will copy original images to output directory")
     if args.split:
         print("Will split slideshow into individual files")
+        if args.stream_transitions and not args.canonical:
+            print("Writing transition files as soon as they are solved")
+    if args.canonical:
+        print("Using canonical triangle order, no transition files")
+    if args.transition_deadline is not None:
+        print(
+            f"Falling back to greedy transitions after {args.transition_deadline:g} s"
+        )
+    if args.refine_transitions:
+        print(
+            f"Refining transitions by swapping pairs for up to "
+            f"{args.refine_transitions:g} s each"
+        )
+    if args.no_dummy_triangles and not args.canonical:
+        print("Fading unmatched triangles instead of adding dummy triangles")
+    if args.bidirectional:
+        print("Adding reverse transitions for backward navigation")
+    if args.order == "optimal":
+        print("Ordering slides by estimated transition distance")
     if args.round_robin:
         print("Using round-robin transitions")
     else:
@@ -181,7 +346,47 @@ def main():
                 print(f"Warning: Could not find original image for {filename}")
 
     # Create slideshow
-    slideshow = Slideshow()
+    transition_options = {}
+    cache = None
+    if args.transition_cache:
+        cache = TransitionCache(
+            args.transition_cache, max_bytes=args.transition_cache_size * 1024 * 1024
+        )
+        transition_options["cache"] = cache
+    if args.cost_weight:
+        cost_weights = {}
+        for item in args.cost_weight:
+            term, _, weight = item.partition("=")
+            try:
+                cost_weights[term.strip()] = float(weight)
+            except ValueError:
+                print(f"Error: Invalid cost weight '{item}', expected TERM=WEIGHT")
+                return 1
+        try:
+            normalize_cost_weights(cost_weights)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        transition_options["cost_weights"] = cost_weights
+        print(f"Using transition cost weights: {cost_weights}")
+    if memory_budget is not None:
+        transition_options["solver"] = "auto"
+        transition_options["memory_budget"] = memory_budget
+    if args.fast_transitions:
+        transition_options["solver"] = "greedy"
+    if args.transition_deadline is not None:
+        transition_options["deadline"] = args.transition_deadline
+    if args.refine_transitions:
+        transition_options["refine"] = args.refine_transitions
+    if args.estimate_gap:
+        transition_options["estimate_bound"] = True
+    anchor = args.no_dummy_triangles and not args.canonical
+    if anchor:
+        transition_options["anchor"] = True
+    sink = None
+    if args.stream_transitions and args.split and not args.canonical:
+        sink = TransitionSink(output_file.parent)
+    slideshow = Slideshow(transition_options=transition_options, transition_sink=sink)
 
     # Create and add the initial black slide
     try:
@@ -276,8 +481,13 @@ def main():
 
     print(f"Created slideshow with {len(slideshow.slides)} slides")
 
+    if args.order == "optimal":
+        # The first slide (the black intro slide) keeps opening the slideshow
+        slideshow.optimize_order(start=0, cycle=args.round_robin)
+        print("Slide order: " + ", ".join(slide["name"] for slide in slideshow.slides))
+
     # Standardize triangle counts across all slides
-    dummy_count = slideshow.standardize_triangle_counts()
+    dummy_count = 0 if anchor else slideshow.standardize_triangle_counts()
     if dummy_count > 0:
         print(
             f"Added {dummy_count} dummy triangles to standardize slide triangle counts"
@@ -287,19 +497,69 @@ def main():
     print("Creating transitions between slides...")
     transition_count = 0
 
-    if args.round_robin:
+    if args.canonical:
+        # Solve a chain of transitions once and store none of them
+        reordered = slideshow.canonicalize(
+            workers=args.workers, memory_budget=pool_memory_budget
+        )
+        print(f"Reordered {reordered} slides to a shared triangle index")
+    elif args.round_robin:
         # Use round-robin transitions (including from last to first)
         transition_count = slideshow.round_robin_transitions(
-            max_triangles=args.max_triangles
+            max_triangles=max_triangles,
+            workers=args.workers,
+            memory_budget=pool_memory_budget,
+            bidirectional=args.bidirectional,
         )
     else:
         # Use sequential transitions (default)
         transition_count = slideshow.auto_create_transitions(
-            max_triangles=args.max_triangles,
+            max_triangles=max_triangles,
             sequential_only=True,  # Always use sequential mode
+            workers=args.workers,
+            memory_budget=pool_memory_budget,
+            bidirectional=args.bidirectional,
         )
 
     print(f"Created {transition_count} transitions")
+    approximate = [t for t in slideshow.transitions if t.get("approximate")]
+    if approximate:
+        print(
+            f"{len(approximate)} transitions missed the deadline and are approximate: "
+            + ", ".join(f"{t['from']}->{t['to']}" for t in approximate)
+        )
+    quality = slideshow.quality_summary()
+    if quality:
+        from_index, to_index, worst_gap = quality["worst_gap"]
+        print(
+            f"Transition quality of {quality['transitions']} transitions: "
+            f"total cost {quality['cost']:.0f}, "
+            f"lower bound {quality['lower_bound']:.0f} "
+            f"(gap at most {quality['gap']:.1%}, worst {worst_gap:.1%} "
+            f"for {from_index}->{to_index}), "
+            f"solved in {quality['seconds']:.1f} s"
+        )
+    if args.fast_transitions and args.compare_exact:
+        print("Solving transitions exactly for comparison...")
+        ratio = slideshow.transition_distance_ratio(
+            max_triangles, "auto" if memory_budget is not None else "hungarian"
+        )
+        print(f"Greedy total distance is {ratio:.3f}x the exact solution")
+    pool_stats = COST_MATRIX_POOL.stats()
+    peak_bytes = max(pool_stats["peak_bytes"], slideshow.worker_cost_matrix_peak_bytes)
+    if peak_bytes:
+        print(
+            f"Cost matrix buffers: {pool_stats['allocations']} allocations, "
+            f"{pool_stats['reuses']} reuses in this process, "
+            f"peak {peak_bytes / (1024 * 1024):.1f} MB per process"
+        )
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"Transition cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['entries']} entries "
+            f"({stats['bytes'] / (1024 * 1024):.1f} MB)"
+        )
 
     # Save slideshow
     if args.split:
@@ -11,6 +11,7 @@ import {
   loadSlideshowManifest,
   loadSlide,
   loadTransition,
+  canonicalTransition,
 } from "../utils/slideshow-data";
 
 const TRANSITION_DURATION = 5; // seconds
@@ -203,7 +204,10 @@ export default function Slideshow({ onDominantColorsChange }: SlideshowDisplayPr
     }
 
     const transitionKey = `${currentIdx}_to_${targetSlideIdx}`;
-    const transition = loadedTransitionsRef.current.get(transitionKey);
+    let transition = loadedTransitionsRef.current.get(transitionKey);
+    if (!transition && manifestRef.current?.canonical) {
+      transition = canonicalTransition(currentIdx, targetSlideIdx, targetSlide.triangles.length);
+    }
 
     if (transition) {
       animateTransition(transition, currentSlide, targetSlide);
@@ -524,17 +528,26 @@ export default function Slideshow({ onDominantColorsChange }: SlideshowDisplayPr
     transition.pairings.forEach((pairing: Pairing, idx: number) => {
       const toTriangle = toSlide.triangles[pairing.to_index];
       // Select triangle by ID instead of by DOM order
-      const triangleElement = svg.querySelector(
+      const sourceElement = svg.querySelector(
         `#triangle-${pairing.from_index}`
       );
 
-      if (!triangleElement) {
+      if (!sourceElement) {
         console.warn(`Triangle element not found for pairing ${idx}:`, pairing);
         return;
       }
 
+      // A spawned triangle starts as an invisible copy of its anchor
+      let triangleElement = sourceElement;
+      if (pairing.type === "spawn") {
+        triangleElement = sourceElement.cloneNode() as Element;
+        triangleElement.removeAttribute("id");
+        gsap.set(triangleElement, { fill: rgbToString(toTriangle.color, 0) });
+        svg.appendChild(triangleElement);
+      }
+
       // Check if the destination triangle has opacity 0
-      const toOpacity = toTriangle.opacity ?? 1;
+      const toOpacity = pairing.type === "fade" ? 0 : toTriangle.opacity ?? 1;
 
       // Calculate target points for the triangle
       const targetPoints = toTriangle.coordinates
@@ -558,7 +571,23 @@ export default function Slideshow({ onDominantColorsChange }: SlideshowDisplayPr
       const delay = (avgY / maxY) * MAX_TRIANGLE_DELAY;
 
       // Add to timeline - handle triangles with opacity 0 differently
-      if (toOpacity === 0) {
+      if (pairing.type === "fade") {
+        // Shrink into the anchor triangle while fading out, then drop it
+        tl.to(
+          triangleElement,
+          {
+            attr: { points: targetPoints },
+            fill: targetColor,
+            duration: TRANSITION_DURATION,
+            ease: "power2.inOut",
+            delay: delay,
+            onComplete: () => {
+              triangleElement.remove();
+            },
+          },
+          0
+        );
+      } else if (toOpacity === 0) {
         // For triangles that should become invisible, only transition the opacity
         tl.to(
           triangleElement,
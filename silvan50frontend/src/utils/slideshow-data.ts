@@ -14,6 +14,10 @@ export interface Pairing {
   from_index: number;
   to_index: number;
   distance: number;
+  // Set for triangles without partner when slides differ in triangle count:
+  // "fade" shrinks the source triangle into the target triangle to_index and
+  // fades it out, "spawn" grows target triangle to_index out of from_index
+  type?: "fade" | "spawn";
 }
 
 export interface Transition {
@@ -25,6 +29,9 @@ export interface Transition {
 export interface SlideTransition {
   to: number;
   filename: string;
+  // Set when the exact solve missed its deadline and a faster solver was used
+  approximate?: boolean;
+  cost?: number;
 }
 
 export interface ManifestSlide {
@@ -40,6 +47,8 @@ export interface ManifestSlide {
 export interface SlideshowManifest {
   total_slides: number;
   slides: ManifestSlide[];
+  // All slides share one triangle index: triangle i morphs into triangle i
+  canonical?: boolean;
 }
 
 export interface SlideshowData {
@@ -124,6 +133,14 @@ export async function loadTransition(filename: string): Promise<Transition> {
   }
 }
 
+// Transition between two slides of a canonical slideshow (no file needed)
+export function canonicalTransition(from: number, to: number, triangleCount: number): Transition {
+  const pairings: Pairing[] = [];
+  for (let i = 0; i < triangleCount; i++) {
+    pairings.push({ from_index: i, to_index: i, distance: 0 });
+  }
+  return { from, to, pairings };
+}
 
 // In a real implementation, we would load this data from the JSON file
 // For example:
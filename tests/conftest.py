@@ -23,3 +23,19 @@ def numpy_random_seed():
 
     np.random.seed(42)
     return 42
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def kernel_backend(request):
+    """
+    Fixture that runs a test once per kernel backend of the transition solvers.
+
+    The numba run is skipped when numba is not installed.
+    """
+    from triangle_slideshow import kernels
+
+    if request.param not in kernels.available_backends():
+        pytest.skip(f"Kernel backend '{request.param}' is not installed")
+    previous = kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
@@ -5,11 +5,13 @@ This module tests the integration of processor.py, slideshow.py, and transition.
 """
 
 import os
+import sys
 import tempfile
 import json
 from unittest.mock import patch, MagicMock
 import pytest
 
+import create_slideshow
 from triangle_slideshow.processor import process_image, process_images
 from triangle_slideshow.slideshow import Slideshow, save_slideshow, load_slideshow
 from triangle_slideshow.transition import create_transition
@@ -347,3 +349,39 @@ class TestEndToEnd:
                 # Clean up temp file
                 if os.path.exists(output_path):
                     os.remove(output_path)
+
+    @patch("builtins.print")
+    def test_cli_memory_budget_is_per_worker(self, mock_print):
+        """Test that --transition-memory-budget admits one budget per worker."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            argv = [
+                "create_slideshow.py",
+                "--input-dir",
+                temp_dir,
+                "--output-dir",
+                temp_dir,
+                "--no-split",
+                "--transition-memory-budget",
+                "100",
+                "--workers",
+                "4",
+            ]
+            triangle_dict = {"a.jpg": TRIANGLES_SET_A, "b.jpg": TRIANGLES_SET_B}
+
+            # Act
+            with patch.object(sys, "argv", argv), patch(
+                "create_slideshow.process_images", return_value=triangle_dict
+            ), patch.object(
+                Slideshow, "add_transitions", autospec=True, return_value=[]
+            ) as mock_add:
+                result = create_slideshow.main()
+
+            # Assert
+            assert result == 0
+            slideshow, pairs, max_triangles, workers, memory_budget = (
+                mock_add.call_args.args
+            )
+            assert workers == 4
+            assert memory_budget == 4 * 100 * 1024 * 1024
+            assert slideshow.transition_options["memory_budget"] == 100 * 1024 * 1024
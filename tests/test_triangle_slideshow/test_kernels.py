@@ -0,0 +1,152 @@
+"""
+Tests for the kernels module.
+
+This module tests the functionality of the kernels.py module. The solver
+tests in test_transition.py run once per kernel backend as well.
+"""
+
+import numpy as np
+import pytest
+
+from triangle_slideshow import kernels
+
+
+def _run_each_backend(function, *args):
+    """Call a kernel under every available backend on copies of the arguments."""
+    results = {}
+    for backend in kernels.available_backends():
+        previous = kernels.set_backend(backend)
+        try:
+            copies = [a.copy() if isinstance(a, np.ndarray) else a for a in args]
+            results[backend] = (function(*copies), copies)
+        finally:
+            kernels.set_backend(previous)
+    return results
+
+
+@pytest.mark.usefixtures("kernel_backend")
+class TestKernels:
+    """Tests for the kernels against straightforward reference results."""
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_centroid_costs(self, dtype):
+        """Test that a cost block holds the pairwise centroid distances."""
+        # Arrange
+        rng = np.random.default_rng(1)
+        points_a = rng.uniform(0, 100, (7, 2)).astype(dtype)
+        points_b = rng.uniform(0, 100, (9, 2)).astype(dtype)
+        out = np.empty((7, 9), dtype=dtype)
+
+        # Act
+        kernels.centroid_costs(out, points_a, points_b)
+
+        # Assert
+        expected = np.linalg.norm(
+            points_a[:, None].astype(np.float64) - points_b[None], axis=2
+        )
+        assert np.allclose(out, expected, rtol=1e-5)
+
+    @pytest.mark.parametrize("sparse", [False, True])
+    def test_best_two(self, sparse):
+        """Test the best and second best candidate value of each bidder."""
+        # Arrange
+        rng = np.random.default_rng(2)
+        prices = rng.uniform(0, 5, 6)
+        if sparse:
+            neighbors = np.array([[0, 2, 4], [1, 3, 5], [5, 0, 1], [2, 3, 4]])
+            benefit = -rng.uniform(0, 10, (4, 3))
+            values = benefit - prices[neighbors]
+        else:
+            neighbors = None
+            benefit = -rng.uniform(0, 10, (4, 6))
+            values = benefit - prices
+        bidders = np.array([3, 0, 2])
+
+        # Act
+        choice, best_value, second_value = kernels.best_two(
+            benefit, prices, neighbors, bidders
+        )
+
+        # Assert
+        ordered = np.sort(values[bidders], axis=1)
+        assert list(choice) == list(values[bidders].argmax(axis=1))
+        assert np.allclose(best_value, ordered[:, -1])
+        assert np.allclose(second_value, ordered[:, -2])
+
+    def test_greedy_scan_stops_for_exhausted_row(self):
+        """Test that the scan pairs free ends and stops at an exhausted row."""
+        # Arrange - row 1's only candidate is column 0, taken by row 0 first
+        edge_distances = np.array([1.0, 2.0, 3.0, 4.0])
+        edge_rows = np.array([0, 1, 2, 2])
+        edge_cols = np.array([0, 0, 1, 2])
+        edge_last = np.array([True, True, False, True])
+        assignment = np.full(3, -1)
+        taken = np.zeros(3, dtype=bool)
+
+        # Act
+        first = kernels.greedy_scan(
+            edge_distances,
+            edge_rows,
+            edge_cols,
+            edge_last,
+            0,
+            np.inf,
+            assignment,
+            taken,
+            0,
+            3,
+        )
+        second = kernels.greedy_scan(
+            edge_distances,
+            edge_rows,
+            edge_cols,
+            edge_last,
+            first[0],
+            2.5,
+            assignment,
+            taken,
+            first[1],
+            3,
+        )
+
+        # Assert
+        assert first == (2, 1, 1)
+        assert second == (2, 1, -1)
+        assert list(assignment) == [0, -1, -1]
+        assert list(taken) == [True, False, False]
+
+    def test_compose(self):
+        """Test that composition follows both steps and keeps unpaired markers."""
+        result = kernels.compose(np.array([2, 0, -1, 1]), np.array([1, -1, 0]))
+        assert list(result) == [0, 1, -1, -1]
+
+
+class TestBackends:
+    """Tests for selecting the kernel backend."""
+
+    def test_backends_agree(self):
+        """Test that every available backend computes the same results."""
+        # Arrange
+        rng = np.random.default_rng(3)
+        benefit = -rng.uniform(0, 10, (50, 8))
+        neighbors = rng.integers(0, 60, (50, 8))
+        prices = rng.uniform(0, 5, 60)
+        bidders = np.arange(0, 50, 3)
+
+        # Act
+        results = _run_each_backend(
+            kernels.best_two, benefit, prices, neighbors, bidders
+        )
+
+        # Assert
+        reference, _ = results["numpy"]
+        for result, _ in results.values():
+            for array, expected in zip(result, reference):
+                assert np.array_equal(array, expected)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend raises a ValueError."""
+        assert kernels.get_backend() in kernels.available_backends()
+        assert "numpy" in kernels.available_backends()
+        with pytest.raises(ValueError):
+            kernels.set_backend("fortran")
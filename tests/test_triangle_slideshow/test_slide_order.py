@@ -0,0 +1,152 @@
+"""
+Tests for the slide order module.
+
+This module tests the functionality of the slide_order.py module.
+"""
+
+from itertools import permutations
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from triangle_slideshow.slideshow import Slideshow
+from triangle_slideshow.slide_order import (
+    order_length,
+    order_slides,
+    slide_distances,
+    slide_summary,
+)
+from triangle_slideshow.transition import create_transition
+
+
+def _shifted_triangles(size, shift, seed, color=(0, 0, 0)):
+    """Create a random triangle set in a 100x100 square moved by shift."""
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(0, 100, size=(size, 3, 2)) + shift
+    return [{"coordinates": c.tolist(), "color": list(color)} for c in coords]
+
+
+class TestSlideDistances:
+    """Tests for sliced Wasserstein slide distances."""
+
+    def test_translation_distance(self):
+        """Test that distances grow with a shift and ignore triangle counts."""
+        # Arrange
+        base = _shifted_triangles(400, 0, seed=1)
+        same_cloud = _shifted_triangles(300, 0, seed=2)
+        shifted = _shifted_triangles(400, 50, seed=3)
+        far = _shifted_triangles(400, 200, seed=4)
+
+        # Act
+        summaries = [slide_summary(t) for t in (base, same_cloud, shifted, far)]
+        result = slide_distances(summaries)
+
+        # Assert
+        assert summaries[0].shape == (64, 128)
+        assert np.allclose(result, result.T)
+        assert np.all(np.diag(result) == 0)
+        assert result[0, 1] < 5
+        assert result[0, 1] < result[0, 2] < result[0, 3]
+
+    def test_color_counts_unless_weighted_out(self):
+        """Test that colour separates slides unless the cost weights ignore it."""
+        # Arrange
+        dark = _shifted_triangles(200, 0, seed=1)
+        light = _shifted_triangles(200, 0, seed=1, color=(200, 200, 200))
+
+        # Act
+        default = slide_distances([slide_summary(dark), slide_summary(light)])
+        position = slide_distances(
+            [
+                slide_summary(dark, {"position": 1.0}),
+                slide_summary(light, {"position": 1.0}),
+            ]
+        )
+
+        # Assert
+        assert default[0, 1] > 50
+        assert position[0, 1] == pytest.approx(0)
+
+    @patch("builtins.print")
+    def test_tracks_transition_cost(self, mock_print):
+        """Test that the estimates rank transitions like their solved cost."""
+        # Arrange
+        slides = [_shifted_triangles(200, 30 * k, seed=k) for k in range(4)]
+        summaries = [slide_summary(t, {"position": 1.0}) for t in slides]
+
+        # Act
+        estimates = slide_distances(summaries)[0, 1:]
+
+        # Assert
+        costs = [create_transition(slides[0], t).total_distance() for t in slides[1:]]
+        assert list(np.argsort(estimates)) == list(np.argsort(costs))
+
+
+class TestOrderSlides:
+    """Tests for the slide ordering heuristic."""
+
+    @pytest.mark.parametrize("cycle", [False, True])
+    def test_matches_brute_force(self, cycle):
+        """Test that small instances reach the optimal order."""
+        # Arrange
+        rng = np.random.default_rng(5)
+        points = rng.uniform(0, 100, size=(7, 2))
+        distances = np.linalg.norm(points[:, None] - points[None], axis=2)
+
+        # Act
+        result = order_slides(distances, start=0, cycle=cycle)
+
+        # Assert
+        assert result[0] == 0
+        assert sorted(result) == list(range(7))
+        best = min(
+            order_length(distances, (0,) + rest, cycle)
+            for rest in permutations(range(1, 7))
+        )
+        assert order_length(distances, result, cycle) == pytest.approx(best)
+
+    def test_start_out_of_range(self):
+        """Test that an invalid start slide raises an error."""
+        assert order_slides(np.zeros((0, 0))) == []
+        with pytest.raises(ValueError):
+            order_slides(np.zeros((3, 3)), start=3)
+
+
+class TestSlideshowOrder:
+    """Tests for reordering the slides of a slideshow."""
+
+    @patch("builtins.print")
+    def test_optimize_order_keeps_start_and_transitions(self, mock_print):
+        """Test that similar slides end up adjacent and transitions follow."""
+        # Arrange
+        slideshow = Slideshow()
+        for shift in (0, 300, 100, 200):
+            slideshow.add_slide(
+                _shifted_triangles(50, shift, seed=shift), name=f"shift_{shift}"
+            )
+        slideshow.add_transition(1, 3)
+        pairings = slideshow.transitions[0]["pairings"]
+
+        # Act
+        order = slideshow.optimize_order()
+
+        # Assert
+        assert order == [0, 2, 3, 1]
+        assert [slide["name"] for slide in slideshow.slides] == [
+            "shift_0",
+            "shift_100",
+            "shift_200",
+            "shift_300",
+        ]
+        assert slideshow.transitions[0]["from"] == 3
+        assert slideshow.transitions[0]["to"] == 2
+        assert slideshow.transitions[0]["pairings"] is pairings
+
+    def test_reorder_requires_permutation(self):
+        """Test that an order that is not a permutation raises an error."""
+        slideshow = Slideshow()
+        slideshow.add_slide(_shifted_triangles(3, 0, seed=0))
+        slideshow.add_slide(_shifted_triangles(3, 0, seed=1))
+        with pytest.raises(ValueError):
+            slideshow.reorder_slides([0, 0])
@@ -6,12 +6,27 @@ This module tests the functionality of the slideshow.py module.
 
 import pytest
 import json
+import numpy as np
 import os
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock, ANY
 
-from triangle_slideshow.slideshow import Slideshow, save_slideshow, load_slideshow
-from triangle_slideshow.transition import create_transition
+from triangle_slideshow.slideshow import (
+    Slideshow,
+    TransitionSink,
+    load_slideshow,
+    save_slideshow,
+    save_slideshow_split,
+)
+from triangle_slideshow.transition import (
+    calculate_features,
+    create_transition,
+    repair_transition,
+)
+from triangle_slideshow.transition_cache import TransitionCache
 from tests.test_triangle_slideshow.fixtures import (
     TRIANGLES_SET_A,
     TRIANGLES_SET_B,
@@ -29,6 +44,15 @@ from tests.test_triangle_slideshow.fixtures import (
 )
 
 
+def _without_seconds(data):
+    """Drop the solve times, which differ between otherwise identical builds."""
+    if isinstance(data, dict):
+        return {k: _without_seconds(v) for k, v in data.items() if k != "seconds"}
+    if isinstance(data, list):
+        return [_without_seconds(v) for v in data]
+    return data
+
+
 class TestSlideshowClass:
     """Tests for the Slideshow class."""
 
@@ -103,7 +127,9 @@ class TestSlideshowClass:
             assert slideshow.transitions[0]["from"] == 0
             assert slideshow.transitions[0]["to"] == 1
             assert slideshow.transitions[0]["pairings"] == EXPECTED_PAIRINGS
-            mock_create.assert_called_once_with(TRIANGLES_SET_A, TRIANGLES_SET_B, 1000)
+            mock_create.assert_called_once_with(
+                TRIANGLES_SET_A, TRIANGLES_SET_B, 1000, info={}
+            )
 
     def test_add_transition_invalid_indices(self):
         """Test adding a transition with invalid slide indices."""
@@ -577,6 +603,739 @@ class TestSlideshowClass:
         assert slideshow.slides[0]["name"] == "slide_0"
 
 
+class TestParallelTransitions:
+    """Tests for creating transitions on a process pool."""
+
+    @patch("builtins.print")
+    def test_parallel_matches_serial(self, mock_print):
+        """Test that parallel transitions equal serial ones, in the same order."""
+        # Arrange
+        slideshows = []
+        for _ in range(2):
+            slideshow = Slideshow()
+            slideshow.add_slide(TRIANGLES_SET_A)
+            slideshow.add_slide(TRIANGLES_SET_B)
+            slideshow.add_slide(TRIANGLES_SET_C)
+            slideshows.append(slideshow)
+
+        # Act
+        serial_count = slideshows[0].round_robin_transitions()
+        parallel_count = slideshows[1].round_robin_transitions(workers=2)
+
+        # Assert
+        assert serial_count == parallel_count == 3
+        assert _without_seconds(slideshows[0].transitions) == _without_seconds(
+            slideshows[1].transitions
+        )
+
+    @patch("builtins.print")
+    def test_parallel_build_uses_cache(self, mock_print):
+        """Test that a parallel rebuild takes every transition from the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(temp_dir)
+            builds = []
+            for _ in range(2):
+                slideshow = Slideshow(transition_options={"cache": cache})
+                slideshow.add_slide(TRIANGLES_SET_A)
+                slideshow.add_slide(TRIANGLES_SET_B)
+                slideshow.add_slide(TRIANGLES_SET_C)
+                builds.append(slideshow)
+
+            # Act
+            builds[0].round_robin_transitions(workers=2)
+            builds[1].round_robin_transitions(workers=2)
+
+            # Assert
+            assert cache.stats()["misses"] == 3
+            assert cache.stats()["hits"] == 3
+            assert [t["from"] for t in builds[1].transitions] == [0, 1, 2]
+
+    def test_memory_budget_limits_concurrency(self):
+        """Test that jobs are only admitted while they fit the memory budget."""
+        # Arrange - run the pool on threads so the patched function is used
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_create_transition(
+            triangles_from, triangles_to, max_triangles, **options
+        ):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return EXPECTED_PAIRINGS
+
+        def run(memory_budget):
+            state["peak"] = 0
+            slideshow = Slideshow()
+            for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+                slideshow.add_slide(triangles)
+            slideshow.auto_create_transitions(
+                sequential_only=False, workers=3, memory_budget=memory_budget
+            )
+            return slideshow, state["peak"]
+
+        with patch(
+            "triangle_slideshow.slideshow.ProcessPoolExecutor", ThreadPoolExecutor
+        ), patch(
+            "triangle_slideshow.slideshow.create_transition", fake_create_transition
+        ):
+            # Act
+            tight, tight_peak = run(memory_budget=1)
+            roomy, roomy_peak = run(memory_budget=10**9)
+
+        # Assert
+        assert tight_peak == 1
+        assert roomy_peak > 1
+        expected_order = [(0, 1), (0, 2), (1, 2)]
+        assert [(t["from"], t["to"]) for t in tight.transitions] == expected_order
+        assert [(t["from"], t["to"]) for t in roomy.transitions] == expected_order
+
+
+class TestWarmStartedTransitions:
+    """Tests for all-pairs transitions seeded by composed assignments."""
+
+    @patch("builtins.print")
+    def test_matches_cold_all_pairs(self, mock_print):
+        """Test that warm-started all-pairs transitions match a cold run."""
+        # Arrange
+        slideshows = []
+        for _ in range(2):
+            slideshow = Slideshow(transition_options={"solver": "auction"})
+            for triangles in (
+                TRIANGLES_SET_LARGE,
+                TRIANGLES_SET_LARGE[::-1],
+                TRIANGLES_SET_LARGE[1:] + TRIANGLES_SET_LARGE[:1],
+                TRIANGLES_SET_LARGE[::2] + TRIANGLES_SET_LARGE[1::2],
+            ):
+                slideshow.add_slide(triangles)
+            slideshows.append(slideshow)
+
+        # Act
+        cold_count = slideshows[0].auto_create_transitions(sequential_only=False)
+        warm_count = slideshows[1].auto_create_transitions(
+            sequential_only=False, warm_start=True
+        )
+
+        # Assert
+        assert cold_count == warm_count == 6
+        cold, warm = slideshows[0].transitions, slideshows[1].transitions
+        assert [(t["from"], t["to"]) for t in warm] == [
+            (t["from"], t["to"]) for t in cold
+        ]
+        size = len(TRIANGLES_SET_LARGE)
+        for cold_transition, warm_transition in zip(cold, warm):
+            to_indices = sorted(p["to_index"] for p in warm_transition["pairings"])
+            assert to_indices == list(range(size))
+            cold_total = sum(p["distance"] for p in cold_transition["pairings"])
+            warm_total = sum(p["distance"] for p in warm_transition["pairings"])
+            assert warm_total == pytest.approx(cold_total, abs=1.0)
+
+    @patch("builtins.print")
+    def test_unsupported_solver_solves_cold(self, mock_print):
+        """Test that warm_start is ignored for a solver without warm starts."""
+        # Arrange
+        slideshow = Slideshow()
+        slideshow.add_slide(TRIANGLES_SET_A)
+        slideshow.add_slide(TRIANGLES_SET_B)
+        slideshow.add_slide(TRIANGLES_SET_C)
+
+        # Act
+        count = slideshow.auto_create_transitions(
+            sequential_only=False, warm_start=True
+        )
+
+        # Assert
+        assert count == 3
+        mock_print.assert_any_call(
+            "Solver 'hungarian' does not support warm starts, solving cold"
+        )
+
+
+class TestWeightedTransitions:
+    """Tests for transitions with a multi-feature cost."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @patch("builtins.print")
+    def test_features_extracted_once_per_slide(self, mock_print, workers):
+        """Test that each slide's features are computed once for all its transitions."""
+        # Arrange
+        weights = {"position": 1.0, "color": 0.5}
+        slideshow = Slideshow(transition_options={"cost_weights": weights})
+        for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+            slideshow.add_slide(triangles)
+
+        # Act
+        with patch(
+            "triangle_slideshow.slideshow.calculate_features",
+            wraps=calculate_features,
+        ) as mock_features:
+            count = slideshow.auto_create_transitions(
+                sequential_only=False, workers=workers
+            )
+
+        # Assert
+        assert count == 3
+        assert mock_features.call_count == 3
+        expected = create_transition(
+            TRIANGLES_SET_A, TRIANGLES_SET_C, cost_weights=weights
+        )
+        assert slideshow.transitions[1]["pairings"] == expected
+
+
+class TestReplaceSlide:
+    """Tests for replacing a slide and repairing its transitions."""
+
+    @patch("builtins.print")
+    def test_repairs_transitions_of_slide(self, mock_print):
+        """Test that only the transitions touching the slide are repaired."""
+        # Arrange
+        slideshow = Slideshow()
+        for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+            slideshow.add_slide(triangles)
+        slideshow.auto_create_transitions(sequential_only=False)
+        untouched = slideshow.transitions[1]["pairings"]
+        changed = list(TRIANGLES_SET_B[::-1])
+
+        # Act
+        with patch(
+            "triangle_slideshow.slideshow.repair_transition",
+            wraps=repair_transition,
+        ) as mock_repair:
+            count = slideshow.replace_slide(1, changed)
+
+        # Assert
+        assert count == 2
+        assert mock_repair.call_count == 2
+        assert slideshow.slides[1]["triangles"] == changed
+        assert slideshow.slides[1]["name"] == "slide_1"
+        assert slideshow.transitions[1]["pairings"] is untouched
+        for transition in (slideshow.transitions[0], slideshow.transitions[2]):
+            triangles_from = slideshow.slides[transition["from"]]["triangles"]
+            triangles_to = slideshow.slides[transition["to"]]["triangles"]
+            expected = create_transition(triangles_from, triangles_to)
+            assert sum(p["distance"] for p in transition["pairings"]) == pytest.approx(
+                sum(p["distance"] for p in expected)
+            )
+            assert transition["cost"] == pytest.approx(
+                sum(p["distance"] for p in expected)
+            )
+            # The repair proves no bound, and the old one is for the old slide
+            assert "lower_bound" not in transition and "gap" not in transition
+            assert transition["seconds"] >= 0
+        assert slideshow.quality_summary()["transitions"] == 1
+
+    @patch("builtins.print")
+    def test_full_resolve_keeps_proven_bound(self, mock_print):
+        """Test that a repair solved from scratch keeps the solver's bound."""
+        # Arrange
+        slideshow = Slideshow()
+        slideshow.add_slide(TRIANGLES_SET_A)
+        slideshow.add_slide(TRIANGLES_SET_B)
+        slideshow.add_transition(0, 1)
+
+        # Act
+        with patch(
+            "triangle_slideshow.transition.transition_lower_bound"
+        ) as mock_estimate:
+            slideshow.replace_slide(1, TRIANGLES_SET_C)
+
+        # Assert
+        mock_estimate.assert_not_called()
+        transition = slideshow.transitions[0]
+        expected = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_C)
+        assert transition["cost"] == pytest.approx(expected.total_distance())
+        assert transition["lower_bound"] == pytest.approx(transition["cost"])
+        assert transition["gap"] == 0.0
+
+    def test_replace_slide_out_of_range(self):
+        """Test that replacing a missing slide raises ValueError."""
+        slideshow = Slideshow()
+        with pytest.raises(ValueError):
+            slideshow.replace_slide(0, TRIANGLES_SET_A)
+
+
+class TestBidirectionalTransitions:
+    """Tests for reverse transitions derived from forward ones."""
+
+    @patch("builtins.print")
+    def test_round_robin_solves_each_direction_once(self, mock_print):
+        """Test that reverse transitions are inverted, not solved again."""
+        # Arrange
+        slideshow = Slideshow()
+        for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+            slideshow.add_slide(triangles)
+
+        # Act
+        with patch(
+            "triangle_slideshow.slideshow.create_transition",
+            wraps=create_transition,
+        ) as mock_create:
+            count = slideshow.round_robin_transitions(bidirectional=True)
+
+        # Assert
+        assert count == 6
+        assert mock_create.call_count == 3
+        assert [(t["from"], t["to"]) for t in slideshow.transitions] == [
+            (0, 1),
+            (1, 2),
+            (2, 0),
+            (1, 0),
+            (2, 1),
+            (0, 2),
+        ]
+        for transition in slideshow.transitions[3:]:
+            expected = create_transition(
+                slideshow.slides[transition["from"]]["triangles"],
+                slideshow.slides[transition["to"]]["triangles"],
+            )
+            assert sum(p["distance"] for p in transition["pairings"]) == pytest.approx(
+                sum(p["distance"] for p in expected)
+            )
+            from_indices = [p["from_index"] for p in transition["pairings"]]
+            assert from_indices == sorted(from_indices)
+
+    @patch("builtins.print")
+    def test_two_slides_solve_once(self, mock_print):
+        """Test that the round trip of two slides is a single solve."""
+        # Arrange
+        slideshow = Slideshow()
+        slideshow.add_slide(TRIANGLES_SET_A)
+        slideshow.add_slide(TRIANGLES_SET_B)
+
+        # Act
+        with patch(
+            "triangle_slideshow.slideshow.create_transition",
+            wraps=create_transition,
+        ) as mock_create:
+            count = slideshow.round_robin_transitions(bidirectional=True)
+
+        # Assert
+        assert count == 2
+        assert mock_create.call_count == 1
+        assert [(t["from"], t["to"]) for t in slideshow.transitions] == [
+            (0, 1),
+            (1, 0),
+        ]
+
+    @pytest.mark.parametrize("warm_start", [False, True])
+    @patch("builtins.print")
+    def test_all_pairs_adds_reverses(self, mock_print, warm_start):
+        """Test that all-pairs mode adds one reverse per solved transition."""
+        # Arrange
+        slideshow = Slideshow(transition_options={"solver": "sparse"})
+        for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+            slideshow.add_slide(triangles)
+
+        # Act
+        count = slideshow.auto_create_transitions(
+            sequential_only=False, warm_start=warm_start, bidirectional=True
+        )
+
+        # Assert
+        assert count == 6
+        pairs = {(t["from"], t["to"]) for t in slideshow.transitions}
+        assert pairs == {(i, j) for i in range(3) for j in range(3) if i != j}
+
+
+class TestCanonicalOrder:
+    """Tests for reordering slides to a shared triangle index."""
+
+    @staticmethod
+    def _slides(seed):
+        rng = np.random.default_rng(seed)
+        slides = []
+        for _ in range(4):
+            coords = rng.uniform(0, 100, size=(30, 3, 2))
+            slides.append(
+                [{"coordinates": c.tolist(), "color": [0, 0, 0]} for c in coords]
+            )
+        return slides
+
+    @pytest.mark.parametrize("reference", [0, 2])
+    @patch("builtins.print")
+    def test_index_wise_morph_is_optimal_chain(self, mock_print, reference):
+        """Test that consecutive slides morph optimally by index."""
+        # Arrange
+        originals = self._slides(seed=0)
+        slideshow = Slideshow()
+        for triangles in originals:
+            slideshow.add_slide(list(triangles))
+
+        # Act
+        reordered = slideshow.canonicalize(reference=reference)
+
+        # Assert
+        assert reordered == 3
+        assert slideshow.canonical
+        assert slideshow.transitions == []
+        assert slideshow.slides[reference]["triangles"] == originals[reference]
+        for index, slide in enumerate(slideshow.slides):
+            assert sorted(slide["triangles"], key=str) == sorted(
+                originals[index], key=str
+            )
+        for index in range(3):
+            index_wise = sum(
+                np.hypot(
+                    *(
+                        np.mean(a["coordinates"], axis=0)
+                        - np.mean(b["coordinates"], axis=0)
+                    )
+                )
+                for a, b in zip(
+                    slideshow.slides[index]["triangles"],
+                    slideshow.slides[index + 1]["triangles"],
+                )
+            )
+            exact = create_transition(originals[index], originals[index + 1])
+            assert index_wise == pytest.approx(sum(p["distance"] for p in exact))
+
+    @patch("builtins.print")
+    def test_manifest_has_no_transition_files(self, mock_print):
+        """Test that a canonical slideshow exports no transition files."""
+        # Arrange
+        slideshow = Slideshow()
+        for triangles in self._slides(seed=1):
+            slideshow.add_slide(triangles)
+        slideshow.canonicalize()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Act
+            manifest_path = save_slideshow_split(slideshow, temp_dir)
+
+            # Assert
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            assert manifest["canonical"] is True
+            assert all(not slide["transitions"] for slide in manifest["slides"])
+            assert not any(
+                name.startswith("transition_") for name in os.listdir(temp_dir)
+            )
+
+    def test_requires_equal_triangle_counts(self):
+        """Test that slides with different triangle counts are rejected."""
+        slideshow = Slideshow()
+        slideshow.add_slide(TRIANGLES_SET_A)
+        slideshow.add_slide(TRIANGLES_SET_A[:1])
+        with pytest.raises(ValueError):
+            slideshow.canonicalize()
+
+
+def _stalling_solver(row_triangles, col_triangles, **options):
+    """Solver that never finishes in time."""
+    time.sleep(60)
+
+
+class TestApproximateTransitions:
+    """Tests for transitions that fell back after missing their deadline."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @patch("builtins.print")
+    def test_marked_in_manifest_and_not_cached(self, mock_print, workers):
+        """Test that approximate transitions carry their cost and skip the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(os.path.join(temp_dir, "cache"))
+            slideshow = Slideshow(
+                transition_options={
+                    "solver": _stalling_solver,
+                    "deadline": 0.2,
+                    "cache": cache,
+                }
+            )
+            for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+                slideshow.add_slide(triangles)
+
+            # Act
+            slideshow.auto_create_transitions(workers=workers)
+            manifest_path = save_slideshow_split(slideshow, temp_dir)
+
+            # Assert
+            assert cache.stats()["entries"] == 0
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            for transition in slideshow.transitions:
+                assert transition["approximate"] is True
+                entry = manifest["slides"][transition["from"]]["transitions"][0]
+                assert entry["approximate"] is True
+                assert entry["cost"] == pytest.approx(
+                    sum(p["distance"] for p in transition["pairings"])
+                )
+
+
+class TestTransitionDistanceRatio:
+    """Tests for comparing transitions with a reference solver."""
+
+    @patch("builtins.print")
+    def test_greedy_ratio_against_exact(self, mock_print):
+        """Test that a greedy build is compared with the exact solutions."""
+        # Arrange
+        rng = np.random.default_rng(0)
+        slideshow = Slideshow(transition_options={"solver": "greedy"})
+        for size in (60, 50):
+            coords = rng.uniform(0, 100, size=(size, 3, 2))
+            slideshow.add_slide(
+                [{"coordinates": c.tolist(), "color": [0, 0, 0]} for c in coords]
+            )
+        slideshow.round_robin_transitions()
+
+        # Act
+        ratio = slideshow.transition_distance_ratio()
+
+        # Assert
+        greedy_total = sum(
+            p["distance"] for t in slideshow.transitions for p in t["pairings"]
+        )
+        exact_total = sum(
+            p["distance"]
+            for t in slideshow.transitions
+            for p in create_transition(
+                slideshow.slides[t["from"]]["triangles"],
+                slideshow.slides[t["to"]]["triangles"],
+            )
+        )
+        assert ratio == pytest.approx(greedy_total / exact_total)
+        assert ratio >= 1.0
+
+    @patch("builtins.print")
+    def test_reference_ignores_deadline_and_anchors(self, mock_print):
+        """Test that the reference is an exact solve of the matched pairs."""
+        # Arrange
+        rng = np.random.default_rng(1)
+        slideshow = Slideshow(
+            transition_options={"solver": "greedy", "deadline": 1e-6, "anchor": True}
+        )
+        slides = []
+        for size in (60, 45):
+            coords = rng.uniform(0, 100, size=(size, 3, 2))
+            slides.append(
+                [{"coordinates": c.tolist(), "color": [0, 0, 0]} for c in coords]
+            )
+            slideshow.add_slide(slides[-1])
+        slideshow.add_transition(0, 1)
+
+        # Act
+        ratio = slideshow.transition_distance_ratio()
+
+        # Assert
+        greedy = create_transition(*slides, solver="greedy")
+        exact = create_transition(*slides)
+        assert ratio == pytest.approx(
+            greedy.total_distance() / exact.total_distance(), rel=1e-5
+        )
+        assert ratio > 1.0
+
+
+class TestQualitySummary:
+    """Tests for the optimality gap kept with each transition."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @patch("builtins.print")
+    def test_gap_in_manifest_and_summary(self, mock_print, workers):
+        """Test that solved and cached transitions carry their cost and gap."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(os.path.join(temp_dir, "cache"))
+            builds = []
+            for _ in range(2):
+                slideshow = Slideshow(
+                    transition_options={
+                        "solver": "greedy",
+                        "cache": cache,
+                        "estimate_bound": True,
+                    }
+                )
+                for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+                    slideshow.add_slide(triangles)
+                builds.append(slideshow)
+
+            # Act
+            for slideshow in builds:
+                slideshow.auto_create_transitions(workers=workers)
+            manifest_path = save_slideshow_split(builds[1], temp_dir)
+
+            # Assert
+            assert _without_seconds(builds[0].transitions) == _without_seconds(
+                builds[1].transitions
+            )
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            for transition in builds[1].transitions:
+                entry = manifest["slides"][transition["from"]]["transitions"][0]
+                assert entry["gap"] == pytest.approx(transition["gap"])
+                assert entry["lower_bound"] <= entry["cost"]
+                assert entry["seconds"] == pytest.approx(transition["seconds"])
+            summary = builds[0].quality_summary()
+            assert summary["transitions"] == len(builds[0].transitions) == 2
+            assert summary["cost"] == pytest.approx(
+                sum(t["cost"] for t in builds[0].transitions)
+            )
+            assert 0 <= summary["gap"] <= summary["worst_gap"][2] < 1
+            assert summary["seconds"] > 0
+            assert Slideshow().quality_summary() is None
+
+
+class TestAnchoredTransitions:
+    """Tests for slides with unequal triangle counts and no dummy triangles."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @patch("builtins.print")
+    def test_exported_with_fades_and_spawns(self, mock_print, workers):
+        """Test that every triangle of both slides appears in the export."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(os.path.join(temp_dir, "cache"))
+            sizes = (12, 20, 15)
+            builds = []
+            for _ in range(2):
+                slideshow = Slideshow(
+                    transition_options={"anchor": True, "cache": cache}
+                )
+                for size in sizes:
+                    coords = np.random.default_rng(size).uniform(
+                        0, 100, size=(size, 3, 2)
+                    )
+                    slideshow.add_slide(
+                        [
+                            {"coordinates": c.tolist(), "color": [0, 0, 0]}
+                            for c in coords
+                        ]
+                    )
+                builds.append(slideshow)
+
+            # Act
+            builds[0].auto_create_transitions(workers=workers)
+            builds[1].auto_create_transitions(workers=workers)
+            manifest_path = save_slideshow_split(builds[1], temp_dir)
+
+            # Assert
+            assert cache.stats()["hits"] == 2
+            assert _without_seconds(builds[0].transitions) == _without_seconds(
+                builds[1].transitions
+            )
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            for slide in manifest["slides"][:-1]:
+                entry = slide["transitions"][0]
+                with open(os.path.join(temp_dir, entry["filename"])) as f:
+                    pairings = json.load(f)
+                types = [p.get("type") for p in pairings]
+                assert sorted(
+                    p["from_index"] for p in pairings if p.get("type") != "spawn"
+                ) == list(range(sizes[slide["index"]]))
+                assert sorted(
+                    p["to_index"] for p in pairings if p.get("type") != "fade"
+                ) == list(range(sizes[entry["to"]]))
+                assert types.count(None) == min(
+                    sizes[slide["index"]], sizes[entry["to"]]
+                )
+
+
+class TestStreamingTransitions:
+    """Tests for writing transitions to a sink as they are created."""
+
+    @staticmethod
+    def _build(transition_sink, workers):
+        slideshow = Slideshow(transition_sink=transition_sink)
+        for triangles in (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C):
+            slideshow.add_slide(triangles)
+        slideshow.round_robin_transitions(workers=workers, bidirectional=True)
+        return slideshow
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @patch("builtins.print")
+    def test_export_matches_in_memory_build(self, mock_print, workers):
+        """Test that a streamed build keeps descriptors and exports the same files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            streamed_dir = os.path.join(temp_dir, "streamed")
+            memory_dir = os.path.join(temp_dir, "memory")
+
+            # Act
+            streamed = self._build(TransitionSink(streamed_dir), workers)
+            written = sorted(os.listdir(streamed_dir))
+            save_slideshow_split(streamed, streamed_dir)
+            save_slideshow_split(self._build(None, workers), memory_dir)
+
+            # Assert
+            assert len(written) == 6
+            for transition in streamed.transitions:
+                assert "pairings" not in transition
+                assert transition["filename"] in written
+                assert transition["pairing_count"] == len(
+                    streamed.transition_pairings(transition)
+                )
+            assert sorted(os.listdir(streamed_dir)) == sorted(os.listdir(memory_dir))
+            for filename in os.listdir(memory_dir):
+                with open(os.path.join(streamed_dir, filename)) as f:
+                    streamed_data = json.load(f)
+                with open(os.path.join(memory_dir, filename)) as f:
+                    assert _without_seconds(streamed_data) == _without_seconds(
+                        json.load(f)
+                    )
+
+    @patch("builtins.print")
+    def test_replace_slide_rewrites_files(self, mock_print):
+        """Test that repaired transitions are written to the sink again."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            sink = TransitionSink(temp_dir)
+            slideshow = Slideshow(transition_sink=sink)
+            slideshow.add_slide(TRIANGLES_SET_A)
+            slideshow.add_slide(TRIANGLES_SET_B)
+            slideshow.add_transition(0, 1)
+
+            # Act
+            slideshow.replace_slide(1, TRIANGLES_SET_C)
+
+            # Assert
+            assert "pairings" not in slideshow.transitions[0]
+            expected = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_C)
+            assert sink.read(slideshow.transitions[0]) == expected
+            export_dir = os.path.join(temp_dir, "export")
+            manifest_path = save_slideshow_split(slideshow, export_dir)
+            with open(os.path.join(export_dir, "transition_0_to_1.json")) as f:
+                assert json.load(f) == json.loads(expected.to_json())
+            with open(manifest_path) as f:
+                assert json.load(f)["slides"][0]["transitions"][0]["to"] == 1
+
+    @pytest.mark.parametrize("export_subdir", ["", "export"])
+    @patch("builtins.print")
+    def test_reorder_then_export_keeps_pairings(self, mock_print, export_subdir):
+        """Test that reordered streamed transitions export their own pairings."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            sink = TransitionSink(temp_dir)
+            slideshow = Slideshow(transition_sink=sink)
+            sets = (TRIANGLES_SET_A, TRIANGLES_SET_B, TRIANGLES_SET_C)
+            for triangles in sets:
+                slideshow.add_slide(triangles)
+            slideshow.round_robin_transitions()
+            export_dir = os.path.join(temp_dir, export_subdir)
+
+            # Act
+            slideshow.reorder_slides([2, 0, 1])
+            manifest_path = save_slideshow_split(slideshow, export_dir)
+
+            # Assert
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            exported = 0
+            for slide in manifest["slides"]:
+                for entry in slide["transitions"]:
+                    old_from = [2, 0, 1][slide["index"]]
+                    old_to = [2, 0, 1][entry["to"]]
+                    expected = create_transition(sets[old_from], sets[old_to])
+                    with open(os.path.join(export_dir, entry["filename"])) as f:
+                        assert json.load(f) == json.loads(expected.to_json())
+                    exported += 1
+            assert exported == 3
+            assert not [name for name in os.listdir(temp_dir) if name.endswith(".tmp")]
+
+
 class TestSlideshowIO:
     """Tests for the slideshow I/O functions."""
 
@@ -4,20 +4,48 @@ Tests for the transition module.
 This module tests the functionality of the transition.py module.
 """
 
+import json
 import pytest
+import time
+import tracemalloc
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 from unittest.mock import patch, MagicMock
 
+from triangle_slideshow import transition as transition_module
 from triangle_slideshow.transition import (
+    anchor_unmatched,
     calculate_centroid,
+    calculate_centroids,
     calculate_cost_matrix,
+    calculate_features,
+    compose_assignments,
     create_transition,
+    estimate_transition_memory,
+    multilevel_blocks,
+    pair_costs,
+    pairings_to_assignment,
+    partition_cells,
+    refine_pairings,
+    register_solver,
+    repair_transition,
+    reverse_pairings,
+    select_solver,
+    transition_lower_bound,
+    transition_quality,
+    AUCTION_RELATIVE_TOLERANCE,
+    AUCTION_TOLERANCE,
+    SPARSE_NEIGHBORS,
+    CostMatrixPool,
+    Transition,
 )
+from triangle_slideshow.transition_cache import TransitionCache
 from tests.test_triangle_slideshow.fixtures import (
     SAMPLE_TRIANGLE,
     SAMPLE_TRIANGLE_CENTROID,
     TRIANGLES_SET_A,
     TRIANGLES_SET_B,
+    TRIANGLES_SET_C,
     EXPECTED_COST_MATRIX,
     EXPECTED_PAIRINGS,
 )
@@ -50,6 +78,41 @@ class TestCalculateCentroid:
             np.testing.assert_almost_equal(result, expected, decimal=6)
 
 
+class TestCalculateCentroids:
+    """Tests for the vectorized calculate_centroids function."""
+
+    def test_matches_per_triangle_centroids(self):
+        """Test that calculate_centroids agrees with calculate_centroid."""
+        # Act
+        result = calculate_centroids(TRIANGLES_SET_A)
+
+        # Assert
+        expected = [calculate_centroid(t["coordinates"]) for t in TRIANGLES_SET_A]
+        np.testing.assert_almost_equal(result, expected, decimal=10)
+
+    def test_handles_empty_set(self):
+        """Test that calculate_centroids returns an empty (0, 2) array."""
+        assert calculate_centroids([]).shape == (0, 2)
+
+
+def _random_triangles(size, seed):
+    """Create a random triangle set with coordinates in a 1000x1000 square."""
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(0, 1000, size=(size, 3, 2))
+    return [{"coordinates": c.tolist(), "color": [0, 0, 0]} for c in coords]
+
+
+def _grid_triangles(side, seed):
+    """Create side*side small triangles jittered around a regular grid."""
+    rng = np.random.default_rng(seed)
+    cells = np.stack(np.meshgrid(np.arange(side), np.arange(side)), axis=-1)
+    centers = (cells.reshape(-1, 1, 2) + rng.uniform(0, 1, (side * side, 1, 2))) * 50
+    coords = centers + rng.uniform(-5, 5, size=(side * side, 3, 2))
+    order = rng.permutation(side * side)
+    return [{"coordinates": coords[i].tolist(), "color": [0, 0, 0]} for i in order]
+
+
+@pytest.mark.usefixtures("kernel_backend")
 class TestCalculateCostMatrix:
     """Tests for the calculate_cost_matrix function."""
 
@@ -86,6 +149,69 @@ class TestCalculateCostMatrix:
         # Assert - Check that progress was reported
         assert any("Processed" in str(call) for call in mock_print.call_args_list)
 
+    @patch("builtins.print")
+    def test_matches_pairwise_norm(self, mock_print):
+        """Test that the block-wise matrix equals per-pair np.linalg.norm."""
+        # Arrange - enough rows to span several blocks
+        triangles_a = _random_triangles(1200, seed=1)
+        triangles_b = _random_triangles(150, seed=2)
+        centroids_a = [calculate_centroid(t["coordinates"]) for t in triangles_a]
+        centroids_b = [calculate_centroid(t["coordinates"]) for t in triangles_b]
+        expected = np.array(
+            [[np.linalg.norm(a - b) for b in centroids_b] for a in centroids_a]
+        )
+
+        # Act
+        result = calculate_cost_matrix(triangles_a, triangles_b)
+
+        # Assert
+        assert result.dtype == np.float64
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+    @patch("builtins.print")
+    def test_float32_matrix(self, mock_print):
+        """Test that calculate_cost_matrix can produce a float32 matrix."""
+        # Act
+        result = calculate_cost_matrix(
+            TRIANGLES_SET_A, TRIANGLES_SET_B, dtype=np.float32
+        )
+
+        # Assert
+        assert result.dtype == np.float32
+        np.testing.assert_almost_equal(result, EXPECTED_COST_MATRIX, decimal=2)
+
+    @patch("builtins.print")
+    def test_writes_into_output_buffer(self, mock_print):
+        """Test that calculate_cost_matrix fills a caller-supplied buffer."""
+        # Arrange
+        buffer = np.full((3, 3), -1.0)
+
+        # Act
+        result = calculate_cost_matrix(TRIANGLES_SET_A, TRIANGLES_SET_B, out=buffer)
+
+        # Assert
+        assert result is buffer
+        np.testing.assert_almost_equal(buffer, EXPECTED_COST_MATRIX, decimal=2)
+
+    @patch("builtins.print")
+    def test_rejects_output_buffer_with_wrong_shape(self, mock_print):
+        """Test that a mis-shaped output buffer raises ValueError."""
+        with pytest.raises(ValueError):
+            calculate_cost_matrix(
+                TRIANGLES_SET_A, TRIANGLES_SET_B, out=np.empty((2, 3))
+            )
+
+    @patch("builtins.print")
+    def test_accepts_precomputed_centroids(self, mock_print):
+        """Test that centroid arrays can be passed instead of triangle lists."""
+        # Act
+        result = calculate_cost_matrix(
+            calculate_centroids(TRIANGLES_SET_A), calculate_centroids(TRIANGLES_SET_B)
+        )
+
+        # Assert
+        np.testing.assert_almost_equal(result, EXPECTED_COST_MATRIX, decimal=2)
+
 
 class TestCreateTransition:
     """Tests for the create_transition function."""
@@ -236,3 +362,1581 @@ class TestScalingBehavior:
             assert 0 <= pairing["from_index"] < size
             assert 0 <= pairing["to_index"] < size
             assert pairing["distance"] >= 0
+
+
+@pytest.mark.usefixtures("kernel_backend")
+class TestSparseSolver:
+    """Tests for the sparse k-nearest-neighbour transition solver."""
+
+    @patch("builtins.print")
+    def test_matches_dense_solver(self, mock_print):
+        """Test that the sparse solver finds the same total distance as Hungarian."""
+        # Arrange - small triangles spread evenly, like a triangulated image
+        triangles_a = _grid_triangles(20, seed=3)
+        triangles_b = _grid_triangles(20, seed=4)
+
+        # Act
+        dense = create_transition(triangles_a, triangles_b)
+        sparse = create_transition(triangles_a, triangles_b, solver="sparse")
+
+        # Assert
+        dense_total = sum(p["distance"] for p in dense)
+        sparse_total = sum(p["distance"] for p in sparse)
+        assert sparse_total <= dense_total + AUCTION_TOLERANCE
+        assert sorted(p["to_index"] for p in sparse) == list(range(400))
+
+    @patch("builtins.print")
+    def test_grows_k_until_full_matching(self, mock_print):
+        """Test that k grows when the candidate graph has no perfect matching."""
+        # Arrange - all sources share the same nearest targets
+        triangles_a = [TRIANGLES_SET_A[0]] * 40
+        triangles_b = _grid_triangles(7, seed=5)[:40]
+
+        # Act
+        result = create_transition(triangles_a, triangles_b, solver="sparse")
+
+        # Assert
+        assert sorted(p["to_index"] for p in result) == list(range(40))
+        assert any("retrying" in str(call) for call in mock_print.call_args_list)
+
+    @patch("builtins.print")
+    def test_completes_graph_at_max_neighbors(self, mock_print):
+        """Test that a capped k still pairs every row, without growing k."""
+        # Arrange - all sources share the same nearest targets
+        triangles_a = [TRIANGLES_SET_A[0]] * 40
+        triangles_b = _grid_triangles(7, seed=5)[:40]
+        info = {}
+
+        # Act
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="sparse",
+            solver_options={"max_neighbors": 8},
+            info=info,
+        )
+
+        # Assert
+        assert sorted(p["to_index"] for p in result) == list(range(40))
+        assert info["neighbors"] == 8
+        assert not any("retrying" in str(call) for call in mock_print.call_args_list)
+
+    @patch("builtins.print")
+    def test_handles_different_size_triangle_sets(self, mock_print):
+        """Test that the sparse solver pairs every triangle of the smaller set."""
+        # Act
+        result = create_transition(
+            TRIANGLES_SET_A, TRIANGLES_SET_B[:2], solver="sparse"
+        )
+
+        # Assert
+        assert len(result) == 2
+        assert sorted(p["to_index"] for p in result) == [0, 1]
+
+    def test_rejects_unknown_solver(self):
+        """Test that an unknown solver name raises ValueError."""
+        with pytest.raises(ValueError):
+            create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B, solver="magic")
+
+
+@pytest.mark.usefixtures("kernel_backend")
+class TestAuctionSolver:
+    """Tests for the auction solver and pluggable solver selection."""
+
+    @patch("builtins.print")
+    def test_within_reported_bound_of_hungarian(self, mock_print):
+        """Test that the auction total is within its reported optimality bound."""
+        # Arrange
+        triangles_a = _grid_triangles(12, seed=6)
+        triangles_b = _grid_triangles(12, seed=7)
+        info = {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="auction",
+            solver_options={"epsilon": 0.5},
+            info=info,
+        )
+
+        # Assert
+        exact_total = sum(p["distance"] for p in exact)
+        total = sum(p["distance"] for p in result)
+        assert info["epsilon"] == 0.5
+        assert info["optimality_bound"] == pytest.approx(0.5 * 144)
+        assert exact_total - 1e-9 <= total <= exact_total + info["optimality_bound"]
+        assert sorted(p["to_index"] for p in result) == list(range(144))
+
+    @patch("builtins.print")
+    def test_more_columns_than_rows_within_bound(self, mock_print):
+        """Test that unpaired columns do not spoil the auction bound."""
+        # Arrange
+        triangles_a = _random_triangles(150, seed=65)
+        triangles_b = _random_triangles(170, seed=66)
+        info = {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a, triangles_b, solver="auction", info=info
+        )
+        sparse = create_transition(triangles_a, triangles_b, solver="sparse")
+
+        # Assert
+        exact_total = exact.matched().total_distance()
+        total = result.matched().total_distance()
+        assert len(result.matched()) == 150
+        assert exact_total - 1e-6 <= total <= exact_total + info["optimality_bound"]
+        # The sparse bound only holds on its candidate graph
+        assert sparse.matched().total_distance() <= exact_total * 1.01
+
+    @patch("builtins.print")
+    def test_time_limit_returns_complete_assignment(self, mock_print):
+        """Test that a tiny time limit still returns a full pairing."""
+        # Arrange
+        triangles_a = _grid_triangles(15, seed=8)
+        triangles_b = _grid_triangles(15, seed=9)
+        info = {}
+
+        # Act
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="auction",
+            solver_options={"time_limit": 0.0},
+            info=info,
+        )
+
+        # Assert - stops after the first scaling phase with a coarse bound
+        assert sorted(p["to_index"] for p in result) == list(range(225))
+        assert info["epsilon"] > 0.1
+
+    @patch("builtins.print")
+    def test_time_limit_interrupts_first_phase(self, mock_print):
+        """Test that an expired deadline cuts the first scaling phase short."""
+        # Arrange
+        triangles_a = _random_triangles(200, seed=80)
+        triangles_b = _random_triangles(200, seed=81)
+        costs = calculate_cost_matrix(triangles_a, triangles_b)
+        info = {}
+
+        # Act
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="auction",
+            solver_options={"time_limit": 0.0},
+            info=info,
+        )
+
+        # Assert - finished at an epsilon above the cost range
+        assert sorted(p["to_index"] for p in result) == list(range(200))
+        assert info["epsilon"] > costs.max() - costs.min()
+
+    @patch("builtins.print")
+    def test_default_tolerance_is_relative(self, mock_print):
+        """Test that the default epsilon bounds the excess relative to the optimum."""
+        # Arrange
+        triangles_a = _random_triangles(200, seed=82)
+        triangles_b = _random_triangles(200, seed=83)
+        costs = calculate_cost_matrix(triangles_a, triangles_b)
+        info, exact_info = {}, {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a, triangles_b, solver="auction", info=info
+        )
+        create_transition(
+            triangles_a,
+            triangles_b,
+            solver="auction",
+            solver_options={"exact": True},
+            info=exact_info,
+        )
+
+        # Assert
+        exact_total = exact.total_distance()
+        assert info["epsilon"] == pytest.approx(
+            AUCTION_RELATIVE_TOLERANCE * costs.min(axis=1).mean()
+        )
+        assert info["optimality_bound"] <= AUCTION_RELATIVE_TOLERANCE * exact_total
+        assert result.total_distance() <= exact_total + info["optimality_bound"]
+        assert exact_info["epsilon"] == pytest.approx(AUCTION_TOLERANCE / 200)
+
+    @patch("builtins.print")
+    def test_accepts_callable_and_registered_solvers(self, mock_print):
+        """Test that create_transition dispatches to custom solvers."""
+
+        # Arrange - a solver that pairs triangles in list order
+        def identity_solver(row_triangles, col_triangles):
+            indices = np.arange(len(row_triangles))
+            return indices, indices, np.zeros(len(indices)), {"custom": True}
+
+        info = {}
+
+        # Act
+        direct = create_transition(
+            TRIANGLES_SET_A, TRIANGLES_SET_C, solver=identity_solver, info=info
+        )
+        with patch.dict("triangle_slideshow.transition.SOLVERS"):
+            register_solver("identity", identity_solver)
+            registered = create_transition(
+                TRIANGLES_SET_A, TRIANGLES_SET_C, solver="identity"
+            )
+
+        # Assert
+        assert info["custom"] is True
+        assert [p["to_index"] for p in direct] == [0, 1, 2]
+        assert direct == registered
+
+
+class TestPartitionedSolver:
+    """Tests for the quadtree-partitioned transition solver."""
+
+    def test_partition_cells_cover_both_sets(self):
+        """Test that every triangle lands in exactly one cell of bounded size."""
+        # Arrange
+        centroids_rows = calculate_centroids(_grid_triangles(20, seed=10))
+        centroids_cols = calculate_centroids(_grid_triangles(20, seed=11))
+
+        # Act
+        cells = partition_cells(centroids_rows, centroids_cols, cell_size=50)
+
+        # Assert
+        assert len(cells) > 1
+        rows = np.concatenate([r for r, _, _ in cells])
+        cols = np.concatenate([c for _, c, _ in cells])
+        assert sorted(rows) == list(range(400))
+        assert sorted(cols) == list(range(400))
+        assert all(max(len(r), len(c)) <= 50 for r, c, _ in cells)
+
+    def test_partition_cells_stops_on_coincident_points(self):
+        """Test that identical centroids end up in one cell instead of recursing."""
+        # Arrange
+        centroids = np.zeros((10, 2))
+
+        # Act
+        cells = partition_cells(centroids, centroids, cell_size=4)
+
+        # Assert
+        assert len(cells) == 1
+
+    @patch("builtins.print")
+    def test_close_to_exact_solution(self, mock_print):
+        """Test that the partitioned solver pairs everything near-optimally."""
+        # Arrange
+        triangles_a = _grid_triangles(20, seed=12)
+        triangles_b = _grid_triangles(20, seed=13)
+        info = {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="partitioned",
+            solver_options={"cell_size": 50, "workers": 1},
+            info=info,
+        )
+
+        # Assert
+        assert info["cells"] > 1
+        assert sorted(p["to_index"] for p in result) == list(range(400))
+        exact_total = sum(p["distance"] for p in exact)
+        assert sum(p["distance"] for p in result) <= 1.1 * exact_total
+
+    @patch("builtins.print")
+    def test_global_pass_stays_small(self, mock_print):
+        """Test that only a small share of triangles is re-paired globally."""
+        # Arrange
+        triangles_a = _grid_triangles(48, seed=90)
+        triangles_b = _grid_triangles(48, seed=91)
+        info = {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="partitioned",
+            solver_options={"cell_size": 576, "workers": 1},
+            info=info,
+        )
+
+        # Assert
+        assert info["cells"] > 1
+        assert info["boundary"] <= 0.15 * 48 * 48
+        assert result.total_distance() <= 1.01 * exact.total_distance()
+
+    @patch("builtins.print")
+    def test_process_pool_matches_in_process_solve(self, mock_print):
+        """Test that solving cells on a process pool gives the same pairings."""
+        # Arrange
+        triangles_a = _grid_triangles(15, seed=14)
+        triangles_b = _grid_triangles(15, seed=15)
+        options = {"cell_size": 40}
+
+        # Act
+        serial = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="partitioned",
+            solver_options={**options, "workers": 1},
+        )
+        parallel = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="partitioned",
+            solver_options={**options, "workers": 2},
+        )
+
+        # Assert
+        assert serial == parallel
+
+
+class TestMultilevelSolver:
+    """Tests for the multilevel k-means cluster solver."""
+
+    def test_blocks_cover_both_sets(self):
+        """Test that blocks are small, disjoint and hold every row."""
+        # Arrange
+        centroids_rows = calculate_centroids(_random_triangles(300, seed=40))
+        centroids_cols = calculate_centroids(_random_triangles(360, seed=41))
+
+        # Act
+        blocks, levels = multilevel_blocks(
+            centroids_rows, centroids_cols, block_size=40, clusters=4
+        )
+
+        # Assert
+        assert len(blocks) > 1 and levels > 1
+        rows = np.concatenate([r for r, _ in blocks])
+        cols = np.concatenate([c for _, c in blocks])
+        assert sorted(rows) == list(range(300))
+        assert len(set(cols)) == len(cols)
+        assert all(len(r) <= len(c) <= 40 for r, c in blocks)
+
+    def test_refinement_skips_groups_over_twice_the_block_size(self):
+        """Test that refinement solves groups of up to 2 * block_size columns."""
+        # Arrange: two distant groups of 4 pairs, with 4 and 5 unpaired
+        # columns next to them
+        rng = np.random.default_rng(44)
+        points_rows = np.concatenate([rng.random((4, 2)), rng.random((4, 2)) + 100.0])
+        points_cols = np.concatenate(
+            [points_rows, rng.random((4, 2)), rng.random((5, 2)) + 100.0]
+        )
+        assignment = np.arange(8)
+        solved = []
+
+        def solve(rows, cols):
+            solved.append(len(cols))
+            return np.arange(len(rows)), np.arange(len(rows))
+
+        # Act
+        transition_module._refine_pairs(
+            points_rows, points_cols, assignment, solve, 4, np.random.default_rng(0)
+        )
+
+        # Assert
+        assert solved == [8]
+        assert list(assignment) == list(range(8))
+
+    @patch("builtins.print")
+    def test_close_to_exact_solution(self, mock_print):
+        """Test that the multilevel solver pairs everything near-optimally."""
+        # Arrange
+        triangles_a = _grid_triangles(20, seed=42)
+        triangles_b = _grid_triangles(20, seed=43)
+        info = {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="multilevel",
+            solver_options={"block_size": 50},
+            info=info,
+        )
+
+        # Assert
+        assert info["blocks"] > 1
+        assert sorted(p["to_index"] for p in result) == list(range(400))
+        exact_total = sum(p["distance"] for p in exact)
+        assert sum(p["distance"] for p in result) <= 1.1 * exact_total
+
+    @patch("builtins.print")
+    def test_handles_different_size_triangle_sets(self, mock_print):
+        """Test that every triangle of the smaller set gets a distinct partner."""
+        # Arrange
+        triangles_a = _random_triangles(150, seed=44)
+        triangles_b = _random_triangles(90, seed=45)
+
+        # Act
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="multilevel",
+            solver_options={"block_size": 30},
+        )
+
+        # Assert
+        assert sorted(p["to_index"] for p in result) == list(range(90))
+        assert len({p["from_index"] for p in result}) == 90
+
+
+class TestSinkhornSolver:
+    """Tests for the tiled entropic optimal-transport solver."""
+
+    @patch("builtins.print")
+    def test_close_to_exact_solution(self, mock_print):
+        """Test that the rounded plan is a full permutation near the optimum."""
+        # Arrange
+        triangles_a = _grid_triangles(16, seed=25)
+        triangles_b = _grid_triangles(16, seed=26)
+        info = {}
+
+        # Act
+        exact = create_transition(triangles_a, triangles_b)
+        result = create_transition(
+            triangles_a, triangles_b, solver="sinkhorn", info=info
+        )
+
+        # Assert
+        assert sorted(p["to_index"] for p in result) == list(range(256))
+        exact_total = sum(p["distance"] for p in exact)
+        assert sum(p["distance"] for p in result) <= 1.01 * exact_total
+        assert info["lower_bound"] <= exact_total + 1e-6
+        assert info["iterations"] <= 20
+        assert info["regularization"] > 0
+
+    @patch("builtins.print")
+    def test_handles_different_size_triangle_sets(self, mock_print):
+        """Test that every triangle of the smaller set gets a distinct partner."""
+        # Arrange
+        triangles_a = _random_triangles(90, seed=27)
+        triangles_b = _random_triangles(150, seed=28)
+
+        # Act
+        result = create_transition(triangles_a, triangles_b, solver="sinkhorn")
+
+        # Assert
+        assert sorted(p["from_index"] for p in result) == list(range(90))
+        assert len({p["to_index"] for p in result}) == 90
+
+    def test_rejects_zero_iterations(self):
+        """Test that at least one Sinkhorn iteration is required."""
+        with pytest.raises(ValueError):
+            create_transition(
+                TRIANGLES_SET_A,
+                TRIANGLES_SET_B,
+                solver="sinkhorn",
+                solver_options={"iterations": 0},
+            )
+
+    @patch("builtins.print")
+    def test_evaluates_kernel_in_tiles(self, mock_print):
+        """Test that no cost block larger than one tile pair is built."""
+        # Arrange
+        triangles_a = _grid_triangles(20, seed=29)
+        triangles_b = _grid_triangles(20, seed=30)
+
+        # Act
+        with patch.object(
+            transition_module,
+            "_distance_matrix",
+            wraps=transition_module._distance_matrix,
+        ) as mock_distance, patch(
+            "triangle_slideshow.transition.calculate_cost_matrix"
+        ) as mock_ccm:
+            result = create_transition(
+                triangles_a,
+                triangles_b,
+                solver="sinkhorn",
+                solver_options={"tile_size": 50, "iterations": 20},
+            )
+
+        # Assert
+        mock_ccm.assert_not_called()
+        block_sides = [
+            max(len(call.args[0]), len(call.args[1]))
+            for call in mock_distance.call_args_list
+        ]
+        assert max(block_sides) <= 50
+        assert sorted(p["to_index"] for p in result) == list(range(400))
+
+
+@pytest.mark.usefixtures("kernel_backend")
+class TestGreedySolver:
+    """Tests for the greedy nearest-pair-first solver."""
+
+    @patch("builtins.print")
+    def test_takes_shortest_free_pair_first(self, mock_print):
+        """Test that the matching equals a brute-force greedy matching."""
+        # Arrange - a few candidates per row forces kd-tree re-queries
+        triangles_a = _random_triangles(120, seed=1)
+        triangles_b = _random_triangles(150, seed=2)
+        cost = calculate_cost_matrix(triangles_a, triangles_b)
+        expected = {}
+        for index in np.argsort(cost, axis=None, kind="stable"):
+            row, col = np.unravel_index(index, cost.shape)
+            if row not in expected and col not in expected.values():
+                expected[row] = col
+
+        # Act
+        result = create_transition(
+            triangles_a, triangles_b, solver="greedy", solver_options={"k": 2}
+        )
+
+        # Assert
+        assert {p["from_index"]: p["to_index"] for p in result} == expected
+        for pairing in result:
+            assert pairing["distance"] == pytest.approx(
+                cost[pairing["from_index"], pairing["to_index"]]
+            )
+
+    @patch("builtins.print")
+    def test_close_to_exact_solution_on_grid(self, mock_print):
+        """Test that greedy pairs every triangle at a modest extra distance."""
+        # Arrange
+        triangles_a = _grid_triangles(20, seed=1)
+        triangles_b = _grid_triangles(20, seed=2)
+
+        # Act
+        greedy = create_transition(triangles_a, triangles_b, solver="greedy")
+        exact = create_transition(triangles_a, triangles_b)
+
+        # Assert
+        assert sorted(p["to_index"] for p in greedy) == list(range(400))
+        greedy_total = sum(p["distance"] for p in greedy)
+        exact_total = sum(p["distance"] for p in exact)
+        assert exact_total <= greedy_total < 1.5 * exact_total
+
+
+def _stalling_solver(row_triangles, col_triangles, **options):
+    """Solver that never finishes in time, standing in for a pathological solve."""
+    time.sleep(60)
+
+
+def _failing_solver(row_triangles, col_triangles, **options):
+    raise ValueError("solver failed")
+
+
+class TestDeadline:
+    """Tests for the per-transition deadline and fallback solver."""
+
+    @patch("builtins.print")
+    def test_missed_deadline_falls_back(self, mock_print):
+        """Test that a stalled solve is killed and solved approximately."""
+        # Arrange
+        triangles_a = _random_triangles(40, seed=1)
+        triangles_b = _random_triangles(40, seed=2)
+        info = {}
+
+        # Act
+        start = time.time()
+        result = create_transition(
+            triangles_a, triangles_b, solver=_stalling_solver, info=info, deadline=0.5
+        )
+
+        # Assert
+        assert time.time() - start < 10
+        assert result == create_transition(triangles_a, triangles_b, solver="greedy")
+        assert info["approximate"] is True
+        assert info["fallback_solver"] == "greedy"
+        assert info["cost"] == pytest.approx(sum(p["distance"] for p in result))
+
+    @patch("builtins.print")
+    def test_met_deadline_keeps_exact_solution(self, mock_print):
+        """Test that a solve within its deadline is returned unchanged."""
+        # Arrange
+        info = {}
+
+        # Act
+        result = create_transition(
+            TRIANGLES_SET_A, TRIANGLES_SET_C, info=info, deadline=30.0
+        )
+
+        # Assert
+        assert result == create_transition(TRIANGLES_SET_A, TRIANGLES_SET_C)
+        assert "approximate" not in info
+
+    @patch("builtins.print")
+    def test_solver_errors_are_raised(self, mock_print):
+        """Test that an exception in the solver process reaches the caller."""
+        with pytest.raises(ValueError, match="solver failed"):
+            create_transition(
+                TRIANGLES_SET_A, TRIANGLES_SET_C, solver=_failing_solver, deadline=30.0
+            )
+
+    def test_rejects_unknown_fallback_solver(self):
+        """Test that an unknown fallback solver raises a ValueError."""
+        with pytest.raises(ValueError):
+            create_transition(
+                TRIANGLES_SET_A,
+                TRIANGLES_SET_C,
+                deadline=1.0,
+                fallback_solver="missing",
+            )
+
+
+class TestCostMatrixPool:
+    """Tests for the reusable cost matrix buffers."""
+
+    @patch("builtins.print")
+    def test_consecutive_solves_reuse_one_buffer(self, mock_print):
+        """Test that same-sized transitions allocate their matrix once."""
+        # Arrange
+        pool = CostMatrixPool()
+        slides = [_random_triangles(30, seed=seed) for seed in range(4)]
+
+        # Act
+        with patch.object(transition_module, "COST_MATRIX_POOL", pool):
+            results = [create_transition(slides[i], slides[i + 1]) for i in range(3)]
+            larger = create_transition(
+                _random_triangles(40, seed=5), _random_triangles(50, seed=6)
+            )
+
+        # Assert
+        assert pool.stats() == {
+            "allocations": 2,
+            "reuses": 2,
+            "bytes": 40 * 50 * 8,
+            "peak_bytes": 40 * 50 * 8,
+        }
+        assert results[0] == create_transition(slides[0], slides[1])
+        assert len(larger) == 40
+
+    def test_concurrent_borrowers_get_separate_buffers(self):
+        """Test that a buffer is never lent out twice at the same time."""
+        # Arrange
+        pool = CostMatrixPool()
+
+        # Act
+        with pool.matrix(3, 4) as first, pool.matrix(3, 4) as second:
+            first[...] = 1.0
+            second[...] = 2.0
+
+            # Assert
+            assert not np.shares_memory(first, second)
+            assert first.sum() == 12.0
+        assert pool.stats()["peak_bytes"] == 2 * 3 * 4 * 8
+        assert pool.stats()["bytes"] == 3 * 4 * 8
+
+    @patch("builtins.print")
+    def test_float32_pool_for_auction(self, mock_print):
+        """Test that a float32 pool gives the auction a half-size matrix."""
+        # Arrange
+        pool = CostMatrixPool(dtype=np.float32)
+        triangles_a = _random_triangles(30, seed=1)
+        triangles_b = _random_triangles(30, seed=2)
+
+        # Act
+        with patch.object(transition_module, "COST_MATRIX_POOL", pool):
+            result = create_transition(triangles_a, triangles_b, solver="auction")
+
+        # Assert
+        assert pool.stats()["peak_bytes"] == 30 * 30 * 4
+        exact = create_transition(triangles_a, triangles_b)
+        assert sum(p["distance"] for p in result) == pytest.approx(
+            sum(p["distance"] for p in exact), abs=1.0
+        )
+
+
+class TestTransitionArrays:
+    """Tests for the array-backed Transition class."""
+
+    @patch("builtins.print")
+    def test_typed_arrays_with_dict_views(self, mock_print):
+        """Test that a transition stores arrays but reads like pairing dicts."""
+        # Act
+        result = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B)
+
+        # Assert
+        assert isinstance(result, Transition)
+        assert result.to_index.dtype == np.int32
+        assert result.distance.dtype == np.float32
+        assert result.nbytes == 13 * len(result)
+        assert result[0] == {
+            "from_index": int(result.from_index[0]),
+            "to_index": int(result.to_index[0]),
+            "distance": float(result.distance[0]),
+        }
+        assert list(result) == result.to_list()
+        assert result == result.to_list()
+        assert result[1:] == result.to_list()[1:]
+        assert result.total_distance() == pytest.approx(
+            sum(p["distance"] for p in result)
+        )
+
+    def test_compares_with_pairing_lists(self):
+        """Test equality with lists of pairing dicts at float32 precision."""
+        pairings = [
+            {"from_index": 0, "to_index": 2, "distance": 1.5},
+            {"from_index": 1, "to_index": 0, "distance": 0.1},
+        ]
+        transition = Transition.from_pairings(pairings)
+        assert transition == pairings
+        assert transition != pairings[:1]
+        assert transition != [{"from_index": 0}]
+        assert Transition.from_pairings(transition) is transition
+        with pytest.raises(ValueError):
+            Transition([0, 1], [1], [0.0])
+
+    @patch("builtins.print")
+    def test_json_matches_pairings(self, mock_print):
+        """Test that the vectorised JSON holds the same pairings."""
+        # Arrange
+        result = create_transition(
+            _random_triangles(50, seed=1), _random_triangles(60, seed=2)
+        )
+
+        # Act
+        data = json.loads(result.to_json())
+
+        # Assert
+        assert Transition.from_pairings(data) == result
+        assert set(data[0]) == {"from_index", "to_index", "distance"}
+        assert Transition().to_json() == "[]"
+
+
+class TestAnchorUnmatched:
+    """Tests for fade and spawn entries of unequal triangle counts."""
+
+    @patch("builtins.print")
+    def test_unmatched_targets_spawn_from_nearest_source(self, mock_print):
+        """Test that surplus target triangles spawn from their nearest source."""
+        # Arrange
+        triangles_a = _random_triangles(5, seed=1)
+        triangles_b = _random_triangles(8, seed=2)
+
+        # Act
+        result = create_transition(triangles_a, triangles_b, anchor=True)
+
+        # Assert
+        assert result.matched() == create_transition(triangles_a, triangles_b)
+        spawns = [p for p in result if p.get("type") == "spawn"]
+        assert len(result) == 8 and len(spawns) == 3
+        assert sorted(p["to_index"] for p in result) == list(range(8))
+        centroids_a = calculate_centroids(triangles_a)
+        centroids_b = calculate_centroids(triangles_b)
+        for p in spawns:
+            gaps = np.linalg.norm(centroids_a - centroids_b[p["to_index"]], axis=1)
+            assert p["from_index"] == int(np.argmin(gaps))
+            assert p["distance"] == pytest.approx(gaps.min(), rel=1e-5)
+        assert pairings_to_assignment(result, 5).min() >= 0
+
+    @patch("builtins.print")
+    def test_reverse_fades_and_json(self, mock_print):
+        """Test that reversing turns spawns into fades and JSON keeps the type."""
+        # Arrange
+        forward = create_transition(
+            _random_triangles(5, seed=1), _random_triangles(8, seed=2), anchor=True
+        )
+
+        # Act
+        result = reverse_pairings(forward)
+        data = json.loads(result.to_json())
+
+        # Assert
+        assert [p.get("type") for p in data].count("fade") == 3
+        assert "spawn" not in [p.get("type") for p in data]
+        assert Transition.from_pairings(data) == result
+        assert reverse_pairings(result) == forward
+
+    @patch("builtins.print")
+    def test_equal_counts_add_nothing(self, mock_print):
+        """Test that equal triangle counts leave the pairings unchanged."""
+        result = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B, anchor=True)
+        assert result == create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B)
+        assert anchor_unmatched(result, [], TRIANGLES_SET_B) == result
+
+
+@pytest.mark.usefixtures("kernel_backend")
+class TestWarmStart:
+    """Tests for warm-started auction solves."""
+
+    def test_compose_assignments(self):
+        """Test that composition follows both steps and keeps unpaired markers."""
+        # Arrange
+        first = np.array([2, 0, -1, 1])
+        second = np.array([1, -1, 0])
+
+        # Act
+        result = compose_assignments(first, second)
+
+        # Assert
+        np.testing.assert_array_equal(result, [0, 1, -1, -1])
+
+    def test_pairings_to_assignment(self):
+        """Test conversion of pairings to a target index per source triangle."""
+        # Act
+        result = pairings_to_assignment(EXPECTED_PAIRINGS, 4)
+
+        # Assert
+        np.testing.assert_array_equal(
+            result, [p["to_index"] for p in EXPECTED_PAIRINGS] + [-1]
+        )
+
+    @pytest.mark.parametrize("solver", ["auction", "sparse"])
+    @patch("builtins.print")
+    def test_optimal_seed_is_returned_without_bidding(self, mock_print, solver):
+        """Test that a seed already within tolerance stops the solve immediately."""
+        # Arrange
+        triangles_a = _grid_triangles(10, seed=16)
+        triangles_b = _grid_triangles(10, seed=17)
+        cold_info = {}
+        cold = create_transition(
+            triangles_a, triangles_b, solver=solver, info=cold_info
+        )
+        seed = pairings_to_assignment(cold, 100)
+        info = {}
+
+        # Act
+        with patch("triangle_slideshow.transition.np.lexsort") as mock_lexsort:
+            warm = create_transition(
+                triangles_a,
+                triangles_b,
+                solver=solver,
+                info=info,
+                warm_start=(seed, cold_info["target_prices"]),
+            )
+
+        # Assert
+        mock_lexsort.assert_not_called()
+        assert info["warm_start_kept"] == 1.0
+        assert warm == cold
+
+    @patch("builtins.print")
+    def test_composed_seed_reaches_cold_optimum(self, mock_print):
+        """Test that a composed A->B->C seed still solves A->C to tolerance."""
+        # Arrange
+        triangles = [_grid_triangles(12, seed=seed) for seed in (18, 19, 20)]
+        ab_info, bc_info = {}, {}
+        ab = create_transition(*triangles[:2], solver="auction", info=ab_info)
+        bc = create_transition(*triangles[1:], solver="auction", info=bc_info)
+        seed = compose_assignments(
+            pairings_to_assignment(ab, 144), pairings_to_assignment(bc, 144)
+        )
+        info = {}
+
+        # Act
+        exact = create_transition(triangles[0], triangles[2])
+        warm = create_transition(
+            triangles[0],
+            triangles[2],
+            solver="auction",
+            info=info,
+            warm_start=(seed, bc_info["target_prices"]),
+        )
+
+        # Assert
+        exact_total = sum(p["distance"] for p in exact)
+        total = sum(p["distance"] for p in warm)
+        assert sorted(p["to_index"] for p in warm) == list(range(144))
+        assert total <= exact_total + info["optimality_bound"] + 1e-9
+        assert 0.0 <= info["warm_start_kept"] <= 1.0
+
+    def test_rejects_warm_start_for_unsupported_solver(self):
+        """Test that a warm start for the Hungarian solver raises a ValueError."""
+        with pytest.raises(ValueError, match="warm start"):
+            create_transition(
+                TRIANGLES_SET_A, TRIANGLES_SET_B, warm_start=(np.arange(3), None)
+            )
+
+
+class TestWeightedCost:
+    """Tests for the multi-feature transition cost."""
+
+    def test_features_layout(self):
+        """Test centroid, colour, area and orientation features of a triangle."""
+        # Arrange
+        triangles = [
+            {"coordinates": [[0, 0], [30, 0], [0, 3]], "color": [255, 255, 255]},
+            {"coordinates": [[0, 0], [3, 0], [0, 30]], "color": [0, 0, 0]},
+        ]
+
+        # Act
+        features = calculate_features(triangles)
+
+        # Assert
+        assert features.dtype == np.float32
+        assert features.flags["C_CONTIGUOUS"]
+        np.testing.assert_allclose(features[:, 0:2], [[10, 1], [1, 10]], atol=1e-5)
+        np.testing.assert_allclose(features[0, 5:8], [100, 0, 0], atol=0.05)
+        np.testing.assert_allclose(features[1, 5:8], [0, 0, 0], atol=1e-5)
+        np.testing.assert_allclose(features[:, 8], np.log(45), rtol=1e-6)
+        # Long x and long y triangles point in opposite orientation directions
+        assert features[0, 9] > 0.4 and features[1, 9] < -0.4
+
+    @patch("builtins.print")
+    def test_matrix_matches_pair_costs(self, mock_print):
+        """Test the batched cost matrix against the per-pair cost."""
+        # Arrange
+        triangles_a = _random_triangles(30, seed=21)
+        triangles_b = _random_triangles(40, seed=22)
+        for index, triangle in enumerate(triangles_a + triangles_b):
+            triangle["color"] = [(index * 37) % 256, (index * 91) % 256, 128]
+        weights = {"position": 1.0, "color": 0.5, "area": 3.0, "orientation": 2.0}
+        features_a = calculate_features(triangles_a)
+        features_b = calculate_features(triangles_b)
+
+        # Act
+        matrix = calculate_cost_matrix(triangles_a, triangles_b, weights=weights)
+
+        # Assert
+        rows, cols = np.meshgrid(np.arange(30), np.arange(40), indexing="ij")
+        expected = pair_costs(
+            features_a[rows.ravel()], features_b[cols.ravel()], weights
+        ).reshape(30, 40)
+        np.testing.assert_allclose(matrix, expected, rtol=1e-4, atol=1e-3)
+
+    @patch("builtins.print")
+    def test_position_weight_matches_plain_distance(self, mock_print):
+        """Test that {"position": 1} is the plain centroid distance."""
+        # Act
+        plain = calculate_cost_matrix(TRIANGLES_SET_A, TRIANGLES_SET_B)
+        weighted = calculate_cost_matrix(
+            TRIANGLES_SET_A, TRIANGLES_SET_B, weights={"position": 1.0, "color": 0}
+        )
+
+        # Assert
+        np.testing.assert_array_equal(plain, weighted)
+
+    @pytest.mark.parametrize(
+        "solver",
+        ["hungarian", "auction", "sparse", "partitioned", "sinkhorn", "greedy"],
+    )
+    @patch("builtins.print")
+    def test_color_weight_keeps_colours_together(self, mock_print, solver):
+        """Test that a colour weight pairs equal colours over equal positions."""
+        # Arrange - the same two positions, with the colours swapped
+        triangles_a = [
+            {"coordinates": [[0, 0], [10, 0], [5, 10]], "color": [255, 0, 0]},
+            {"coordinates": [[12, 0], [22, 0], [17, 10]], "color": [0, 0, 255]},
+        ]
+        triangles_b = [
+            {"coordinates": [[0, 0], [10, 0], [5, 10]], "color": [0, 0, 255]},
+            {"coordinates": [[12, 0], [22, 0], [17, 10]], "color": [255, 0, 0]},
+        ]
+
+        # Act
+        plain = create_transition(triangles_a, triangles_b, solver=solver)
+        colored = create_transition(
+            triangles_a,
+            triangles_b,
+            solver=solver,
+            cost_weights={"position": 1.0, "color": 1.0},
+        )
+
+        # Assert
+        assert [p["to_index"] for p in plain] == [0, 1]
+        assert [p["to_index"] for p in colored] == [1, 0]
+        assert colored[0]["distance"] == pytest.approx(12.0, abs=1e-3)
+
+    @pytest.mark.parametrize(
+        "weights", [{"size": 1.0}, {"position": -1.0}, {"position": 0.0}]
+    )
+    def test_rejects_invalid_weights(self, weights):
+        """Test that unknown terms and non-positive weights raise a ValueError."""
+        with pytest.raises(ValueError):
+            create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B, cost_weights=weights)
+
+
+class TestAutomaticSolverSelection:
+    """Tests for memory-budget-driven solver selection."""
+
+    def test_small_sets_use_dense_solver(self):
+        """Test that the exact dense solver is used while it fits."""
+        solver, options, reason = select_solver(1000, 1200, 64 * 1024 * 1024)
+        assert (solver, options) == ("hungarian", {})
+        assert "dense 1000 x 1200 cost matrix" in reason
+
+    def test_dense_over_budget_uses_sparse_solver(self):
+        """Test that a cost matrix beyond the budget switches to the sparse solver."""
+        solver, options, reason = select_solver(1000, 1000, 4 * 1024 * 1024)
+        assert solver == "sparse"
+        assert "dense cost matrix needs 15.3 MB of 4.0 MB" in reason
+        assert estimate_transition_memory(1000, 1000, solver, options) <= (
+            4 * 1024 * 1024
+        )
+
+    def test_large_sets_use_sparse_solver_without_budget(self):
+        """Test that the O(n^3) dense solve is avoided for large sets."""
+        solver, _, reason = select_solver(20000, 20000)
+        assert solver == "sparse"
+        assert "exceed the dense limit" in reason
+
+    def test_tight_budget_uses_multilevel_solver(self):
+        """Test that blocks are shrunk to fit a budget the sparse solver exceeds."""
+        solver, options, _ = select_solver(2000, 2000, 1024 * 1024)
+        assert solver == "multilevel"
+        assert (2 * options["block_size"]) ** 2 * 8 <= 1024 * 1024
+        assert estimate_transition_memory(2000, 2000, solver, options) <= 1024 * 1024
+
+    def test_sparse_budget_caps_neighbors(self):
+        """Test that k may only double as far as the budget allows."""
+        small = estimate_transition_memory(20000, 20000, "sparse", {})
+        solver, options, _ = select_solver(20000, 20000, 2 * small)
+        assert solver == "sparse"
+        assert options["max_neighbors"] == 4 * SPARSE_NEIGHBORS
+        assert estimate_transition_memory(20000, 20000, solver, options) <= 2 * small
+
+    def test_partitioned_estimate_counts_cell_workers(self):
+        """Test that every cell worker process adds a cost block to the estimate."""
+        options = {"cell_size": 2000}
+        single = estimate_transition_memory(
+            8000, 8000, "partitioned", {**options, "workers": 1}
+        )
+        parallel = estimate_transition_memory(
+            8000, 8000, "partitioned", {**options, "workers": 4}
+        )
+        assert parallel - single == 3 * 2000 * 2000 * 16
+
+    def test_partitioned_estimate_counts_boundary_band(self):
+        """Test that the global re-pair of the boundary band is in the estimate."""
+        estimate = estimate_transition_memory(
+            20000, 20000, "partitioned", {"cell_size": 100, "workers": 1}
+        )
+        assert estimate > estimate_transition_memory(20000, 20000, "sparse")
+
+    @patch("builtins.print")
+    def test_auto_solver_pairs_every_triangle(self, mock_print):
+        """Test that solver="auto" pairs all triangles and logs its choice."""
+        # Arrange
+        triangles_a = _grid_triangles(20, seed=23)
+        triangles_b = _grid_triangles(20, seed=24)
+        info = {}
+
+        # Act
+        result = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="auto",
+            memory_budget=1024 * 1024,
+            info=info,
+        )
+
+        # Assert
+        assert info["solver"] == "sparse"
+        assert sorted(p["to_index"] for p in result) == list(range(400))
+        mock_print.assert_any_call(f"Using sparse solver: {info['solver_reason']}")
+
+    @pytest.mark.parametrize(
+        "budget, expected",
+        [(2 * 1024 * 1024, "multilevel"), (4 * 1024 * 1024, "sparse")],
+    )
+    @patch("builtins.print")
+    def test_auto_solver_stays_within_budget(self, mock_print, budget, expected):
+        """Test that the measured peak memory of an auto solve fits its budget."""
+        # Arrange
+        triangles_a = _random_triangles(1500, seed=25)
+        triangles_b = _random_triangles(1500, seed=26)
+        info = {}
+
+        # Act
+        tracemalloc.start()
+        try:
+            create_transition(
+                triangles_a,
+                triangles_b,
+                solver="auto",
+                memory_budget=budget,
+                info=info,
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Assert
+        assert info["solver"] == expected
+        assert peak <= budget
+
+    def test_auto_solver_rejects_solver_options(self):
+        """Test that "auto" does not take options meant for a specific solver."""
+        with pytest.raises(ValueError):
+            create_transition(
+                TRIANGLES_SET_A,
+                TRIANGLES_SET_B,
+                solver="auto",
+                solver_options={"epsilon": 0.1},
+            )
+
+
+class TestIdenticalTriangles:
+    """Tests for pairing identical triangles without solving."""
+
+    @patch("builtins.print")
+    def test_identical_geometry_is_identity(self, mock_print):
+        """Test that a recoloured copy of a slide pairs each triangle with itself."""
+        # Arrange
+        triangles_a = _random_triangles(50, seed=1)
+        triangles_b = [dict(t, color=[255, 255, 255]) for t in triangles_a]
+        info = {}
+
+        # Act
+        with patch.object(transition_module, "calculate_cost_matrix") as mock_matrix:
+            result = create_transition(triangles_a, triangles_b, info=info)
+
+        # Assert
+        mock_matrix.assert_not_called()
+        assert info["identical"] == 50
+        assert result == [
+            {"from_index": i, "to_index": i, "distance": 0.0} for i in range(50)
+        ]
+
+    @patch("builtins.print")
+    def test_solves_only_the_remainder(self, mock_print):
+        """Test that a partly identical slide keeps the optimal total distance."""
+        # Arrange
+        triangles_a = _random_triangles(60, seed=1)
+        others = _random_triangles(30, seed=2)
+        triangles_b = others[:20] + triangles_a[::-2] + others[20:]
+        cost = calculate_cost_matrix(triangles_a, triangles_b)
+        rows, cols = linear_sum_assignment(cost)
+        info = {}
+
+        # Act
+        result = create_transition(triangles_a, triangles_b, info=info)
+
+        # Assert
+        assert info["identical"] == 30
+        assert [p["from_index"] for p in result] == list(range(60))
+        assert sorted(p["to_index"] for p in result) == list(range(60))
+        assert sum(p["distance"] for p in result) == pytest.approx(
+            cost[rows, cols].sum()
+        )
+
+    @patch("builtins.print")
+    def test_colour_cost_needs_identical_colours(self, mock_print):
+        """Test that a colour-weighted cost only shortcuts identical colours."""
+        # Arrange
+        triangles_a = _random_triangles(20, seed=1)
+        triangles_b = [dict(t, color=[255, 255, 255]) for t in triangles_a]
+        info = {}
+
+        # Act
+        create_transition(
+            triangles_a,
+            triangles_b,
+            info=info,
+            cost_weights={"position": 1.0, "color": 1.0},
+        )
+
+        # Assert
+        assert "identical" not in info
+
+
+class TestReversePairings:
+    """Tests for inverting a transition's pairings."""
+
+    @patch("builtins.print")
+    def test_inverse_is_optimal_reverse(self, mock_print):
+        """Test that the inverted pairings solve the reverse transition."""
+        # Arrange
+        triangles_a = _random_triangles(30, seed=1)
+        triangles_b = _random_triangles(40, seed=2)
+        forward = create_transition(triangles_a, triangles_b)
+
+        # Act
+        result = reverse_pairings(forward)
+
+        # Assert
+        assert [p["from_index"] for p in result] == sorted(
+            p["to_index"] for p in forward
+        )
+        assert {(p["to_index"], p["from_index"]) for p in result} == {
+            (p["from_index"], p["to_index"]) for p in forward
+        }
+        exact = create_transition(triangles_b, triangles_a)
+        assert sum(p["distance"] for p in result) == pytest.approx(
+            sum(p["distance"] for p in exact)
+        )
+
+
+class TestRepairTransition:
+    """Tests for repairing a transition after a slide changed."""
+
+    @patch("builtins.print")
+    def test_moved_triangle_repairs_locally(self, mock_print):
+        """Test that moving one triangle keeps most pairs and stays near optimal."""
+        # Arrange
+        triangles_from = _grid_triangles(20, seed=1)
+        previous_to = _grid_triangles(20, seed=2)
+        pairings = create_transition(triangles_from, previous_to)
+        triangles_to = list(previous_to)
+        moved = np.asarray(triangles_to[0]["coordinates"]) + 30
+        triangles_to[0] = {"coordinates": moved.tolist(), "color": [0, 0, 0]}
+        info = {}
+
+        # Act
+        with patch.object(transition_module, "create_transition") as mock_create:
+            result = repair_transition(
+                pairings,
+                triangles_from,
+                triangles_to,
+                previous_to=previous_to,
+                info=info,
+            )
+
+        # Assert
+        mock_create.assert_not_called()
+        assert sorted(p["to_index"] for p in result) == list(range(400))
+        assert info["kept"] + info["repaired"] == 400
+        assert 0 < info["repaired"] <= 4
+        exact = create_transition(triangles_from, triangles_to)
+        exact_total = sum(p["distance"] for p in exact)
+        assert sum(p["distance"] for p in result) <= exact_total * 1.01
+
+    @patch("builtins.print")
+    def test_reordered_slide_keeps_all_pairs(self, mock_print):
+        """Test that reordering a slide's triangles re-pairs nothing."""
+        # Arrange
+        triangles_from = _random_triangles(50, seed=3)
+        previous_from = _random_triangles(50, seed=4)
+        pairings = create_transition(previous_from, triangles_from[:40])
+        order = np.random.default_rng(5).permutation(50)
+        shuffled = [previous_from[i] for i in order]
+        info = {}
+
+        # Act
+        result = repair_transition(
+            pairings,
+            shuffled,
+            triangles_from[:40],
+            previous_from=previous_from,
+            info=info,
+        )
+
+        # Assert
+        assert info == {"kept": 40, "repaired": 0}
+        expected = {
+            (int(np.flatnonzero(order == p["from_index"])[0]), p["to_index"])
+            for p in pairings
+        }
+        assert {(p["from_index"], p["to_index"]) for p in result} == expected
+
+    @patch("builtins.print")
+    def test_replaced_slide_is_solved_again(self, mock_print):
+        """Test that a mostly new slide falls back to a full solve."""
+        # Arrange
+        pairings = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B)
+
+        # Act
+        result = repair_transition(
+            pairings, TRIANGLES_SET_A, TRIANGLES_SET_C, previous_to=TRIANGLES_SET_B
+        )
+
+        # Assert
+        assert result == create_transition(TRIANGLES_SET_A, TRIANGLES_SET_C)
+
+    def test_empty_slide_gives_empty_transition(self):
+        """Test that a slide without triangles repairs to an empty Transition."""
+        result = repair_transition([], TRIANGLES_SET_A, [], previous_to=TRIANGLES_SET_B)
+        assert isinstance(result, Transition) and len(result) == 0
+
+
+class TestTransitionQuality:
+    """Tests for the transition lower bound and optimality gap."""
+
+    @pytest.mark.parametrize("sizes", [(120, 120), (90, 150)])
+    def test_bound_below_optimal_cost(self, sizes):
+        """Test that the bound never exceeds the exact solution."""
+        # Arrange
+        triangles_a = _random_triangles(sizes[0], seed=60)
+        triangles_b = _random_triangles(sizes[1], seed=61)
+        centroids_a = calculate_centroids(triangles_a)
+        centroids_b = calculate_centroids(triangles_b)
+        costs = np.linalg.norm(centroids_a[:, None] - centroids_b[None], axis=2)
+        rows, cols = linear_sum_assignment(costs)
+
+        # Act
+        result = transition_lower_bound(triangles_a, triangles_b)
+
+        # Assert
+        assert 0 < result <= costs[rows, cols].sum() + 1e-6
+
+    @patch("builtins.print")
+    def test_shifted_slide_has_small_gap(self, mock_print):
+        """Test that the bound of a translated slide is nearly tight."""
+        # Arrange
+        triangles_a = _random_triangles(200, seed=62)
+        triangles_b = [
+            {**t, "coordinates": [[x + 300, y] for x, y in t["coordinates"]]}
+            for t in triangles_a
+        ]
+        info = {}
+
+        # Act
+        create_transition(triangles_a, triangles_b, info=info)
+
+        # Assert
+        assert info["cost"] == pytest.approx(200 * 300, rel=1e-4)
+        assert info["lower_bound"] <= info["cost"]
+        assert info["gap"] < 0.01
+        assert info["seconds"] >= 0
+
+    @patch("builtins.print")
+    def test_solver_bounds(self, mock_print, tmp_path):
+        """Test that exact and dense auction solves report their proven gaps."""
+        # Arrange
+        triangles_a = _random_triangles(150, seed=65)
+        triangles_b = _random_triangles(170, seed=66)
+        cache = TransitionCache(tmp_path)
+        infos = {name: {} for name in ("hungarian", "cached", "auction", "greedy")}
+
+        # Act
+        create_transition(triangles_a, triangles_b, info=infos["hungarian"])
+        create_transition(triangles_a, triangles_b, cache=cache)
+        create_transition(triangles_a, triangles_b, cache=cache, info=infos["cached"])
+        create_transition(
+            triangles_a,
+            triangles_b,
+            solver="auction",
+            solver_options={"exact": True},
+            info=infos["auction"],
+        )
+        create_transition(
+            triangles_a, triangles_b, solver="greedy", info=infos["greedy"]
+        )
+
+        # Assert
+        assert infos["hungarian"]["gap"] == infos["cached"]["gap"] == 0.0
+        auction = infos["auction"]
+        assert auction["cost"] - auction["lower_bound"] <= auction["optimality_bound"]
+        assert auction["cost"] >= infos["hungarian"]["cost"] >= auction["lower_bound"]
+        assert auction["gap"] < 1e-3
+        assert "lower_bound" not in infos["greedy"] and infos["greedy"]["cost"] > 0
+
+    @pytest.mark.parametrize("cost_weights", [None, {"position": 1.0, "color": 2.0}])
+    def test_sparse_dual_bound_matches_full_matrix(self, cost_weights):
+        """Test that the tiled dual bound equals the bound over all columns."""
+        # Arrange
+        rng = np.random.default_rng(67)
+        triangles_a = _random_triangles(300, seed=67)
+        triangles_b = _random_triangles(420, seed=68)
+        for triangle in triangles_a + triangles_b:
+            triangle["color"] = rng.integers(0, 256, 3).tolist()
+        prices = rng.uniform(0, 500, 420)
+        features_a = calculate_features(triangles_a)
+        features_b = calculate_features(triangles_b)
+        if cost_weights is None:
+            points_a, points_b = (
+                calculate_centroids(t) for t in (triangles_a, triangles_b)
+            )
+            costs = calculate_cost_matrix(triangles_a, triangles_b)
+            cost = None
+        else:
+            weights = transition_module.normalize_cost_weights(cost_weights)
+            points_a = transition_module._candidate_points(features_a, weights)
+            points_b = transition_module._candidate_points(features_b, weights)
+            costs = calculate_cost_matrix(features_a, features_b, weights=weights)
+            cost = (features_a, features_b, weights)
+
+        # Act
+        result = transition_module._candidate_dual_bound(
+            points_a, points_b, prices, cost
+        )
+
+        # Assert
+        expected = transition_module._dual_bound(costs.astype(np.float64), prices)
+        assert result == pytest.approx(expected, rel=1e-4)
+
+    @pytest.mark.parametrize("sizes", [(400, 400), (150, 170)])
+    @patch("builtins.print")
+    def test_sparse_solver_bound(self, mock_print, sizes):
+        """Test that the sparse solver reports a proven bound from its prices."""
+        # Arrange
+        side = int(np.sqrt(sizes[0]))
+        if sizes[0] == sizes[1]:
+            triangles_a = _grid_triangles(side, seed=68)
+            triangles_b = _grid_triangles(side, seed=69)
+        else:
+            triangles_a = _random_triangles(sizes[0], seed=68)
+            triangles_b = _random_triangles(sizes[1], seed=69)
+        exact, sparse = {}, {}
+
+        # Act
+        create_transition(triangles_a, triangles_b, info=exact)
+        create_transition(triangles_a, triangles_b, solver="sparse", info=sparse)
+
+        # Assert
+        assert sparse["lower_bound"] <= exact["cost"] * (1 + 1e-6)
+        assert sparse["cost"] >= exact["cost"] * (1 - 1e-6)
+        if sizes[0] == sizes[1]:
+            assert sparse["gap"] < 1e-3
+
+    @patch("builtins.print")
+    def test_sparse_gap_of_near_optimal_pairing(self, mock_print):
+        """Test that the sparse bound stays close to a near-optimal random pairing."""
+        # Arrange
+        triangles_a = _random_triangles(600, seed=70)
+        triangles_b = _random_triangles(600, seed=71)
+        exact, sparse = {}, {}
+
+        # Act
+        create_transition(triangles_a, triangles_b, info=exact)
+        create_transition(triangles_a, triangles_b, solver="sparse", info=sparse)
+
+        # Assert
+        assert sparse["cost"] <= exact["cost"] * 1.01
+        assert sparse["lower_bound"] <= exact["cost"] * (1 + 1e-6)
+        assert sparse["gap"] < 0.02
+
+    @patch("builtins.print")
+    def test_estimate_raises_weak_bound(self, mock_print):
+        """Test that an estimate above the proven bound is reported instead."""
+        # Arrange
+        triangles_a = _random_triangles(150, seed=72)
+        triangles_b = _random_triangles(150, seed=73)
+        pairings = create_transition(triangles_a, triangles_b, solver="greedy")
+
+        # Act
+        proven = transition_quality(
+            pairings, triangles_a, triangles_b, lower_bound=0.0, estimate=False
+        )
+        raised = transition_quality(pairings, triangles_a, triangles_b, lower_bound=0.0)
+
+        # Assert
+        assert proven["lower_bound"] == 0.0
+        assert raised["lower_bound"] == pytest.approx(
+            transition_lower_bound(triangles_a, triangles_b)
+        )
+        assert raised["lower_bound"] > 0
+
+    @patch("builtins.print")
+    def test_gap_of_approximate_solution(self, mock_print):
+        """Test that a greedy transition reports a larger gap than the exact one."""
+        # Arrange
+        triangles_a = _random_triangles(150, seed=63)
+        triangles_b = _random_triangles(150, seed=64)
+
+        # Act
+        exact = transition_quality(
+            create_transition(triangles_a, triangles_b), triangles_a, triangles_b
+        )
+        greedy = transition_quality(
+            create_transition(triangles_a, triangles_b, solver="greedy"),
+            triangles_a,
+            triangles_b,
+        )
+
+        # Assert
+        assert exact["lower_bound"] == pytest.approx(greedy["lower_bound"])
+        assert 0 <= exact["gap"] < greedy["gap"] < 1
+
+
+class TestRefinePairings:
+    """Tests for the pairwise swap refinement of fast transitions."""
+
+    @patch("builtins.print")
+    def test_reaches_swap_local_optimum(self, mock_print):
+        """Test that no swap of two pairs improves the refined greedy result."""
+        # Arrange
+        triangles_a = _random_triangles(60, seed=70)
+        triangles_b = _random_triangles(60, seed=71)
+        greedy = create_transition(triangles_a, triangles_b, solver="greedy")
+        info = {}
+
+        # Act
+        result = refine_pairings(
+            greedy, triangles_a, triangles_b, neighbors=60, info=info
+        )
+
+        # Assert
+        assert info["refine_converged"] is True and info["refine_swaps"] > 0
+        assert sorted(result.to_index) == list(range(60))
+        assert result.total_distance() < greedy.total_distance()
+        costs = np.linalg.norm(
+            calculate_centroids(triangles_a)[:, None]
+            - calculate_centroids(triangles_b)[None],
+            axis=2,
+        )
+        cols = result.to_index[np.argsort(result.from_index)]
+        current = costs[np.arange(60), cols]
+        swapped = costs[:, cols]
+        gains = current[:, None] + current[None] - swapped - swapped.T
+        assert gains.max() <= 1e-3
+
+    @pytest.mark.parametrize("sizes", [(80, 50), (50, 80)])
+    @patch("builtins.print")
+    def test_different_sizes_and_weights(self, mock_print, sizes):
+        """Test that free triangles can be taken and weighted costs are kept."""
+        # Arrange
+        rng = np.random.default_rng(72)
+        triangles_a = _random_triangles(sizes[0], seed=72)
+        triangles_b = _random_triangles(sizes[1], seed=73)
+        for triangle in triangles_a + triangles_b:
+            triangle["color"] = rng.integers(0, 256, 3).tolist()
+        weights = {"position": 1.0, "rgb": 2.0}
+        greedy = create_transition(
+            triangles_a, triangles_b, solver="greedy", cost_weights=weights
+        )
+
+        # Act
+        result = refine_pairings(greedy, triangles_a, triangles_b, cost_weights=weights)
+
+        # Assert
+        assert len(result) == 50
+        assert len(set(result.from_index)) == len(set(result.to_index)) == 50
+        assert result.total_distance() < greedy.total_distance()
+        expected = pair_costs(
+            calculate_features(triangles_a)[result.from_index],
+            calculate_features(triangles_b)[result.to_index],
+            weights,
+        )
+        assert np.allclose(result.distance, expected, rtol=1e-4)
+
+    @patch("builtins.print")
+    def test_create_transition_refines_and_caches(self, mock_print, tmp_path):
+        """Test that refined transitions are cached apart from unrefined ones."""
+        # Arrange
+        cache = TransitionCache(tmp_path)
+        triangles_a = _random_triangles(200, seed=74)
+        triangles_b = _random_triangles(200, seed=75)
+        plain = create_transition(
+            triangles_a, triangles_b, solver="partitioned", cache=cache
+        )
+        info = {}
+
+        # Act
+        refined = create_transition(
+            triangles_a,
+            triangles_b,
+            solver="partitioned",
+            cache=cache,
+            refine=5.0,
+            info=info,
+        )
+        cached = create_transition(
+            triangles_a, triangles_b, solver="partitioned", cache=cache, refine=5.0
+        )
+
+        # Assert
+        assert info["refine_rounds"] >= 1 and "cached" not in info
+        assert refined.total_distance() <= plain.total_distance()
+        assert cached == refined
+        assert cache.stats()["entries"] == 2
+
+    @patch("builtins.print")
+    def test_zero_time_limit_keeps_pairings(self, mock_print):
+        """Test that without time no round runs and the pairs stay as they were."""
+        # Arrange
+        pairings = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B, solver="greedy")
+        info = {}
+
+        # Act
+        result = refine_pairings(
+            pairings, TRIANGLES_SET_A, TRIANGLES_SET_B, time_limit=0, info=info
+        )
+
+        # Assert
+        assert info == {
+            "refine_swaps": 0,
+            "refine_rounds": 0,
+            "refine_converged": False,
+        }
+        assert result == Transition.from_pairings(pairings)
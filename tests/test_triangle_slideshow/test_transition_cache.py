@@ -0,0 +1,172 @@
+"""
+Tests for the transition cache module.
+
+This module tests the functionality of the transition_cache.py module.
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+
+from triangle_slideshow.transition import create_transition
+from triangle_slideshow.transition_cache import TransitionCache
+from tests.test_triangle_slideshow.fixtures import (
+    TRIANGLES_SET_A,
+    TRIANGLES_SET_B,
+    TRIANGLES_SET_C,
+    EXPECTED_PAIRINGS,
+)
+
+
+class TestTransitionCache:
+    """Tests for the TransitionCache class."""
+
+    def test_key_depends_on_coordinates_and_parameters(self):
+        """Test that the key changes with the triangle sets and solver parameters."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(temp_dir)
+            key = cache.key(TRIANGLES_SET_A, TRIANGLES_SET_B, solver="hungarian")
+
+            # Act & Assert
+            assert key == cache.key(
+                TRIANGLES_SET_A, TRIANGLES_SET_B, solver="hungarian"
+            )
+            assert key != cache.key(
+                TRIANGLES_SET_B, TRIANGLES_SET_A, solver="hungarian"
+            )
+            assert key != cache.key(
+                TRIANGLES_SET_A, TRIANGLES_SET_C, solver="hungarian"
+            )
+            assert key != cache.key(TRIANGLES_SET_A, TRIANGLES_SET_B, solver="sparse")
+            assert key != cache.key(
+                TRIANGLES_SET_A, TRIANGLES_SET_B, solver="hungarian", max_triangles=2
+            )
+
+    def test_key_ignores_colors_unless_included(self):
+        """Test that recoloured triangles share a key unless colours are hashed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(temp_dir)
+            recolored = [dict(t, color=[0, 0, 0]) for t in TRIANGLES_SET_A]
+
+            # Act & Assert
+            assert cache.key(TRIANGLES_SET_A, TRIANGLES_SET_B) == cache.key(
+                recolored, TRIANGLES_SET_B
+            )
+            assert cache.key(
+                TRIANGLES_SET_A, TRIANGLES_SET_B, include_color=True
+            ) != cache.key(recolored, TRIANGLES_SET_B, include_color=True)
+
+    def test_round_trip_and_statistics(self):
+        """Test storing and loading pairings, counting hits and misses."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(temp_dir)
+            key = cache.key(TRIANGLES_SET_A, TRIANGLES_SET_B)
+
+            # Act
+            missing = cache.get(key)
+            cache.put(key, EXPECTED_PAIRINGS)
+            loaded = cache.get(key)
+
+            # Assert
+            assert missing is None
+            assert [(p["from_index"], p["to_index"]) for p in loaded] == [
+                (p["from_index"], p["to_index"]) for p in EXPECTED_PAIRINGS
+            ]
+            np.testing.assert_allclose(
+                [p["distance"] for p in loaded],
+                [p["distance"] for p in EXPECTED_PAIRINGS],
+                rtol=1e-6,
+            )
+            stats = cache.stats()
+            assert stats["hits"] == 1
+            assert stats["misses"] == 1
+            assert stats["entries"] == 1
+            assert stats["bytes"] == 12 * len(EXPECTED_PAIRINGS)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted once the cap is exceeded."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange - room for two 3-pairing entries
+            cache = TransitionCache(temp_dir, max_bytes=2 * 12 * 3)
+            keys = [f"{i:064x}" for i in range(3)]
+            cache.put(keys[0], EXPECTED_PAIRINGS)
+            cache.put(keys[1], EXPECTED_PAIRINGS)
+            old = os.stat(cache.directory / f"{keys[1]}.pairings").st_mtime - 10
+            os.utime(cache.directory / f"{keys[1]}.pairings", (old, old))
+            os.utime(cache.directory / f"{keys[0]}.pairings", (old + 5, old + 5))
+
+            # Act - keys[1] is now the least recently used entry
+            cache.put(keys[2], EXPECTED_PAIRINGS)
+
+            # Assert
+            assert cache.get(keys[1]) is None
+            assert cache.get(keys[0]) is not None
+            assert cache.get(keys[2]) is not None
+            assert cache.stats()["evictions"] == 1
+
+
+class TestCreateTransitionWithCache:
+    """Tests for create_transition backed by a TransitionCache."""
+
+    @patch("builtins.print")
+    def test_second_call_skips_solver(self, mock_print):
+        """Test that a cached transition is returned without solving again."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(temp_dir)
+            first = create_transition(TRIANGLES_SET_A, TRIANGLES_SET_B, cache=cache)
+            info = {}
+
+            # Act
+            with patch(
+                "triangle_slideshow.transition.linear_sum_assignment"
+            ) as mock_lsa:
+                second = create_transition(
+                    TRIANGLES_SET_A, TRIANGLES_SET_B, cache=cache, info=info
+                )
+
+            # Assert
+            mock_lsa.assert_not_called()
+            assert info["cached"] is True
+            assert [p["to_index"] for p in second] == [p["to_index"] for p in first]
+            assert cache.stats()["hits"] == 1
+
+    @patch("builtins.print")
+    def test_recolored_slide_misses_with_color_cost(self, mock_print):
+        """Test that a colour-weighted cost is solved again after recolouring."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Arrange
+            cache = TransitionCache(temp_dir)
+            rng = np.random.default_rng(0)
+            coords = rng.uniform(0, 100, size=(30, 3, 2))
+            triangles_a = [
+                {"coordinates": c.tolist(), "color": rng.integers(0, 256, 3).tolist()}
+                for c in coords
+            ]
+            triangles_b = [dict(t, color=[0, 0, 0]) for t in triangles_a[::-1]]
+            recolored = [dict(t, color=[255, 255, 255]) for t in triangles_b]
+            weights = {"position": 1.0, "color": 5.0}
+            create_transition(
+                triangles_a, triangles_b, cost_weights=weights, cache=cache
+            )
+            create_transition(triangles_a, triangles_b, cache=cache)
+            info = {}
+
+            # Act
+            result = create_transition(
+                triangles_a, recolored, cost_weights=weights, cache=cache, info=info
+            )
+            position_only = create_transition(triangles_a, recolored, cache=cache)
+
+            # Assert
+            assert "cached" not in info
+            assert result == create_transition(
+                triangles_a, recolored, cost_weights=weights
+            )
+            assert cache.stats()["hits"] == 1
+            assert position_only == create_transition(triangles_a, triangles_b)
@@ -5,5 +5,5 @@ A package for creating triangle-based slideshows from images.
 """
 
 from triangle_slideshow.processor import process_image, process_images
-from triangle_slideshow.transition import create_transition
+from triangle_slideshow.transition import Transition, create_transition
 from triangle_slideshow.slideshow import Slideshow, save_slideshow, load_slideshow
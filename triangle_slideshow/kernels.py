@@ -0,0 +1,292 @@
+"""
+Numeric kernels module for triangle slideshow.
+
+This module holds the tight loops of the transition solvers: centroid cost
+matrix blocks, the auction bidding step, the greedy candidate scan and
+assignment composition. Each kernel has a NumPy implementation and, when
+numba is installed, a compiled one with the same results; the compiled
+kernels are used automatically. set_backend switches between the two, e.g.
+to compare them or to rule out the JIT when debugging.
+
+The compiled kernels run single-threaded: transitions are already solved in
+parallel worker processes, and a numba thread pool does not survive the
+forks of those workers and of deadline solves.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Kernel implementations in order of preference
+BACKENDS = ("numba", "numpy")
+
+
+def available_backends():
+    """
+    Kernel backends that can be used in this environment.
+
+    Returns:
+        list: Backend names, the preferred one first
+    """
+    return [name for name in BACKENDS if name == "numpy" or numba is not None]
+
+
+def _centroid_costs_numpy(out, points_a, points_b):
+    """Write the centroid distances of a block of rows into out."""
+    dx = points_a[:, 0:1] - points_b[:, 0]
+    dy = points_a[:, 1:2] - points_b[:, 1]
+    np.hypot(dx, dy, out=out)
+
+
+def _centroid_costs_loop(out, points_a, points_b):
+    for i in range(out.shape[0]):
+        ax = points_a[i, 0]
+        ay = points_a[i, 1]
+        for j in range(out.shape[1]):
+            out[i, j] = math.hypot(ax - points_b[j, 0], ay - points_b[j, 1])
+
+
+def _best_two_numpy(benefit, prices, neighbors, bidders):
+    """Best candidate, its value and the second best value per bidder."""
+    rows = np.arange(bidders.size)
+    # take() and an in-place subtraction avoid a second bidders x k temporary
+    values = benefit.take(bidders, axis=0).astype(np.float64, copy=False)
+    if neighbors is None:
+        values -= prices
+    else:
+        values -= prices[neighbors.take(bidders, axis=0)]
+    choice = values.argmax(axis=1)
+    best_value = values[rows, choice]
+    values[rows, choice] = -np.inf
+    second_value = values.max(axis=1)
+    return choice, best_value, second_value
+
+
+def _best_two_loop(benefit, prices, neighbors, bidders, dense):
+    count = bidders.size
+    n_candidates = benefit.shape[1]
+    choice = np.zeros(count, dtype=np.int64)
+    best_value = np.empty(count)
+    second_value = np.empty(count)
+    for b in range(count):
+        row = bidders[b]
+        best = -np.inf
+        second = -np.inf
+        best_slot = 0
+        for slot in range(n_candidates):
+            column = slot if dense else neighbors[row, slot]
+            value = benefit[row, slot] - prices[column]
+            if value > best:
+                second = best
+                best = value
+                best_slot = slot
+            elif value > second:
+                second = value
+        choice[b] = best_slot
+        best_value[b] = best
+        second_value[b] = second
+    return choice, best_value, second_value
+
+
+def _greedy_scan(
+    edge_distances,
+    edge_rows,
+    edge_cols,
+    edge_last,
+    start,
+    limit,
+    assignment,
+    taken,
+    paired,
+    target,
+):
+    """
+    Take candidate edges in order while both their ends are free.
+
+    Stops before the first edge longer than limit, once target pairs exist,
+    or after the last candidate edge of a still unpaired row was found taken.
+
+    Returns:
+        tuple: (next edge position, pair count, row that ran out of
+        candidates or -1)
+    """
+    for position in range(start, len(edge_rows)):
+        if paired >= target or edge_distances[position] > limit:
+            return position, paired, -1
+        row = edge_rows[position]
+        if assignment[row] >= 0:
+            continue
+        column = edge_cols[position]
+        if not taken[column]:
+            assignment[row] = column
+            taken[column] = True
+            paired += 1
+        elif edge_last[position]:
+            return position + 1, paired, row
+    return len(edge_rows), paired, -1
+
+
+def _compose_numpy(first, second):
+    """Index in C per element of A for assignments A->B and B->C."""
+    composed = np.full(len(first), -1)
+    paired = first >= 0
+    composed[paired] = second[first[paired]]
+    return composed
+
+
+def _compose_loop(first, second):
+    composed = np.full(len(first), -1)
+    for i in range(len(first)):
+        if first[i] >= 0:
+            composed[i] = second[first[i]]
+    return composed
+
+
+_KERNELS = {
+    "numpy": {
+        "centroid_costs": _centroid_costs_numpy,
+        "best_two": _best_two_numpy,
+        "greedy_scan": _greedy_scan,
+        "compose": _compose_numpy,
+    },
+}
+
+if numba is not None:
+    _best_two_compiled = numba.njit(cache=True)(_best_two_loop)
+
+    def _best_two_numba(benefit, prices, neighbors, bidders):
+        if neighbors is None:
+            return _best_two_compiled(benefit, prices, bidders[:0, None], bidders, True)
+        return _best_two_compiled(benefit, prices, neighbors, bidders, False)
+
+    _KERNELS["numba"] = {
+        "centroid_costs": numba.njit(cache=True)(_centroid_costs_loop),
+        "best_two": _best_two_numba,
+        "greedy_scan": numba.njit(cache=True)(_greedy_scan),
+        "compose": numba.njit(cache=True)(_compose_loop),
+    }
+
+_backend = available_backends()[0]
+
+
+def get_backend():
+    """Name of the kernel backend in use."""
+    return _backend
+
+
+def set_backend(name):
+    """
+    Select the kernel backend.
+
+    Args:
+        name (str): One of available_backends()
+
+    Returns:
+        str: The previously used backend, to restore it afterwards
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global _backend
+    if name not in available_backends():
+        raise ValueError(
+            f"Kernel backend '{name}' is not available, "
+            f"expected one of {available_backends()}"
+        )
+    previous, _backend = _backend, name
+    return previous
+
+
+def centroid_costs(out, points_a, points_b):
+    """
+    Fill a block of the centroid distance cost matrix.
+
+    Args:
+        out (np.ndarray): (n, m) output rows
+        points_a (np.ndarray): (n, 2) row centroids in the dtype of out
+        points_b (np.ndarray): (m, 2) column centroids in the dtype of out
+    """
+    _KERNELS[_backend]["centroid_costs"](out, points_a, points_b)
+
+
+def best_two(benefit, prices, neighbors, bidders):
+    """
+    Find the best and second best candidate of each bidding auction row.
+
+    Args:
+        benefit (np.ndarray): (n, k) negated candidate costs
+        prices (np.ndarray): Column prices
+        neighbors (np.ndarray): (n, k) candidate columns, or None when
+            benefit covers every column
+        bidders (np.ndarray): Rows that bid
+
+    Returns:
+        tuple: (choice, best_value, second_value) per bidder, where choice is
+        the candidate slot and second_value is -inf with a single candidate
+    """
+    return _KERNELS[_backend]["best_two"](benefit, prices, neighbors, bidders)
+
+
+def greedy_scan(
+    edge_distances,
+    edge_rows,
+    edge_cols,
+    edge_last,
+    start,
+    limit,
+    assignment,
+    taken,
+    paired,
+    target,
+):
+    """
+    Run the greedy matching over a sorted list of candidate edges.
+
+    Args:
+        edge_distances (np.ndarray): Edge lengths in ascending order
+        edge_rows (np.ndarray): Row of each edge
+        edge_cols (np.ndarray): Column of each edge
+        edge_last (np.ndarray): Whether an edge is the last candidate of its row
+        start (int): Position of the first edge to look at
+        limit (float): Stop before edges longer than this
+        assignment (np.ndarray): Column per row, -1 while free; updated in place
+        taken (np.ndarray): Whether a column is paired; updated in place
+        paired (int): Number of pairs so far
+        target (int): Number of pairs at which to stop
+
+    Returns:
+        tuple: (next edge position, pair count, row that ran out of
+        candidates or -1)
+    """
+    position, paired, row = _KERNELS[_backend]["greedy_scan"](
+        edge_distances,
+        edge_rows,
+        edge_cols,
+        edge_last,
+        start,
+        limit,
+        assignment,
+        taken,
+        paired,
+        target,
+    )
+    return int(position), int(paired), int(row)
+
+
+def compose(first, second):
+    """
+    Compose two assignments A->B and B->C into A->C.
+
+    Args:
+        first (np.ndarray): Index in B per element of A, -1 where unpaired
+        second (np.ndarray): Index in C per element of B, -1 where unpaired
+
+    Returns:
+        np.ndarray: Index in C per element of A, -1 where either step is unpaired
+    """
+    return _KERNELS[_backend]["compose"](first, second)
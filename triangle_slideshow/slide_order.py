@@ -0,0 +1,200 @@
+"""
+Slide order module for triangle slideshow.
+
+This module estimates how expensive the transition between two slides will be
+without solving it, and orders slides so that consecutive slides are similar.
+Slide distances are sliced Wasserstein distances between the triangle point
+clouds (centroid and colour) of two slides, computed from a small quantile
+summary per slide. A travelling-salesman heuristic then picks the order.
+"""
+
+import numpy as np
+
+from triangle_slideshow.transition import (
+    _candidate_points,
+    calculate_features,
+    normalize_cost_weights,
+)
+
+# Point cloud of a slide when no cost weights are given: centroid position
+# plus RGB colour, one unit per pixel or colour step
+DEFAULT_ORDER_WEIGHTS = {"position": 1.0, "rgb": 1.0}
+
+# Random directions the point clouds are projected onto
+SLICED_WASSERSTEIN_PROJECTIONS = 64
+
+# Quantiles kept per projection in a slide summary
+SLICED_WASSERSTEIN_QUANTILES = 128
+
+# Seed of the projection directions, shared by all summaries
+SLICED_WASSERSTEIN_SEED = 0
+
+
+def slide_summary(
+    triangles,
+    cost_weights=None,
+    projections=SLICED_WASSERSTEIN_PROJECTIONS,
+    quantiles=SLICED_WASSERSTEIN_QUANTILES,
+):
+    """
+    Summarize a slide for sliced Wasserstein distances.
+
+    Each triangle becomes a point of weighted features (see
+    DEFAULT_ORDER_WEIGHTS), the cloud is projected onto fixed random
+    directions and each projection is reduced to evenly spaced quantiles.
+    Summaries of slides with different triangle counts are comparable.
+
+    Args:
+        triangles (list): Triangles of the slide
+        cost_weights (dict, optional): Weighted cost terms, see
+            create_transition (default: DEFAULT_ORDER_WEIGHTS)
+        projections (int): Number of projection directions
+        quantiles (int): Number of quantiles per projection
+
+    Returns:
+        np.ndarray: (projections, quantiles) float32 summary, all zeros for
+        a slide without triangles
+    """
+    weights = normalize_cost_weights(cost_weights or DEFAULT_ORDER_WEIGHTS)
+    if weights is None:
+        weights = {"position": 1.0}
+    features = calculate_features(triangles)
+    points = _candidate_points(features, weights)
+
+    rng = np.random.default_rng(SLICED_WASSERSTEIN_SEED)
+    directions = rng.normal(size=(points.shape[1], projections))
+    directions /= np.linalg.norm(directions, axis=0)
+    if len(points) == 0:
+        return np.zeros((projections, quantiles), dtype=np.float32)
+
+    # Quantile midpoints, so every level stands for the same share of points
+    levels = (np.arange(quantiles) + 0.5) / quantiles
+    projected = points @ directions
+    return np.quantile(projected, levels, axis=0).T.astype(np.float32)
+
+
+def slide_distances(summaries):
+    """
+    Sliced Wasserstein distances between all pairs of slides.
+
+    Args:
+        summaries (list): Slide summaries from slide_summary
+
+    Returns:
+        np.ndarray: Symmetric (n, n) matrix with a zero diagonal, in units of
+        the average per-triangle cost
+    """
+    summaries = np.asarray(summaries, dtype=np.float64)
+    count = len(summaries)
+    distances = np.zeros((count, count))
+    for i in range(count - 1):
+        differences = np.abs(summaries[i + 1 :] - summaries[i])
+        distances[i, i + 1 :] = differences.mean(axis=(1, 2))
+    return distances + distances.T
+
+
+def order_length(distances, order, cycle=False):
+    """
+    Total distance of visiting the slides in an order.
+
+    Args:
+        distances (np.ndarray): Slide distance matrix
+        order (list): Slide indices
+        cycle (bool): Include the step from the last slide back to the first
+
+    Returns:
+        float: Sum of the distances between consecutive slides
+    """
+    order = np.asarray(order)
+    total = distances[order[:-1], order[1:]].sum()
+    if cycle and len(order) > 1:
+        total += distances[order[-1], order[0]]
+    return float(total)
+
+
+def order_slides(distances, start=0, cycle=False):
+    """
+    Order slides so that the sum of consecutive slide distances is small.
+
+    A nearest-neighbour tour from the start slide is improved by 2-opt moves
+    (reversing a run of slides) and Or-opt moves (moving a run of up to three
+    slides elsewhere) until none shortens it. The start slide stays first.
+
+    Args:
+        distances (np.ndarray): Symmetric slide distance matrix
+        start (int): Slide that opens the slideshow
+        cycle (bool): Optimize a round trip that returns to the start slide,
+            for round-robin slideshows
+
+    Returns:
+        list: Slide indices in the new order
+    """
+    count = len(distances)
+    if count == 0:
+        return []
+    if not 0 <= start < count:
+        raise ValueError("Start slide index out of range")
+
+    # Nearest neighbour construction
+    order = [start]
+    visited = np.zeros(count, dtype=bool)
+    visited[start] = True
+    for _ in range(count - 1):
+        remaining = np.where(visited, np.inf, distances[order[-1]])
+        nearest = int(np.argmin(remaining))
+        order.append(nearest)
+        visited[nearest] = True
+
+    while _two_opt(distances, order, cycle) | _or_opt(distances, order, cycle):
+        pass
+    return order
+
+
+def _two_opt(distances, order, cycle):
+    """Reverse runs of slides in place while that shortens the order."""
+    count = len(order)
+    changed, improved = False, True
+    while improved:
+        improved = False
+        for i in range(1, count - 1):
+            for j in range(i + 1, count):
+                a, b, c = order[i - 1], order[i], order[j]
+                d = order[j + 1] if j + 1 < count else (order[0] if cycle else None)
+                before = distances[a, b]
+                after = distances[a, c]
+                if d is not None:
+                    before += distances[c, d]
+                    after += distances[b, d]
+                if after < before - 1e-9:
+                    order[i : j + 1] = order[i : j + 1][::-1]
+                    improved = changed = True
+    return changed
+
+
+def _or_opt(distances, order, cycle, max_segment=3):
+    """Move a run of up to max_segment slides elsewhere if that shortens the order."""
+    count = len(order)
+    for length in range(1, max_segment + 1):
+        for i in range(1, count - length + 1):
+            segment = order[i : i + length]
+            rest = order[:i] + order[i + length :]
+            prev = order[i - 1]
+            after = i + length
+            next_ = order[after] if after < count else (order[0] if cycle else None)
+            gain = distances[prev, segment[0]]
+            if next_ is not None:
+                gain += distances[segment[-1], next_] - distances[prev, next_]
+
+            for k in range(1, len(rest) + 1):
+                if k == i:
+                    continue
+                p = rest[k - 1]
+                q = rest[k] if k < len(rest) else (rest[0] if cycle else None)
+                for run in (segment, segment[::-1]):
+                    cost = distances[p, run[0]]
+                    if q is not None:
+                        cost += distances[run[-1], q] - distances[p, q]
+                    if cost < gain - 1e-9:
+                        order[:] = rest[:k] + run + rest[k:]
+                        return True
+    return False
@@ -6,17 +6,205 @@ This module handles the slideshow data structure and serialization.
 
 import json
 import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from triangle_slideshow.transition import create_transition
+
+import numpy as np
+
+from triangle_slideshow.transition import (
+    COST_MATRIX_POOL,
+    EXACT_SOLVERS,
+    WARM_START_SOLVERS,
+    Transition,
+    anchor_unmatched,
+    calculate_features,
+    compose_assignments,
+    create_transition,
+    estimate_transition_memory,
+    normalize_cost_weights,
+    pairings_to_assignment,
+    repair_transition,
+    reverse_pairings,
+    transition_cache_key,
+    transition_quality,
+)
+from triangle_slideshow.slide_order import (
+    order_length,
+    order_slides,
+    slide_distances,
+    slide_summary,
+)
+
+# Share of physical memory that parallel transition jobs may use by default
+DEFAULT_MEMORY_FRACTION = 0.5
+
+# Solve statistics from create_transition kept with each transition and
+# written to the manifest
+QUALITY_KEYS = ("cost", "lower_bound", "gap", "seconds")
+
+
+def default_memory_budget():
+    """
+    Memory budget for parallel transition jobs when none is given.
+
+    Returns:
+        int/None: DEFAULT_MEMORY_FRACTION of physical memory in bytes, or None
+        if it cannot be determined
+    """
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+    return int(total * DEFAULT_MEMORY_FRACTION)
+
+
+def _solve_transition(triangles_from, triangles_to, max_triangles, options):
+    """Worker entry point: create a transition and return it with its solver info."""
+    info = {}
+    pairings = create_transition(
+        triangles_from, triangles_to, max_triangles, info=info, **options
+    )
+    info["cost_matrix_peak_bytes"] = COST_MATRIX_POOL.peak_bytes
+    return pairings, info
+
+
+def _record_solve(transition, info):
+    """Keep the cost, gap and solve time of a transition, flagging approximate solves."""
+    if not info:
+        return
+    for key in QUALITY_KEYS:
+        if key in info:
+            transition[key] = info[key]
+    if info.get("approximate"):
+        transition["approximate"] = True
+
+
+def _transition_filename(from_index, to_index):
+    """File name of a transition in a split slideshow."""
+    return f"transition_{from_index}_to_{to_index}.json"
+
+
+def _manifest_transition(transition, filename):
+    """Manifest entry of a transition with its cost, optimality gap and solve time."""
+    entry = {"to": transition["to"], "filename": filename}
+    if transition.get("approximate"):
+        entry["approximate"] = True
+    for key in QUALITY_KEYS:
+        if key in transition:
+            entry[key] = transition[key]
+    return entry
+
+
+class TransitionSink:
+    """
+    Writes each transition to its own file as soon as it is created.
+
+    A slideshow with a sink keeps only a small descriptor per transition in
+    memory instead of its pairings, so memory use does not grow with the
+    number of transitions and a crashed build keeps the transitions solved
+    so far.
+    """
+
+    def __init__(self, output_dir):
+        """
+        Initialize a sink writing into a directory, creating it if needed.
+
+        Args:
+            output_dir (str/Path): Directory of the split slideshow
+        """
+        self.output_dir = Path(output_dir)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def write(self, transition):
+        """
+        Write a transition's pairings to disk.
+
+        Args:
+            transition (dict): Transition with from, to and pairings keys
+
+        Returns:
+            dict: The transition without its pairings, plus the filename and
+            pairing_count of the written file
+        """
+        pairings = Transition.from_pairings(transition["pairings"])
+        filename = _transition_filename(transition["from"], transition["to"])
+
+        # Write atomically so a crash never leaves a truncated file behind
+        path = self.output_dir / filename
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            f.write(pairings.to_json())
+        os.replace(temp_path, path)
+
+        descriptor = {k: v for k, v in transition.items() if k != "pairings"}
+        descriptor["filename"] = filename
+        descriptor["pairing_count"] = len(pairings)
+        return descriptor
+
+    def read(self, descriptor):
+        """
+        Read the pairings of a written transition back.
+
+        Args:
+            descriptor (dict): Descriptor returned by write()
+
+        Returns:
+            Transition: The transition's pairings
+        """
+        with open(self.output_dir / descriptor["filename"]) as f:
+            return Transition.from_pairings(json.load(f))
+
+    def rename(self, descriptors):
+        """
+        Move written transitions to the file names of their current slides.
+
+        Needed after the slides were reordered. Files are moved to temporary
+        names first, as the new name of one file may be the old name of another.
+
+        Args:
+            descriptors (list): Descriptors returned by write(), with updated
+                from and to indices; their filename is updated in place
+        """
+        moves = []
+        for descriptor in descriptors:
+            filename = _transition_filename(descriptor["from"], descriptor["to"])
+            if filename == descriptor["filename"]:
+                continue
+            path = self.output_dir / descriptor["filename"]
+            temp_path = path.with_suffix(".tmp")
+            os.replace(path, temp_path)
+            moves.append((descriptor, temp_path, filename))
+        for descriptor, temp_path, filename in moves:
+            os.replace(temp_path, self.output_dir / filename)
+            descriptor["filename"] = filename
 
 
 class Slideshow:
     """Class representing a triangle slideshow with multiple slides and transitions."""
 
-    def __init__(self):
-        """Initialize an empty slideshow."""
+    def __init__(self, transition_options=None, transition_sink=None):
+        """
+        Initialize an empty slideshow.
+
+        Args:
+            transition_options (dict, optional): Extra keyword arguments for every
+                create_transition call, e.g. solver, solver_options or cache
+            transition_sink (TransitionSink, optional): Write transitions to
+                disk as they are created and keep only descriptors in
+                self.transitions (see transition_pairings)
+        """
         self.slides = []
         self.transitions = []
+        self.transition_options = dict(transition_options or {})
+        self.transition_sink = transition_sink
+        # Set by canonicalize: triangle i of every slide morphs into triangle i
+        self.canonical = False
+        # Largest cost matrix pool of any worker process used by add_transitions
+        self.worker_cost_matrix_peak_bytes = 0
+        # Time spent solving transitions, see quality_summary
+        self.solve_seconds = 0.0
 
     def add_slide(self, triangles_data, name=None, image_path=None):
         """
@@ -31,7 +219,14 @@ class Slideshow:
             int: Index of the added slide
         """
         slide_index = len(self.slides)
+        self.slides.append(
+            self._make_slide(triangles_data, name, slide_index, image_path)
+        )
+        return slide_index
 
+    @staticmethod
+    def _make_slide(triangles_data, name, slide_index, image_path=None):
+        """Build the slide dictionary for add_slide and replace_slide."""
         # Check if triangles_data is a dict with both triangles and dominant_colors
         if isinstance(triangles_data, dict) and "triangles" in triangles_data:
             slide = {
@@ -53,10 +248,197 @@ class Slideshow:
         if image_path:
             slide["image_path"] = image_path
 
-        self.slides.append(slide)
-        return slide_index
+        return slide
 
-    def add_transition(self, from_index, to_index, max_triangles=None):
+    def _spool(self, transition):
+        """Hand a new transition to the sink; returns what self.transitions keeps."""
+        if self.transition_sink is None:
+            return transition
+        return self.transition_sink.write(transition)
+
+    def transition_pairings(self, transition):
+        """
+        Pairings of a transition, read back from the sink if it was streamed.
+
+        Args:
+            transition (dict): Entry of self.transitions
+
+        Returns:
+            list/Transition: The transition's pairings
+        """
+        if "pairings" in transition:
+            return transition["pairings"]
+        return self.transition_sink.read(transition)
+
+    def replace_slide(
+        self,
+        slide_index,
+        triangles_data,
+        name=None,
+        image_path=None,
+        max_triangles=None,
+    ):
+        """
+        Replace the triangles of a slide and repair its transitions.
+
+        Instead of solving every transition to or from the slide again, the
+        existing pairings are updated with repair_transition: pairs of
+        unchanged triangles are kept and only the neighbourhood of the changed
+        triangles is re-paired. Solve statistics stay with the transitions,
+        measured again for the new pairings.
+
+        Args:
+            slide_index (int): Index of the slide to replace
+            triangles_data (dict/list): List of triangles or dict with triangles and dominant_colors
+            name (str, optional): New name (default: keep the current one)
+            image_path (str, optional): New path to the original image file
+            max_triangles (int, optional): Maximum number of triangles the
+                transitions were created with
+
+        Returns:
+            int: Number of repaired transitions
+        """
+        if slide_index >= len(self.slides):
+            raise ValueError("Slide index out of range")
+
+        previous = self.slides[slide_index]
+        slide = self._make_slide(
+            triangles_data,
+            name or previous["name"],
+            slide_index,
+            image_path or previous.get("image_path"),
+        )
+        self.slides[slide_index] = slide
+
+        repaired = 0
+        for position, transition in enumerate(self.transitions):
+            if slide_index not in (transition["from"], transition["to"]):
+                continue
+            changed_from = transition["from"] == slide_index
+            changed_to = transition["to"] == slide_index
+            info = {}
+            start_time = time.time()
+            pairings = repair_transition(
+                self.transition_pairings(transition),
+                self.slides[transition["from"]]["triangles"],
+                self.slides[transition["to"]]["triangles"],
+                previous["triangles"] if changed_from else None,
+                previous["triangles"] if changed_to else None,
+                max_triangles,
+                info=info,
+                **self.transition_options,
+            )
+            seconds = time.time() - start_time
+            self.solve_seconds += seconds
+            repaired_transition = {
+                "from": transition["from"],
+                "to": transition["to"],
+                "pairings": pairings,
+            }
+            # Kept pairs of an approximate solve are still approximate. The
+            # cost is measured again for the changed slide; the old bound no
+            # longer applies, so only a full re-solve proves a new one
+            if transition.get("approximate"):
+                repaired_transition["approximate"] = True
+            if "cost" in transition:
+                repaired_transition.update(
+                    transition_quality(
+                        pairings,
+                        self.slides[transition["from"]]["triangles"],
+                        self.slides[transition["to"]]["triangles"],
+                        max_triangles,
+                        self.transition_options.get("cost_weights"),
+                        lower_bound=info.get("lower_bound"),
+                        estimate=self.transition_options.get("estimate_bound", False),
+                    )
+                )
+                repaired_transition["seconds"] = seconds
+            self.transitions[position] = self._spool(repaired_transition)
+            repaired += 1
+
+        return repaired
+
+    def reorder_slides(self, order):
+        """
+        Put the slides in a new order.
+
+        Existing transitions keep connecting the same two slides; their
+        from and to indices are updated to the new positions, and streamed
+        transition files are renamed to match.
+
+        Args:
+            order (list): Old slide index for every new position
+
+        Raises:
+            ValueError: If order is not a permutation of the slide indices
+        """
+        if sorted(order) != list(range(len(self.slides))):
+            raise ValueError("Order must be a permutation of the slide indices")
+
+        position = {old: new for new, old in enumerate(order)}
+        self.slides = [self.slides[old] for old in order]
+        for transition in self.transitions:
+            transition["from"] = position[transition["from"]]
+            transition["to"] = position[transition["to"]]
+        streamed = [t for t in self.transitions if "pairings" not in t]
+        if streamed:
+            self.transition_sink.rename(streamed)
+
+    def slide_distances(self):
+        """
+        Estimate the transition cost between all pairs of slides.
+
+        Sliced Wasserstein distances of the slides' triangle clouds, see
+        slide_order.slide_distances; much cheaper than solving transitions.
+        Uses the cost_weights of the transition options when set.
+
+        Returns:
+            np.ndarray: Symmetric (slides, slides) distance matrix
+        """
+        cost_weights = self.transition_options.get("cost_weights")
+        summaries = [
+            slide_summary(slide["triangles"], cost_weights) for slide in self.slides
+        ]
+        return slide_distances(summaries)
+
+    def optimize_order(self, start=0, cycle=False):
+        """
+        Reorder the slides so that consecutive slides are similar.
+
+        Only the transitions of the chosen order need to be solved
+        afterwards, so call this before creating transitions.
+
+        Args:
+            start (int): Slide that stays first, e.g. an initial black slide
+            cycle (bool): Optimize for round-robin transitions, which also
+                return from the last slide to the first
+
+        Returns:
+            list: Old slide index for every new position
+        """
+        if len(self.slides) < 3:
+            return list(range(len(self.slides)))
+
+        distances = self.slide_distances()
+        order = order_slides(distances, start, cycle)
+        before = order_length(distances, list(range(len(self.slides))), cycle)
+        after = order_length(distances, order, cycle)
+        print(
+            f"Slide order: estimated transition distance {after:.1f} "
+            f"instead of {before:.1f}"
+        )
+        self.reorder_slides(order)
+        return order
+
+    def add_transition(
+        self,
+        from_index,
+        to_index,
+        max_triangles=None,
+        warm_start=None,
+        info=None,
+        features=None,
+    ):
         """
         Add a transition between two slides.
 
@@ -64,6 +446,9 @@ class Slideshow:
             from_index (int): Index of the source slide
             to_index (int): Index of the target slide
             max_triangles (int, optional): Maximum number of triangles to use
+            warm_start (tuple, optional): (assignment, prices) seed, see create_transition
+            info (dict, optional): Updated in place with solver statistics
+            features (tuple, optional): Precomputed (from, to) slide features
 
         Returns:
             dict: The created transition
@@ -72,26 +457,299 @@ class Slideshow:
         if from_index >= len(self.slides) or to_index >= len(self.slides):
             raise ValueError("Slide indices out of range")
 
+        options = dict(self.transition_options)
+        if warm_start is not None:
+            options["warm_start"] = warm_start
+        if info is None:
+            info = {}
+        options["info"] = info
+        if features is not None:
+            options["features"] = features
+
         # Create transition pairings
         pairings = create_transition(
             self.slides[from_index]["triangles"],
             self.slides[to_index]["triangles"],
             max_triangles,
+            **options,
         )
 
         # Create transition object
         transition = {"from": from_index, "to": to_index, "pairings": pairings}
+        _record_solve(transition, info)
+        self.solve_seconds += info.get("seconds", 0.0)
 
+        transition = self._spool(transition)
         self.transitions.append(transition)
         return transition
 
-    def auto_create_transitions(self, max_triangles=None, sequential_only=True):
+    def add_reverse_transition(self, transition):
+        """
+        Add the reverse of an existing transition without solving it again.
+
+        Args:
+            transition (dict): Transition to reverse
+
+        Returns:
+            dict: The created transition
+        """
+        reverse = {
+            "from": transition["to"],
+            "to": transition["from"],
+            "pairings": reverse_pairings(self.transition_pairings(transition)),
+        }
+        # Reversing takes no solve, so the solve time stays with the original
+        for key in ("approximate", *QUALITY_KEYS):
+            if key in transition and key != "seconds":
+                reverse[key] = transition[key]
+        reverse = self._spool(reverse)
+        self.transitions.append(reverse)
+        return reverse
+
+    def _add_bidirectional(self, pairs, max_triangles, workers, memory_budget):
+        """Solve each unordered slide pair once and derive the other direction."""
+        solved = []
+        for pair in pairs:
+            if pair not in solved and pair[::-1] not in solved:
+                solved.append(pair)
+        transitions = self.add_transitions(
+            solved, max_triangles, workers, memory_budget
+        )
+        for transition in transitions:
+            self.add_reverse_transition(transition)
+        return 2 * len(transitions)
+
+    def add_transitions(
+        self,
+        pairs,
+        max_triangles=None,
+        workers=None,
+        memory_budget=None,
+        warm_starts=None,
+        infos=None,
+    ):
+        """
+        Add transitions for several slide pairs, optionally in parallel.
+
+        With ``workers`` > 1 the create_transition calls run on a process pool.
+        A job is only started while the estimated memory of all running jobs
+        (dominated by their n x m cost matrices) stays within
+        ``memory_budget``; at least one job always runs. Transitions are
+        appended in the order of ``pairs`` regardless of completion order.
+
+        Args:
+            pairs (list): (from_index, to_index) tuples
+            max_triangles (int, optional): Maximum number of triangles to use
+            workers (int, optional): Number of worker processes (None or 1 runs serially)
+            memory_budget (int, optional): Bytes that running jobs may use together
+                (default: DEFAULT_MEMORY_FRACTION of physical memory)
+            warm_starts (list, optional): Warm start per pair (or None), see
+                create_transition
+            infos (list, optional): Extended with one solver statistics dict per pair
+
+        Returns:
+            list: The created transitions
+        """
+        for from_index, to_index in pairs:
+            if from_index >= len(self.slides) or to_index >= len(self.slides):
+                raise ValueError("Slide indices out of range")
+
+        if warm_starts is None:
+            warm_starts = [None] * len(pairs)
+        features = self._slide_features(pairs)
+
+        if not workers or workers <= 1 or len(pairs) <= 1:
+            transitions = []
+            for (from_index, to_index), warm_start in zip(pairs, warm_starts):
+                info = None if infos is None else {}
+                transitions.append(
+                    self.add_transition(
+                        from_index,
+                        to_index,
+                        max_triangles,
+                        warm_start,
+                        info,
+                        self._pair_features(features, from_index, to_index),
+                    )
+                )
+                if infos is not None:
+                    infos.append(info)
+            return transitions
+
+        if memory_budget is None:
+            memory_budget = default_memory_budget()
+
+        # Cache lookups stay in this process so hits and misses are counted here
+        options = dict(self.transition_options)
+        cache = options.pop("cache", None)
+        results = [None] * len(pairs)
+        job_infos = [{} for _ in pairs]
+        cache_keys = {}
+        pending = []
+
+        def finish(job, pairings):
+            # Streamed to the sink right away, not after the last job
+            from_index, to_index = pairs[job]
+            transition = {"from": from_index, "to": to_index, "pairings": pairings}
+            _record_solve(transition, job_infos[job])
+            self.solve_seconds += job_infos[job].get("seconds", 0.0)
+            results[job] = self._spool(transition)
+
+        for job, (from_index, to_index) in enumerate(pairs):
+            if cache is not None:
+                start_time = time.time()
+                cache_keys[job] = transition_cache_key(
+                    cache,
+                    self.slides[from_index]["triangles"],
+                    self.slides[to_index]["triangles"],
+                    max_triangles,
+                    options.get("solver", "hungarian"),
+                    options.get("solver_options"),
+                    options.get("cost_weights"),
+                    options.get("memory_budget"),
+                    options.get("refine"),
+                )
+                pairings = cache.get(cache_keys[job])
+                if pairings is not None:
+                    job_infos[job]["cached"] = True
+                    exact = options.get("solver", "hungarian") in EXACT_SOLVERS
+                    job_infos[job].update(
+                        transition_quality(
+                            pairings,
+                            self.slides[from_index]["triangles"],
+                            self.slides[to_index]["triangles"],
+                            max_triangles,
+                            options.get("cost_weights"),
+                            self._pair_features(features, from_index, to_index),
+                            lower_bound=pairings.total_distance() if exact else None,
+                            estimate=options.get("estimate_bound", False),
+                        )
+                    )
+                    job_infos[job]["seconds"] = time.time() - start_time
+                    if options.get("anchor"):
+                        # The cache holds the matched pairs only
+                        pairings = anchor_unmatched(
+                            pairings,
+                            self.slides[from_index]["triangles"],
+                            self.slides[to_index]["triangles"],
+                            max_triangles,
+                        )
+                    finish(job, pairings)
+            if results[job] is None:
+                pending.append(job)
+
+        running = {}
+        in_use = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                # Admit jobs in order while their estimated footprint fits
+                while pending and len(running) < workers:
+                    job = pending[0]
+                    from_index, to_index = pairs[job]
+                    needed = self._transition_memory(
+                        from_index, to_index, max_triangles
+                    )
+                    if running and memory_budget and in_use + needed > memory_budget:
+                        break
+                    pending.pop(0)
+                    job_options = dict(options)
+                    if warm_starts[job] is not None:
+                        job_options["warm_start"] = warm_starts[job]
+                    if features:
+                        job_options["features"] = self._pair_features(
+                            features, from_index, to_index
+                        )
+                    future = executor.submit(
+                        _solve_transition,
+                        self.slides[from_index]["triangles"],
+                        self.slides[to_index]["triangles"],
+                        max_triangles,
+                        job_options,
+                    )
+                    running[future] = (job, needed)
+                    in_use += needed
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, needed = running.pop(future)
+                    in_use -= needed
+                    pairings, job_infos[job] = future.result()
+                    self.worker_cost_matrix_peak_bytes = max(
+                        self.worker_cost_matrix_peak_bytes,
+                        job_infos[job].get("cost_matrix_peak_bytes", 0),
+                    )
+                    if cache is not None and not job_infos[job].get("approximate"):
+                        cache.put(cache_keys[job], pairings)
+                    finish(job, pairings)
+
+        transitions = results
+        self.transitions.extend(transitions)
+        if infos is not None:
+            infos.extend(job_infos)
+        return transitions
+
+    def _slide_features(self, pairs):
+        """
+        Compute the cost features of every slide in pairs once.
+
+        Returns:
+            dict: Feature array per slide index, empty when the transitions use
+            the plain centroid distance
+        """
+        if normalize_cost_weights(self.transition_options.get("cost_weights")) is None:
+            return {}
+        indices = sorted({index for pair in pairs for index in pair})
+        return {
+            index: calculate_features(self.slides[index]["triangles"])
+            for index in indices
+        }
+
+    @staticmethod
+    def _pair_features(features, from_index, to_index):
+        """(from, to) features of a slide pair, or None without cost features."""
+        if not features:
+            return None
+        return features[from_index], features[to_index]
+
+    def _transition_memory(self, from_index, to_index, max_triangles=None):
+        """Estimated peak memory of the transition between two slides."""
+        n_from = len(self.slides[from_index]["triangles"])
+        n_to = len(self.slides[to_index]["triangles"])
+        if max_triangles:
+            n_from, n_to = min(n_from, max_triangles), min(n_to, max_triangles)
+        options = self.transition_options
+        return estimate_transition_memory(
+            n_from,
+            n_to,
+            options.get("solver", "hungarian"),
+            options.get("solver_options"),
+            options.get("memory_budget"),
+        )
+
+    def auto_create_transitions(
+        self,
+        max_triangles=None,
+        sequential_only=True,
+        workers=None,
+        memory_budget=None,
+        warm_start=False,
+        bidirectional=False,
+    ):
         """
         Automatically create transitions between slides.
 
         Args:
             max_triangles (int, optional): Maximum number of triangles to use
             sequential_only (bool): If True, only create transitions between consecutive slides
+            workers (int, optional): Number of worker processes, see add_transitions
+            memory_budget (int, optional): Memory limit for running jobs, see add_transitions
+            warm_start (bool): In all-pairs mode, seed each i->j solve with the
+                composition of i->j-1 and j-1->j (requires a solver in
+                WARM_START_SOLVERS, or "auto")
+            bidirectional (bool): Also add the reverse of every transition,
+                derived by inverting its pairings instead of solving again
 
         Returns:
             int: Number of transitions created
@@ -99,22 +757,86 @@ class Slideshow:
         if len(self.slides) < 2:
             return 0
 
-        count = 0
+        if not sequential_only and warm_start:
+            solver = self.transition_options.get("solver", "hungarian")
+            # "auto" drops the seed when it picks a solver without warm starts
+            if solver in WARM_START_SOLVERS or solver == "auto":
+                count = self._warm_started_all_pairs(
+                    max_triangles, workers, memory_budget
+                )
+                if bidirectional:
+                    for transition in self.transitions[-count:]:
+                        self.add_reverse_transition(transition)
+                    count *= 2
+                return count
+            print(f"Solver '{solver}' does not support warm starts, solving cold")
+
         if sequential_only:
             # Only create transitions between consecutive slides
-            for i in range(len(self.slides) - 1):
-                self.add_transition(i, i + 1, max_triangles)
-                count += 1
+            pairs = [(i, i + 1) for i in range(len(self.slides) - 1)]
         else:
             # Create transitions between all pairs of slides
-            for i in range(len(self.slides)):
-                for j in range(i + 1, len(self.slides)):
-                    self.add_transition(i, j, max_triangles)
-                    count += 1
+            pairs = [
+                (i, j)
+                for i in range(len(self.slides))
+                for j in range(i + 1, len(self.slides))
+            ]
+
+        if bidirectional:
+            return self._add_bidirectional(pairs, max_triangles, workers, memory_budget)
+        return len(self.add_transitions(pairs, max_triangles, workers, memory_budget))
+
+    def _warm_started_all_pairs(self, max_triangles, workers, memory_budget):
+        """
+        Create all-pairs transitions in waves of increasing slide distance.
+
+        Wave d solves every i->i+d at once, each seeded with the composed
+        i->i+d-1->i+d assignment and the target prices of i+d-1->i+d from
+        earlier waves. The new transitions end up in the same order as a
+        cold all-pairs run.
+
+        Returns:
+            int: Number of transitions created
+        """
+        first_new = len(self.transitions)
+        slide_count = len(self.slides)
+        assignments = {}
+        target_prices = {}
+
+        for distance in range(1, slide_count):
+            pairs = [(i, i + distance) for i in range(slide_count - distance)]
+            warm_starts = []
+            for i, j in pairs:
+                if distance == 1:
+                    warm_starts.append(None)
+                    continue
+                composed = compose_assignments(
+                    assignments[(i, j - 1)], assignments[(j - 1, j)]
+                )
+                warm_starts.append((composed, target_prices.get((j - 1, j))))
+
+            infos = []
+            transitions = self.add_transitions(
+                pairs, max_triangles, workers, memory_budget, warm_starts, infos
+            )
+            for (i, j), transition, info in zip(pairs, transitions, infos):
+                n_from = len(self.slides[i]["triangles"])
+                if max_triangles:
+                    n_from = min(n_from, max_triangles)
+                assignments[(i, j)] = pairings_to_assignment(
+                    self.transition_pairings(transition), n_from
+                )
+                if "target_prices" in info:
+                    target_prices[(i, j)] = info["target_prices"]
 
-        return count
+        created = self.transitions[first_new:]
+        created.sort(key=lambda t: (t["from"], t["to"]))
+        self.transitions[first_new:] = created
+        return len(created)
 
-    def round_robin_transitions(self, max_triangles=None):
+    def round_robin_transitions(
+        self, max_triangles=None, workers=None, memory_budget=None, bidirectional=False
+    ):
         """
         Create round-robin transitions between slides (1-2-3-1).
 
@@ -123,6 +845,10 @@ class Slideshow:
 
         Args:
             max_triangles (int, optional): Maximum number of triangles to use
+            workers (int, optional): Number of worker processes, see add_transitions
+            memory_budget (int, optional): Memory limit for running jobs, see add_transitions
+            bidirectional (bool): Also add the reverse of every transition,
+                derived by inverting its pairings instead of solving again
 
         Returns:
             int: Number of transitions created
@@ -130,14 +856,79 @@ class Slideshow:
         if len(self.slides) < 2:
             return 0
 
-        # Create transitions between consecutive slides
-        count = self.auto_create_transitions(max_triangles, sequential_only=True)
+        # Consecutive slides, then the final transition from last slide back to first
+        pairs = [(i, i + 1) for i in range(len(self.slides) - 1)]
+        pairs.append((len(self.slides) - 1, 0))
+
+        if bidirectional:
+            return self._add_bidirectional(pairs, max_triangles, workers, memory_budget)
+        return len(self.add_transitions(pairs, max_triangles, workers, memory_budget))
+
+    def transition_distance_ratio(self, max_triangles=None, solver="hungarian"):
+        """
+        Compare the transitions' total pairing distance with a reference solver.
+
+        Every transition is solved again with ``solver`` and the same cost
+        options, e.g. to see how far a fast "greedy" build is from the optimum.
+        The reference solve runs without deadline, refinement and cache, and
+        only matched pairs count on both sides, not fade and spawn entries.
 
-        # Add the final transition from last slide back to first
-        self.add_transition(len(self.slides) - 1, 0, max_triangles)
-        count += 1
+        Args:
+            max_triangles (int, optional): Maximum number of triangles the
+                transitions were created with
+            solver (str): Reference solver, "auto" uses the memory_budget of
+                the transition options
 
-        return count
+        Returns:
+            float: Total distance of the transitions divided by the reference
+            total (1.0 if there is nothing to compare)
+        """
+        options = dict(self.transition_options)
+        for key in ("solver_options", "deadline", "refine", "anchor", "cache"):
+            options.pop(key, None)
+        options["solver"] = solver
+
+        total = reference = 0.0
+        for transition in self.transitions:
+            pairings = create_transition(
+                self.slides[transition["from"]]["triangles"],
+                self.slides[transition["to"]]["triangles"],
+                max_triangles,
+                **options,
+            )
+            pairs = Transition.from_pairings(self.transition_pairings(transition))
+            total += pairs.matched().total_distance()
+            reference += Transition.from_pairings(pairings).matched().total_distance()
+
+        return total / reference if reference else 1.0
+
+    def quality_summary(self):
+        """
+        Aggregate the cost and optimality gap of the transitions.
+
+        Only transitions with solve statistics count, see create_transition;
+        reverse transitions count with the cost of the transition they reverse.
+
+        Returns:
+            dict/None: "transitions", total "cost", total "lower_bound", the
+            overall "gap" of the totals, the transition with the "worst_gap"
+            as (from, to, gap), and the "seconds" spent solving (see
+            solve_seconds); None if no transition has statistics
+        """
+        measured = [t for t in self.transitions if "gap" in t]
+        if not measured:
+            return None
+        cost = sum(t["cost"] for t in measured)
+        lower_bound = sum(t["lower_bound"] for t in measured)
+        worst = max(measured, key=lambda t: t["gap"])
+        return {
+            "transitions": len(measured),
+            "cost": cost,
+            "lower_bound": lower_bound,
+            "gap": (cost - lower_bound) / cost if cost > 0 else 0.0,
+            "worst_gap": (worst["from"], worst["to"], worst["gap"]),
+            "seconds": self.solve_seconds,
+        }
 
     def standardize_triangle_counts(self):
         """
@@ -177,6 +968,66 @@ class Slideshow:
 
         return total_added
 
+    def canonicalize(self, reference=0, workers=None, memory_budget=None):
+        """
+        Reorder every slide's triangles to a shared index.
+
+        Transitions are solved along the slide sequence outward from the
+        reference slide, and each slide is permuted so that its triangle i is
+        the partner of triangle i of its neighbour towards the reference.
+        Afterwards any slide morphs into any other by index (triangle i into
+        triangle i), so no transitions need to be stored. Existing
+        transitions are dropped since their indices no longer apply.
+
+        Args:
+            reference (int): Slide whose triangle order is kept
+            workers (int, optional): Number of worker processes, see add_transitions
+            memory_budget (int, optional): Memory limit for running jobs, see add_transitions
+
+        Returns:
+            int: Number of slides that were reordered
+
+        Raises:
+            ValueError: If the reference is out of range or the slides have
+                different triangle counts (see standardize_triangle_counts)
+        """
+        if reference >= len(self.slides):
+            raise ValueError("Slide index out of range")
+        counts = {len(slide["triangles"]) for slide in self.slides}
+        if len(counts) > 1:
+            raise ValueError(
+                "Slides need equal triangle counts, run standardize_triangle_counts first"
+            )
+
+        # Chains reference -> reference+1 -> ... and reference -> reference-1 -> ...
+        pairs = [(i, i + 1) for i in range(reference, len(self.slides) - 1)]
+        pairs += [(i, i - 1) for i in range(reference, 0, -1)]
+        # The chain is only needed here, never stream it to a sink
+        sink, self.transition_sink = self.transition_sink, None
+        try:
+            transitions = self.add_transitions(pairs, None, workers, memory_budget)
+        finally:
+            self.transition_sink = sink
+        self.transitions = []
+
+        orders = {reference: np.arange(len(self.slides[reference]["triangles"]))}
+        for (from_index, to_index), transition in zip(pairs, transitions):
+            assignment = pairings_to_assignment(
+                transition["pairings"], len(orders[from_index])
+            )
+            orders[to_index] = assignment[orders[from_index]]
+
+        reordered = 0
+        for index, order in orders.items():
+            if index == reference:
+                continue
+            triangles = self.slides[index]["triangles"]
+            self.slides[index]["triangles"] = [triangles[i] for i in order]
+            reordered += 1
+
+        self.canonical = True
+        return reordered
+
     def _create_dummy_triangle(self, slide_idx, triangle_idx):
         """
         Create a dummy triangle for a specific slide.
@@ -274,7 +1125,7 @@ class Slideshow:
 
             # Add transitions from this slide
             transitions = [
-                {"to": t["to"], "filename": f"transition_{i}_to_{t['to']}.json"}
+                _manifest_transition(t, _transition_filename(i, t["to"]))
                 for t in self.transitions
                 if t["from"] == i
             ]
@@ -283,7 +1134,10 @@ class Slideshow:
 
             slides_dict.append(slide_dict)
 
-        return {"total_slides": len(self.slides), "slides": slides_dict}
+        data = {"total_slides": len(self.slides), "slides": slides_dict}
+        if self.canonical:
+            data["canonical"] = True
+        return data
 
     def export_individual_slides(self, output_dir):
         """
@@ -312,18 +1166,30 @@ class Slideshow:
             # Find all transitions starting from this slide
             for transition in self.transitions:
                 if transition["from"] == idx:
-                    transition_filename = (
-                        f"transition_{transition['from']}_to_{transition['to']}.json"
+                    transition_filename = _transition_filename(
+                        transition["from"], transition["to"]
                     )
                     transition_path = output_dir / transition_filename
 
-                    # Write transition file (just the pairings array)
-                    with open(transition_path, "w") as f:
-                        json.dump(transition["pairings"], f)
+                    if "pairings" not in transition:
+                        # Streamed: the sink has written the file already
+                        source = (
+                            self.transition_sink.output_dir / transition["filename"]
+                        )
+                        if source.resolve() != transition_path.resolve():
+                            shutil.copyfile(source, transition_path)
+                    else:
+                        # Write transition file (just the pairings array)
+                        with open(transition_path, "w") as f:
+                            f.write(
+                                Transition.from_pairings(
+                                    transition["pairings"]
+                                ).to_json()
+                            )
 
                     # Add to slide transitions
                     slide_transitions.append(
-                        {"to": transition["to"], "filename": transition_filename}
+                        _manifest_transition(transition, transition_filename)
                     )
 
             # Write slide file
@@ -353,6 +1219,8 @@ class Slideshow:
             "total_slides": len(self.slides),
             "slides": slides_manifest,
         }
+        if self.canonical:
+            manifest["canonical"] = True
 
         return manifest
 
@@ -370,6 +1238,7 @@ class Slideshow:
         slideshow = cls()
         slideshow.slides = data.get("slides", [])
         slideshow.transitions = data.get("transitions", [])
+        slideshow.canonical = data.get("canonical", False)
         return slideshow
 
 
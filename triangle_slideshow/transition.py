@@ -1,13 +1,188 @@
 """
 Transition module for triangle slideshow.
 
-This module handles creating transitions between triangle sets using the Hungarian algorithm.
+This module handles creating transitions between triangle sets using the Hungarian algorithm,
+a min-weight matching over sparse nearest-neighbour candidates for large sets, or an
+epsilon-scaling auction, per-cell solves on a spatial partition or entropic optimal
+transport (Sinkhorn) when near-optimal pairings are good enough.
 """
 
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import heapq
+import multiprocessing
+import os
 import numpy as np
-from scipy.optimize import linear_sum_assignment
+from scipy.cluster.vq import kmeans2
+from scipy.optimize import linear_sum_assignment, linprog
+from scipy.sparse import csr_matrix, eye, hstack, kron
+from scipy.sparse.csgraph import maximum_flow
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+import threading
 import time
 
+from triangle_slideshow import kernels
+
+# Name of the pairing cost, part of every transition cache key
+COST_FUNCTION = "centroid_distance"
+
+# Target working-set size for one block of cost matrix rows (roughly L2-sized)
+CACHE_BLOCK_BYTES = 1 << 20
+
+# Report cost matrix progress every this many rows
+PROGRESS_INTERVAL = 1000
+
+# Initial number of nearest candidates per triangle for the sparse solver
+SPARSE_NEIGHBORS = 12
+
+# Peak bytes per candidate edge of a sparse solve, reached while the
+# candidate graph is checked for a full matching
+SPARSE_EDGE_BYTES = 88
+
+# Default bound on how far an auction solution's total distance may exceed
+# the optimum (in pixels, summed over all pairings)
+AUCTION_TOLERANCE = 0.1
+
+# Default bound for the dense auction solver, relative to the sum of every
+# row's cheapest cost (which no assignment can undercut)
+AUCTION_RELATIVE_TOLERANCE = 0.02
+
+# Maximum number of triangles per side in one cell of the partitioned solver
+PARTITION_CELL_SIZE = 1024
+
+# A pair of the partitioned solver is re-paired globally when a cell edge is
+# closer to either triangle than this many times the pair's length
+PARTITION_BAND = 2.0
+
+# Passes of the partitioned solver that re-pair groups of neighbouring pairs
+# across cell boundaries, in groups of half a cell
+PARTITION_REFINE_PASSES = 2
+
+# Factor by which the auction epsilon shrinks between scaling phases
+AUCTION_EPSILON_FACTOR = 5.0
+
+# Share of warm-start pairs that must be happy at the initial auction epsilon
+WARM_START_QUANTILE = 0.9
+
+# Sinkhorn solver: maximum triangles per side of one kernel tile
+SINKHORN_TILE_SIZE = 128
+
+# Sinkhorn solver: default iteration cap; the plan only has to rank the
+# candidates of the greedy rounding
+SINKHORN_ITERATIONS = 20
+
+# Sinkhorn solver: final regularisation relative to the typical
+# nearest-neighbour cost, and the starting value it is annealed down from
+SINKHORN_REGULARIZATION = 0.1
+SINKHORN_START_REGULARIZATION = 4.0
+
+# Sinkhorn solver: factor the regularisation shrinks by per iteration
+SINKHORN_ANNEALING = 0.5
+
+# Sinkhorn solver: stop once the row marginals are off by at most this log ratio
+SINKHORN_TOLERANCE = 1e-3
+
+# Sinkhorn solver: tiles whose kernel terms are below the largest term of
+# every row by this many log units are skipped as negligible
+SINKHORN_TRUNCATION = 20.0
+
+# Sinkhorn solver: highest-plan columns per row kept for the rounding
+SINKHORN_CANDIDATES = 8
+
+# Sinkhorn solver: passes that re-pair groups of neighbouring pairs after
+# the greedy rounding, in groups of half a tile
+SINKHORN_REPAIR_PASSES = 8
+
+# Share of the triangles repair_transition may re-pair before it falls back
+# to solving the whole transition again
+REPAIR_MAX_FRACTION = 0.5
+
+# Largest set that solver="auto" still solves with the dense O(n^3)
+# Hungarian algorithm, even when its cost matrix fits the memory budget
+AUTO_DENSE_MAX_TRIANGLES = 5000
+
+# Smallest multilevel block solver="auto" shrinks to under a tight memory budget
+MIN_MULTILEVEL_BLOCK_SIZE = 64
+
+# Maximum number of triangles per side in a block the multilevel solver
+# pairs exactly
+MULTILEVEL_BLOCK_SIZE = 512
+
+# Points per cluster that seed the k-means clusters of the multilevel and
+# refinement steps, which bounds the seeding memory independently of the size
+KMEANS_SEED_SAMPLE = 8
+
+# Number of k-means clusters on each level of the multilevel solver
+MULTILEVEL_CLUSTERS = 16
+
+# Passes of the multilevel solver that re-pair groups of neighbouring pairs
+# across block boundaries
+MULTILEVEL_REFINE_PASSES = 4
+
+# Points per tile when the dual bound of a sparse auction is completed over
+# all columns
+DUAL_BOUND_TILE_SIZE = 128
+
+# Nearest candidates per triangle and price ascent rounds of the estimated
+# lower bound (transition_lower_bound)
+LOWER_BOUND_NEIGHBORS = 8
+LOWER_BOUND_ROUNDS = 20
+
+# Grid cells per side of the coarse transport lower bound
+LOWER_BOUND_GRID = 12
+
+# Random directions of the projection lower bound, besides the mean shift
+LOWER_BOUND_PROJECTIONS = 8
+
+# Nearest target candidates per triangle that refine_pairings tries swaps
+# with, and the rows whose swaps are evaluated at once
+REFINE_NEIGHBORS = 16
+REFINE_BATCH_SIZE = 1 << 16
+
+# Seconds refine_pairings runs at most unless told otherwise
+REFINE_TIME_LIMIT = 5.0
+
+# Smallest cost reduction for which refine_pairings makes a swap
+REFINE_TOLERANCE = 1e-6
+
+# Relative gap below which a transition counts as optimal, above the
+# rounding error of the float32 pairing distances
+QUALITY_TOLERANCE = 1e-6
+
+# Solver create_transition falls back to when a solve misses its deadline
+DEFAULT_FALLBACK_SOLVER = "greedy"
+
+# Pairing kinds of a Transition: a matched pair, a source triangle without
+# partner fading out into its nearest target, and a target triangle without
+# partner spawning from its nearest source. Index = value of Transition.kind
+PAIRING_KINDS = ("pair", "fade", "spawn")
+PAIR, FADE, SPAWN = range(len(PAIRING_KINDS))
+
+# Columns of the triangle feature matrix used by each weighted cost term:
+# centroid position, RGB colour, CIELAB colour, log area, and the principal
+# axis as (cos 2a, sin 2a) scaled by elongation (0 for equilateral triangles)
+COST_TERMS = {
+    "position": slice(0, 2),
+    "rgb": slice(2, 5),
+    "color": slice(5, 8),
+    "area": slice(8, 9),
+    "orientation": slice(9, 11),
+}
+
+# Number of columns of the triangle feature matrix
+FEATURE_COUNT = 11
+
+# D65 sRGB to CIE XYZ, rows normalised by the white point
+_RGB_TO_XYZ = np.array(
+    [
+        [0.4124, 0.3576, 0.1805],
+        [0.2126, 0.7152, 0.0722],
+        [0.0193, 0.1192, 0.9505],
+    ]
+) / np.array([[0.95047], [1.0], [1.08883]])
+
 
 def calculate_centroid(triangle_coords):
     """Calculate centroid of a triangle from its coordinates."""
@@ -15,51 +190,2641 @@ def calculate_centroid(triangle_coords):
     return np.mean(points, axis=0)
 
 
-def calculate_cost_matrix(triangles_a, triangles_b):
+def calculate_centroids(triangles):
+    """
+    Calculate the centroids of a whole triangle set in one array operation.
+
+    Args:
+        triangles (list): Triangles with a "coordinates" key
+
+    Returns:
+        np.ndarray: Array of shape (n, 2) with one centroid per triangle
+    """
+    if len(triangles) == 0:
+        return np.empty((0, 2))
+
+    coordinates = np.asarray([t["coordinates"] for t in triangles], dtype=np.float64)
+    return coordinates.mean(axis=1)
+
+
+def _as_centroids(triangles):
+    """Return centroids for a triangle list, passing centroid arrays through."""
+    if isinstance(triangles, np.ndarray):
+        return triangles[:, :2]
+    return calculate_centroids(triangles)
+
+
+def _rgb_to_lab(rgb):
+    """Convert (n, 3) sRGB colours in 0-255 to CIELAB."""
+    srgb = rgb / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _RGB_TO_XYZ.T
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack(
+        [
+            116 * f[:, 1] - 16,
+            500 * (f[:, 0] - f[:, 1]),
+            200 * (f[:, 1] - f[:, 2]),
+        ],
+        axis=1,
+    )
+
+
+def calculate_features(triangles):
+    """
+    Extract the per-triangle features of the weighted transition cost.
+
+    Computed once per slide, so building a cost matrix only takes
+    differences of these columns (see COST_TERMS for the layout).
+
+    Args:
+        triangles (list): Triangles with "coordinates" and optional "color" keys
+
+    Returns:
+        np.ndarray: C-contiguous float32 array of shape (n, FEATURE_COUNT)
+    """
+    features = np.zeros((len(triangles), FEATURE_COUNT), dtype=np.float32)
+    if len(triangles) == 0:
+        return features
+
+    coordinates = np.asarray([t["coordinates"] for t in triangles], dtype=np.float64)
+    rgb = np.asarray(
+        [list(t.get("color", (0, 0, 0)))[:3] for t in triangles], dtype=np.float64
+    )
+    centroids = coordinates.mean(axis=1)
+    offsets = coordinates - centroids[:, None, :]
+    edge_a = coordinates[:, 1] - coordinates[:, 0]
+    edge_b = coordinates[:, 2] - coordinates[:, 0]
+    area = 0.5 * np.abs(edge_a[:, 0] * edge_b[:, 1] - edge_a[:, 1] * edge_b[:, 0])
+
+    # Principal axis from the vertex second moments
+    sxx = (offsets[:, :, 0] ** 2).mean(axis=1)
+    syy = (offsets[:, :, 1] ** 2).mean(axis=1)
+    sxy = (offsets[:, :, 0] * offsets[:, :, 1]).mean(axis=1)
+    spread = np.maximum(sxx + syy, np.finfo(np.float64).tiny)
+
+    features[:, COST_TERMS["position"]] = centroids
+    features[:, COST_TERMS["rgb"]] = rgb
+    features[:, COST_TERMS["color"]] = _rgb_to_lab(rgb)
+    features[:, 8] = np.log(np.maximum(area, 1e-6))
+    # Halved so the orientation term lies in [0, 1]
+    features[:, 9] = 0.5 * (sxx - syy) / spread
+    features[:, 10] = sxy / spread
+    return features
+
+
+def _as_features(triangles):
+    """Return features for a triangle list, passing feature arrays through."""
+    if isinstance(triangles, np.ndarray):
+        return triangles
+    return calculate_features(triangles)
+
+
+def normalize_cost_weights(cost_weights):
+    """
+    Validate cost weights and drop zero terms.
+
+    Args:
+        cost_weights (dict/None): Weight per term of COST_TERMS
+
+    Returns:
+        dict/None: The non-zero weights, or None for the plain centroid
+        distance ({"position": 1.0})
+
+    Raises:
+        ValueError: If a term is unknown, a weight is negative, or all are zero
+    """
+    if cost_weights is None:
+        return None
+    unknown = set(cost_weights) - set(COST_TERMS)
+    if unknown:
+        raise ValueError(
+            f"Unknown cost terms {sorted(unknown)}, expected some of {list(COST_TERMS)}"
+        )
+    weights = {}
+    for term in COST_TERMS:
+        weight = float(cost_weights.get(term, 0.0))
+        if weight < 0:
+            raise ValueError(f"Cost weight of '{term}' must not be negative")
+        if weight > 0:
+            weights[term] = weight
+    if not weights:
+        raise ValueError("At least one cost weight must be positive")
+    if weights == {"position": 1.0}:
+        return None
+    return weights
+
+
+def pair_costs(features_a, features_b, weights):
+    """
+    Weighted cost of aligned triangle pairs (row i of a with row i of b).
+
+    Args:
+        features_a (np.ndarray): (n, FEATURE_COUNT) features
+        features_b (np.ndarray): (n, FEATURE_COUNT) features
+        weights (dict): Normalised cost weights
+
+    Returns:
+        np.ndarray: (n,) float64 costs
+    """
+    difference = features_a.astype(np.float64) - features_b
+    costs = np.zeros(len(difference))
+    for term, weight in weights.items():
+        costs += weight * np.linalg.norm(difference[:, COST_TERMS[term]], axis=1)
+    return costs
+
+
+def _candidate_points(features, weights):
+    """Weighted feature columns whose Euclidean distance approximates the cost."""
+    return np.concatenate(
+        [weight * features[:, COST_TERMS[term]] for term, weight in weights.items()],
+        axis=1,
+    ).astype(np.float64)
+
+
+def _fill_cost_block(out, features_a, features_b, weights):
+    """Write the weighted costs between a block of rows and all columns into out."""
+    term_cost = np.empty_like(out)
+    scratch = np.empty_like(out)
+    out[...] = 0
+    for term, weight in weights.items():
+        columns = range(COST_TERMS[term].start, COST_TERMS[term].stop)
+        first = columns[0]
+        np.subtract(
+            features_a[:, first : first + 1], features_b[:, first], out=term_cost
+        )
+        if len(columns) == 1:
+            np.abs(term_cost, out=term_cost)
+        elif len(columns) == 2:
+            np.subtract(
+                features_a[:, first + 1 : first + 2],
+                features_b[:, first + 1],
+                out=scratch,
+            )
+            np.hypot(term_cost, scratch, out=term_cost)
+        else:
+            np.multiply(term_cost, term_cost, out=term_cost)
+            for column in columns[1:]:
+                np.subtract(
+                    features_a[:, column : column + 1],
+                    features_b[:, column],
+                    out=scratch,
+                )
+                np.multiply(scratch, scratch, out=scratch)
+                term_cost += scratch
+            np.sqrt(term_cost, out=term_cost)
+        if weight != 1.0:
+            term_cost *= weight
+        out += term_cost
+
+
+def _block_rows(n_cols, itemsize):
+    """Number of cost matrix rows that keep one block and its temporaries in cache."""
+    # Each block needs the output rows plus two same-sized temporaries (dx, dy)
+    rows = CACHE_BLOCK_BYTES // max(1, 3 * n_cols * itemsize)
+    return int(min(max(rows, 1), PROGRESS_INTERVAL))
+
+
+def calculate_cost_matrix(
+    triangles_a, triangles_b, dtype=np.float64, out=None, weights=None
+):
+    """
+    Calculate cost matrix for the Hungarian algorithm.
+    Cost is the Euclidean distance between triangle centroids, or a weighted
+    sum of feature distances (see COST_TERMS) when ``weights`` are given.
+
+    The matrix is filled in row blocks sized to stay in cache, so the
+    temporaries never grow beyond a few megabytes regardless of n.
+
+    Args:
+        triangles_a (list/np.ndarray): First set of triangles, or their (n, 2)
+            centroids or (n, FEATURE_COUNT) features
+        triangles_b (list/np.ndarray): Second set of triangles, likewise
+        dtype (np.dtype, optional): Matrix dtype, e.g. np.float32 to halve memory
+        out (np.ndarray, optional): Preallocated (n, m) buffer to write into;
+            its dtype takes precedence over ``dtype``
+        weights (dict, optional): Cost weight per term of COST_TERMS, e.g.
+            {"position": 1.0, "color": 0.5}
+
+    Returns:
+        np.ndarray: Cost matrix where each cell is the distance between centroids
+
+    Raises:
+        ValueError: If either triangle set is empty or ``out`` has the wrong shape
+    """
+    # Check for empty triangle sets
+    if len(triangles_a) == 0 or len(triangles_b) == 0:
+        raise ValueError("Triangle sets cannot be empty")
+
+    n_rows, n_cols = len(triangles_a), len(triangles_b)
+    if out is None:
+        out = np.empty((n_rows, n_cols), dtype=dtype)
+    elif out.shape != (n_rows, n_cols):
+        raise ValueError(
+            f"Output buffer has shape {out.shape}, expected {(n_rows, n_cols)}"
+        )
+
+    weights = normalize_cost_weights(weights)
+
+    print(f"Calculating cost matrix for {n_rows} x {n_cols} triangles...")
+    start_time = time.time()
+
+    # Both the centroid distances and every weighted term go through two
+    # temporaries the size of the output block
+    block = _block_rows(n_cols, out.dtype.itemsize)
+    if weights is None:
+        # Pre-calculate all centroids, in the working precision of the output
+        points_a = _as_centroids(triangles_a).astype(out.dtype, copy=False)
+        points_b = _as_centroids(triangles_b).astype(out.dtype, copy=False)
+    else:
+        points_a = _as_features(triangles_a).astype(out.dtype, copy=False)
+        points_b = _as_features(triangles_b).astype(out.dtype, copy=False)
+
+    next_report = PROGRESS_INTERVAL
+    for row_start in range(0, n_rows, block):
+        row_end = min(row_start + block, n_rows)
+        if weights is None:
+            # Euclidean distance between centroids
+            kernels.centroid_costs(
+                out[row_start:row_end], points_a[row_start:row_end], points_b
+            )
+        else:
+            _fill_cost_block(
+                out[row_start:row_end], points_a[row_start:row_end], points_b, weights
+            )
+
+        if row_end >= next_report and row_end < n_rows:
+            print(f"  Processed {row_end}/{n_rows} triangles...")
+            next_report += PROGRESS_INTERVAL
+
+    elapsed = time.time() - start_time
+    print(f"Cost matrix calculation completed in {elapsed:.2f} seconds")
+    return out
+
+
+class CostMatrixPool:
+    """
+    Reusable buffers for the dense cost matrices of consecutive transitions.
+
+    Each solve borrows a buffer with matrix() instead of allocating a fresh
+    n x m matrix, so a long build with same-sized slides allocates it once.
+    A buffer is only replaced when a larger matrix is needed, and a buffer
+    borrowed while another solve holds it (e.g. from a second thread) is a
+    fresh one that is dropped afterwards.
+    """
+
+    def __init__(self, dtype=np.float64):
+        """
+        Initialize an empty pool.
+
+        Args:
+            dtype (np.dtype, optional): Default matrix dtype; np.float32 halves
+                the memory of solvers that work on it directly
+        """
+        self.dtype = np.dtype(dtype)
+        self.allocations = 0
+        self.reuses = 0
+        self.peak_bytes = 0
+        self._buffers = {}
+        self._lent_bytes = 0
+        self._lock = threading.Lock()
+
+    def _held_bytes(self):
+        return self._lent_bytes + sum(b.nbytes for b in self._buffers.values())
+
+    @contextmanager
+    def matrix(self, n_rows, n_cols, dtype=None):
+        """
+        Borrow an uninitialised (n_rows, n_cols) matrix for the duration of a with block.
+
+        Args:
+            n_rows (int): Number of rows
+            n_cols (int): Number of columns
+            dtype (np.dtype, optional): Matrix dtype (default: the pool's dtype)
+
+        Yields:
+            np.ndarray: C-contiguous matrix view into a pooled buffer
+        """
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        size = n_rows * n_cols
+        with self._lock:
+            buffer = self._buffers.pop(dtype, None)
+            if buffer is not None and buffer.size >= size:
+                self.reuses += 1
+            else:
+                # Free the smaller buffer before allocating its replacement
+                buffer = None
+                buffer = np.empty(size, dtype=dtype)
+                self.allocations += 1
+            self._lent_bytes += buffer.nbytes
+            self.peak_bytes = max(self.peak_bytes, self._held_bytes())
+        try:
+            yield buffer[:size].reshape(n_rows, n_cols)
+        finally:
+            with self._lock:
+                self._lent_bytes -= buffer.nbytes
+                pooled = self._buffers.get(dtype)
+                if pooled is None or pooled.size < buffer.size:
+                    self._buffers[dtype] = buffer
+
+    def release(self):
+        """Free the pooled buffers (statistics are kept)."""
+        with self._lock:
+            self._buffers.clear()
+
+    def stats(self):
+        """
+        Allocation statistics of this pool.
+
+        Returns:
+            dict: allocations, reuses, bytes currently pooled and peak_bytes
+            held at once
+        """
+        with self._lock:
+            return {
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+                "bytes": sum(b.nbytes for b in self._buffers.values()),
+                "peak_bytes": self.peak_bytes,
+            }
+
+
+# Cost matrix buffers shared by the dense solvers of this process
+COST_MATRIX_POOL = CostMatrixPool()
+
+
+def _solve_hungarian(row_triangles, col_triangles, cost_weights=None, features=None):
+    """
+    Solve the assignment exactly on the dense cost matrix.
+
+    Args:
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (row_features, col_features) for cost_weights
+
+    Returns:
+        tuple: (row_indices, col_indices, distances, info)
+    """
+    n_rows, n_cols = len(row_triangles), len(col_triangles)
+    # linear_sum_assignment would copy any other dtype to float64
+    with COST_MATRIX_POOL.matrix(n_rows, n_cols, np.float64) as out:
+        if cost_weights is None:
+            cost_matrix = calculate_cost_matrix(row_triangles, col_triangles, out=out)
+        else:
+            cost_matrix = calculate_cost_matrix(
+                *features, out=out, weights=cost_weights
+            )
+
+        print("Running Hungarian algorithm...")
+        start_time = time.time()
+        row_indices, col_indices = linear_sum_assignment(cost_matrix)
+        elapsed = time.time() - start_time
+        print(f"Hungarian algorithm completed in {elapsed:.2f} seconds")
+
+        row_indices = np.asarray(row_indices)
+        col_indices = np.asarray(col_indices)
+        distances = cost_matrix[row_indices, col_indices].astype(np.float64)
+    # The solution is optimal, so its cost is the tightest bound
+    return row_indices, col_indices, distances, {"lower_bound": distances.sum()}
+
+
+def build_candidate_graph(centroids_rows, centroids_cols, k):
+    """
+    Build a sparse k-nearest-neighbour candidate graph between two centroid sets.
+
+    Args:
+        centroids_rows (np.ndarray): (n, 2) row centroids
+        centroids_cols (np.ndarray): (m, 2) column centroids
+        k (int): Number of candidates per row (clipped to m)
+
+    Returns:
+        tuple: (neighbors, distances) arrays of shape (n, k), holding the
+        candidate column indices of every row and their centroid distances
+    """
+    n_rows, n_cols = len(centroids_rows), len(centroids_cols)
+    k = min(k, n_cols)
+
+    tree = cKDTree(centroids_cols)
+    distances, neighbors = tree.query(centroids_rows, k=k)
+    return neighbors.reshape(n_rows, k), distances.reshape(n_rows, k)
+
+
+def _matching_deficit(neighbors, n_cols):
+    """
+    Rows and columns that a maximum matching of a candidate graph leaves unpaired.
+
+    Solved as a unit-capacity max flow (Dinic), which stays fast on the
+    kNN graphs where csgraph's maximum_bipartite_matching can stall.
+
+    Returns:
+        tuple: (rows, cols) index arrays; no row is unpaired if the graph
+        admits a full matching
+    """
+    n_rows, k = neighbors.shape
+    source, sink = n_rows + n_cols, n_rows + n_cols + 1
+    # Built directly in int32 CSR form (rows, columns, source, sink), as the
+    # edge list of a COO construction would take several times the memory
+    heads = np.concatenate(
+        [
+            (neighbors + n_rows).ravel(),
+            np.full(n_cols, sink),
+            np.arange(n_rows),
+        ]
+    ).astype(np.int32)
+    starts = np.concatenate(
+        [
+            np.arange(0, n_rows * k, k),
+            n_rows * k + np.arange(n_cols),
+            [n_rows * k + n_cols, heads.size, heads.size],
+        ]
+    ).astype(np.int32)
+    network = csr_matrix(
+        (np.ones(heads.size, dtype=np.int32), heads, starts),
+        shape=(sink + 1, sink + 1),
+    )
+    del heads, starts
+    flow = maximum_flow(network, source, sink, method="dinic").flow
+    del network
+    paired_rows = flow[source, :n_rows].toarray().ravel() > 0
+    paired_cols = flow[n_rows : n_rows + n_cols, sink].toarray().ravel() > 0
+    return np.flatnonzero(~paired_rows), np.flatnonzero(~paired_cols)
+
+
+def _has_full_matching(neighbors, n_cols):
+    """Check whether every row of a candidate graph can be matched."""
+    return not len(_matching_deficit(neighbors, n_cols)[0])
+
+
+def _auction(
+    neighbors,
+    costs,
+    n_cols,
+    eps_final,
+    time_limit=None,
+    prices=None,
+    initial_assignment=None,
+):
+    """
+    Minimum-cost forward auction with epsilon scaling over a candidate graph.
+
+    All unassigned rows bid simultaneously (Jacobi bidding) with NumPy, and
+    each column goes to its highest bidder. Epsilon shrinks by
+    AUCTION_EPSILON_FACTOR per phase, prices carrying over between phases.
+    Every completed phase leaves an assignment within ``n * eps`` of the
+    optimal total cost on the candidate graph, which must admit a full
+    matching. With more columns than rows that only holds if no unpaired
+    column is priced above a paired one, so the unpaired columns are reset
+    to the lowest price before the last phase.
+
+    A warm start seeds the auction with an assignment and prices: pairs that
+    are eps-happy under those prices are kept, and if all of them are the
+    seed is returned without a single bid.
+
+    Args:
+        neighbors (np.ndarray): (n, k) candidate column indices per row, or
+            None to let every row bid on every column
+        costs (np.ndarray): (n, k) cost of each candidate edge, or the full
+            (n, m) cost matrix when ``neighbors`` is None
+        n_cols (int): Number of columns (n <= n_cols)
+        eps_final (float): Epsilon of the last scaling phase
+        time_limit (float, optional): Seconds after which the running phase is
+            abandoned and the last completed phase's assignment is returned;
+            a first phase still running is finished at an epsilon above the
+            cost range, where an outbid row moves on instead of bidding back
+        prices (np.ndarray, optional): Initial column prices
+        initial_assignment (np.ndarray, optional): Seed column per row (-1 for
+            none); scaling then starts at the epsilon WARM_START_QUANTILE of
+            the seed pairs are happy at
+
+    Returns:
+        tuple: (assignment, prices, eps) where assignment[i] is the column of
+        row i and eps is the epsilon that assignment is optimal to
+    """
+    n_rows, n_candidates = costs.shape
+    benefit = -costs
+    cost_range = float(costs.max() - costs.min()) if costs.size else 0.0
+    prices = np.zeros(n_cols) if prices is None else np.array(prices, dtype=float)
+    deadline = None if time_limit is None else time.time() + time_limit
+    best = None
+
+    owner = np.full(n_cols, -1)
+    assignment = np.full(n_rows, -1)
+    slot = np.full(n_rows, -1)
+
+    def candidate_values():
+        return benefit - (prices if neighbors is None else prices[neighbors])
+
+    def slack():
+        # How far each row's current column is from its best candidate
+        values = candidate_values()
+        assigned_value = np.where(
+            assignment >= 0,
+            values[np.arange(n_rows), np.maximum(slot, 0)],
+            -np.inf,
+        )
+        return values.max(axis=1) - assigned_value
+
+    def lower_free_prices():
+        # With more columns than rows, the result is only eps-optimal if no
+        # unpaired column is priced above a paired one
+        if n_cols > n_rows:
+            prices[owner < 0] = prices.min()
+
+    def release_unhappy(eps):
+        # Keep the pairs that are eps-happy; only the rest bid again. Every
+        # released column is made cheap, which can upset further pairs
+        while True:
+            if eps <= eps_final:
+                lower_free_prices()
+            unhappy = slack() > eps * (1 + 1e-9)
+            released = unhappy & (assignment >= 0)
+            owner[assignment[released]] = -1
+            assignment[unhappy] = -1
+            if n_cols == n_rows or not released.any():
+                return np.flatnonzero(assignment < 0)
+
+    eps = max(cost_range / AUCTION_EPSILON_FACTOR, eps_final)
+    bidders = np.arange(n_rows)
+    if initial_assignment is not None:
+        seed = np.asarray(initial_assignment)
+        if neighbors is None:
+            seed_slot = seed
+            valid = seed >= 0
+        else:
+            matches = neighbors == seed[:, None]
+            seed_slot = matches.argmax(axis=1)
+            valid = (seed >= 0) & matches.any(axis=1)
+        # A column claimed twice is left to the bidding
+        columns, counts = np.unique(seed[valid], return_counts=True)
+        valid &= np.isin(seed, columns[counts == 1])
+        assignment[valid] = seed[valid]
+        slot[valid] = seed_slot[valid]
+        owner[assignment[valid]] = np.flatnonzero(valid)
+
+        # Start at the epsilon most seed pairs are already happy at
+        lower_free_prices()
+        seed_slack = slack()
+        seed_slack = seed_slack[np.isfinite(seed_slack)]
+        if seed_slack.size and seed_slack.max() <= eps_final * (1 + 1e-9):
+            if valid.all():
+                return assignment, prices, eps_final
+        if seed_slack.size:
+            eps = max(min(np.quantile(seed_slack, WARM_START_QUANTILE), eps), eps_final)
+        bidders = release_unhappy(eps)
+
+    while True:
+        while bidders.size:
+            if deadline is not None and time.time() > deadline:
+                if best is not None:
+                    return best
+                # Nothing to return yet: finish this phase with bids above
+                # the cost range, so every outbid row takes a free column
+                eps = max(eps, cost_range + 1.0)
+            choice, best_value, second_value = kernels.best_two(
+                benefit, prices, neighbors, bidders
+            )
+            if n_candidates == 1:
+                second_value = best_value - cost_range - 1.0
+            targets = choice if neighbors is None else neighbors[bidders, choice]
+            bids = prices[targets] + (best_value - second_value) + eps
+
+            # Each contested column goes to its highest bid
+            order = np.lexsort((-bids, targets))
+            first = np.ones(order.size, dtype=bool)
+            first[1:] = targets[order[1:]] != targets[order[:-1]]
+            winners = order[first]
+            won = targets[winners]
+
+            outbid = owner[won]
+            assignment[outbid[outbid >= 0]] = -1
+            owner[won] = bidders[winners]
+            assignment[bidders[winners]] = won
+            slot[bidders[winners]] = choice[winners]
+            prices[won] = bids[winners]
+            bidders = np.flatnonzero(assignment < 0)
+
+        best = (assignment.copy(), prices.copy(), eps)
+        if eps <= eps_final:
+            return best
+        if deadline is not None and time.time() > deadline:
+            return best
+        eps = max(eps / AUCTION_EPSILON_FACTOR, eps_final)
+        bidders = release_unhappy(eps)
+
+
+def _auction_info(assignment, prices, eps, initial_assignment=None):
+    """Solver statistics for an auction result."""
+    info = {
+        "epsilon": float(eps),
+        "optimality_bound": float(eps * len(assignment)),
+        "prices": prices,
+    }
+    if initial_assignment is not None:
+        info["warm_start_kept"] = float(
+            np.mean(np.asarray(initial_assignment) == assignment)
+        )
+    return info
+
+
+def _dual_bound(cost_matrix, prices):
+    """
+    Lower bound sum_i min_j (c_ij + p_j) - sum_j p_j of a full cost matrix.
+
+    Valid for any column prices, which are shifted to a minimum of zero as
+    columns may stay unpaired when there are more columns than rows.
+    """
+    prices = prices - prices.min()
+    bound = -prices.sum()
+    block = max(1, CACHE_BLOCK_BYTES // (8 * max(1, len(prices))))
+    for start in range(0, len(cost_matrix), block):
+        bound += (cost_matrix[start : start + block] + prices).min(axis=1).sum()
+    return float(bound)
+
+
+def _median_tiles(points, size):
+    """Split points into tiles of at most ``size`` by median cuts along the widest axis."""
+    tiles = []
+    stack = [np.arange(len(points))]
+    while stack:
+        indices = stack.pop()
+        if len(indices) <= size:
+            tiles.append(indices)
+            continue
+        tile_points = points[indices]
+        axis = np.argmax(np.ptp(tile_points, axis=0))
+        order = np.argsort(tile_points[:, axis], kind="stable")
+        half = len(indices) // 2
+        stack += [indices[order[:half]], indices[order[half:]]]
+    return tiles
+
+
+def _tiled_minima(
+    points_rows, points_cols, offsets, cost=None, tile_size=DUAL_BOUND_TILE_SIZE
+):
+    """
+    Each row's min_j (c_ij + offsets_j) over all columns, without a full cost matrix.
+
+    Each row's minimum starts from its nearest columns and is completed tile
+    by tile: both sets are cut into tiles of ``tile_size`` points, and a
+    column tile is only evaluated for a row tile if the distance between
+    their bounding boxes plus the tile's lowest offset is below the row
+    tile's largest minimum so far. Costs are never below the distance of
+    the points, so the minima are exact.
+    """
+    n_rows = len(points_rows)
+    k = min(SPARSE_NEIGHBORS, len(points_cols))
+    distances, neighbors = cKDTree(points_cols).query(points_rows, k=k)
+    neighbors = neighbors.reshape(n_rows, k)
+    if cost is None:
+        distances = distances.reshape(n_rows, k)
+    else:
+        features_rows, features_cols, weights = cost
+        distances = pair_costs(
+            np.repeat(features_rows, k, axis=0),
+            features_cols[neighbors.ravel()],
+            weights,
+        ).reshape(n_rows, k)
+    best = (distances + offsets[neighbors]).min(axis=1)
+
+    row_tiles = _median_tiles(points_rows, tile_size)
+    col_tiles = _median_tiles(points_cols, tile_size)
+    row_boxes = [
+        (points_rows[t].min(axis=0), points_rows[t].max(axis=0)) for t in row_tiles
+    ]
+    col_low = np.array([points_cols[t].min(axis=0) for t in col_tiles])
+    col_high = np.array([points_cols[t].max(axis=0) for t in col_tiles])
+    col_offset = np.array([offsets[t].min() for t in col_tiles])
+    for rows, (low, high) in zip(row_tiles, row_boxes):
+        gap = np.maximum(np.maximum(col_low - high, low - col_high), 0.0)
+        reachable = np.linalg.norm(gap, axis=1) + col_offset
+        for tile in np.flatnonzero(reachable < best[rows].max()):
+            cols = col_tiles[tile]
+            if cost is None:
+                block = _distance_matrix(points_rows[rows], points_cols[cols])
+            else:
+                block = _distance_matrix(
+                    features_rows[rows], features_cols[cols], weights
+                )
+            best[rows] = np.minimum(best[rows], (block + offsets[cols]).min(axis=1))
+    return best
+
+
+def _candidate_dual_bound(
+    points_rows,
+    points_cols,
+    prices,
+    cost=None,
+    tile_size=DUAL_BOUND_TILE_SIZE,
+    values=None,
+):
+    """
+    Lower bound sum_i min_j (c_ij + p_j) - sum_j p_j without a full cost matrix.
+
+    The same bound as _dual_bound, for prices from a sparse auction, with
+    the minima taken by _tiled_minima. Prices raised on a candidate graph
+    alone leave columns outside it cheap, which can make the bound far
+    from the optimum; given ``values``, each row's cost plus the price of
+    its assigned column, the prices are first replaced by the lowest that
+    keep every row's minimum at its value, p_j = max(0, max_i (values_i -
+    c_ij)), the best bound for those row values.
+
+    Args:
+        points_rows (np.ndarray): (n, d) row points
+        points_cols (np.ndarray): (m, d) column points
+        prices (np.ndarray): Column prices
+        cost (tuple, optional): (row_features, col_features, weights) when the
+            points are the candidate points of a weighted cost
+        tile_size (int): Maximum points per tile
+        values (np.ndarray, optional): Cost plus price of each row's
+            assigned column
+
+    Returns:
+        float: Lower bound on the total cost of any assignment of every row
+    """
+    shift = prices.min()
+    prices = prices - shift
+    bound = _tiled_minima(points_rows, points_cols, prices, cost, tile_size)
+    bound = float(bound.sum() - prices.sum())
+    if values is None:
+        return bound
+
+    values = values - shift
+    swapped = None if cost is None else (cost[1], cost[0], cost[2])
+    tightened = np.maximum(
+        -_tiled_minima(points_cols, points_rows, -values, swapped, tile_size), 0.0
+    )
+    minima = _tiled_minima(points_rows, points_cols, tightened, cost, tile_size)
+    return max(bound, float(minima.sum() - tightened.sum()))
+
+
+class Transition(Sequence):
+    """
+    Pairings of a transition, stored as typed arrays.
+
+    Holds int32 source and target indices and float32 distances, 12 bytes
+    per pairing instead of a few hundred for a list of dictionaries. For
+    backward compatibility it is a read-only sequence of pairing
+    dictionaries (from_index, to_index, distance keys), built on access, and
+    compares equal to a list of such dictionaries with the same content.
+
+    Entries for triangles without partner (see anchor_unmatched) have a
+    non-zero ``kind`` and a "type" key of "fade" or "spawn" in their dict.
+    """
+
+    __slots__ = ("from_index", "to_index", "distance", "kind")
+
+    def __init__(self, from_index=(), to_index=(), distance=(), kind=None):
+        """
+        Initialize a transition from index and distance arrays.
+
+        Args:
+            from_index (array-like): Source triangle index per pairing
+            to_index (array-like): Target triangle index per pairing
+            distance (array-like): Pairing cost per pairing
+            kind (array-like, optional): Index into PAIRING_KINDS per pairing
+                (default: all matched pairs)
+        """
+        self.from_index = np.asarray(from_index, dtype=np.int32).reshape(-1)
+        self.to_index = np.asarray(to_index, dtype=np.int32).reshape(-1)
+        self.distance = np.asarray(distance, dtype=np.float32).reshape(-1)
+        if kind is None:
+            self.kind = np.zeros(len(self.from_index), dtype=np.int8)
+        else:
+            self.kind = np.asarray(kind, dtype=np.int8).reshape(-1)
+        if not (
+            len(self.from_index)
+            == len(self.to_index)
+            == len(self.distance)
+            == len(self.kind)
+        ):
+            raise ValueError("Transition arrays must have the same length")
+
+    @classmethod
+    def from_pairings(cls, pairings):
+        """
+        Build a transition from pairing dictionaries (or return a Transition as is).
+
+        Args:
+            pairings (list/Transition): Pairings of a transition
+
+        Returns:
+            Transition: The pairings as arrays
+        """
+        if isinstance(pairings, cls):
+            return pairings
+        return cls(
+            [p["from_index"] for p in pairings],
+            [p["to_index"] for p in pairings],
+            [p["distance"] for p in pairings],
+            [PAIRING_KINDS.index(p.get("type", "pair")) for p in pairings],
+        )
+
+    def __len__(self):
+        return len(self.from_index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Transition(
+                self.from_index[index],
+                self.to_index[index],
+                self.distance[index],
+                self.kind[index],
+            )
+        return _pairing_dict(
+            int(self.from_index[index]),
+            int(self.to_index[index]),
+            float(self.distance[index]),
+            int(self.kind[index]),
+        )
+
+    def __iter__(self):
+        for f, t, d, k in zip(
+            self.from_index.tolist(),
+            self.to_index.tolist(),
+            self.distance.tolist(),
+            self.kind.tolist(),
+        ):
+            yield _pairing_dict(f, t, d, k)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple)):
+            try:
+                other = Transition.from_pairings(other)
+            except (KeyError, TypeError):
+                return False
+        if not isinstance(other, Transition):
+            return NotImplemented
+        return (
+            np.array_equal(self.from_index, other.from_index)
+            and np.array_equal(self.to_index, other.to_index)
+            and np.array_equal(self.distance, other.distance)
+            and np.array_equal(self.kind, other.kind)
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Transition({len(self)} pairings)"
+
+    @property
+    def nbytes(self):
+        """Bytes held by the arrays."""
+        return (
+            self.from_index.nbytes
+            + self.to_index.nbytes
+            + self.distance.nbytes
+            + self.kind.nbytes
+        )
+
+    def matched(self):
+        """
+        The matched pairs only, without fade and spawn entries.
+
+        Returns:
+            Transition: Pairings of kind "pair"
+        """
+        if not self.kind.any():
+            return self
+        keep = self.kind == PAIR
+        return Transition(
+            self.from_index[keep], self.to_index[keep], self.distance[keep]
+        )
+
+    def total_distance(self):
+        """Sum of the pairing distances."""
+        return float(self.distance.sum(dtype=np.float64))
+
+    def to_list(self):
+        """
+        Pairings as a list of dictionaries.
+
+        Returns:
+            list: Pairing dictionaries with from_index, to_index, distance keys
+        """
+        return list(self)
+
+    def to_json(self):
+        """
+        Serialise to a JSON array of pairing objects.
+
+        Produces the same layout as json.dump of the dictionaries, built with
+        vectorised string operations instead of one object per pairing.
+
+        Returns:
+            str: JSON text
+        """
+        if not len(self):
+            return "[]"
+        objects = np.char.add(
+            np.char.add('{"from_index": ', self.from_index.astype(str)),
+            np.char.add(', "to_index": ', self.to_index.astype(str)),
+        )
+        types = np.array(["", *(f', "type": "{k}"' for k in PAIRING_KINDS[1:])])
+        objects = np.char.add(
+            objects,
+            np.char.add(
+                np.char.add(', "distance": ', self.distance.astype(str)),
+                np.char.add(types[self.kind], "}"),
+            ),
+        )
+        return "[" + ", ".join(objects.tolist()) + "]"
+
+
+def _pairing_dict(from_index, to_index, distance, kind):
+    pairing = {"from_index": from_index, "to_index": to_index, "distance": distance}
+    if kind != PAIR:
+        pairing["type"] = PAIRING_KINDS[kind]
+    return pairing
+
+
+def pairings_to_assignment(pairings, n_from):
+    """
+    Convert pairings to an array mapping each source triangle to its target.
+
+    Args:
+        pairings (list/Transition): Pairings with from_index and to_index
+        n_from (int): Number of source triangles
+
+    Returns:
+        np.ndarray: Target index per source triangle, -1 where unpaired
+    """
+    assignment = np.full(n_from, -1)
+    if len(pairings):
+        pairings = Transition.from_pairings(pairings).matched()
+        assignment[pairings.from_index] = pairings.to_index
+    return assignment
+
+
+def compose_assignments(first, second):
+    """
+    Compose two assignments A->B and B->C into A->C.
+
+    Args:
+        first (np.ndarray): Index in B per element of A, -1 where unpaired
+        second (np.ndarray): Index in C per element of B, -1 where unpaired
+
+    Returns:
+        np.ndarray: Index in C per element of A, -1 where either step is unpaired
+    """
+    return kernels.compose(np.asarray(first), np.asarray(second))
+
+
+def _sparse_assignment(
+    centroids_rows,
+    centroids_cols,
+    k=SPARSE_NEIGHBORS,
+    epsilon=None,
+    initial_assignment=None,
+    prices=None,
+    cost=None,
+    max_neighbors=None,
+):
+    """
+    Min-weight full matching on a k-nearest-neighbour graph, growing k as needed.
+
+    A warm-start assignment only keeps the seed pairs that are in the graph.
+    With ``cost`` = (row_features, col_features, weights) the candidates are
+    the nearest in weighted feature space and edges carry the weighted cost.
+    Once doubling k would exceed ``max_neighbors``, the rows a maximum
+    matching leaves unpaired instead swap their farthest candidate for a
+    greedy partner among the unpaired columns, which completes the graph
+    without more memory.
+
+    Returns:
+        tuple: (assignment, prices, eps, k) with the auction result and the
+        number of candidates per row that was finally used
+    """
+    n_rows, n_cols = len(centroids_rows), len(centroids_cols)
+    if epsilon is None:
+        epsilon = AUCTION_TOLERANCE / n_rows
+    if max_neighbors is not None:
+        k = min(k, max_neighbors)
+
+    def edge_costs(rows, cols):
+        if cost is None:
+            return np.hypot(*(centroids_rows[rows] - centroids_cols[cols]).T)
+        features_rows, features_cols, weights = cost
+        return pair_costs(features_rows[rows], features_cols[cols], weights)
+
+    while True:
+        neighbors, distances = build_candidate_graph(centroids_rows, centroids_cols, k)
+        if cost is not None:
+            distances = edge_costs(
+                np.repeat(np.arange(n_rows), neighbors.shape[1]), neighbors.ravel()
+            ).reshape(neighbors.shape)
+        if k >= n_cols:
+            break
+        rows, cols = _matching_deficit(neighbors, n_cols)
+        if not len(rows):
+            break
+        if max_neighbors is not None and 2 * k > max_neighbors:
+            sub, _, _, _ = _sparse_assignment(
+                centroids_rows[rows],
+                centroids_cols[cols],
+                k,
+                epsilon,
+                cost=None if cost is None else (cost[0][rows], cost[1][cols], cost[2]),
+                max_neighbors=max_neighbors,
+            )
+            partners = cols[sub]
+            neighbors[rows, -1] = partners
+            distances[rows, -1] = edge_costs(rows, partners)
+            print(f"  Completed candidate graph with {len(rows)} greedy pairs")
+            break
+        k = min(2 * k, n_cols)
+        print(f"  No full matching in candidate graph, retrying with k={k}")
+
+    assignment, prices, eps = _auction(
+        neighbors,
+        distances,
+        n_cols,
+        epsilon,
+        prices=prices,
+        initial_assignment=initial_assignment,
+    )
+    return assignment, prices, eps, k
+
+
+def _solve_sparse(
+    row_triangles,
+    col_triangles,
+    k=SPARSE_NEIGHBORS,
+    epsilon=None,
+    initial_assignment=None,
+    prices=None,
+    cost_weights=None,
+    features=None,
+    max_neighbors=None,
+):
+    """
+    Solve the assignment on a sparse k-nearest-neighbour candidate graph.
+
+    ``k`` is doubled until the candidate graph admits a full matching, so
+    every row is always paired. The min-weight full matching on the graph is
+    then found by epsilon-scaling auction to within AUCTION_TOLERANCE of the
+    optimal total distance, in O(n * k) memory.
+
+    Args:
+        k (int): Initial number of candidates per row
+        max_neighbors (int, optional): Largest k, which bounds the memory;
+            a graph without full matching at this k is completed with
+            greedy pairs of the rows left over (see _sparse_assignment)
+        epsilon (float, optional): Final auction epsilon (default AUCTION_TOLERANCE / n)
+        initial_assignment (np.ndarray, optional): Warm-start column per row
+        prices (np.ndarray, optional): Warm-start column prices
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (row_features, col_features) for cost_weights
+
+    Returns:
+        tuple: (row_indices, col_indices, distances, info)
+    """
+    cost = None
+    if cost_weights is None:
+        points_rows = calculate_centroids(row_triangles)
+        points_cols = calculate_centroids(col_triangles)
+    else:
+        cost = (*features, cost_weights)
+        points_rows = _candidate_points(features[0], cost_weights)
+        points_cols = _candidate_points(features[1], cost_weights)
+    n_rows, n_cols = len(points_rows), len(points_cols)
+
+    print(f"Running sparse matching for {n_rows} x {n_cols} triangles...")
+    start_time = time.time()
+    assignment, prices, eps, k = _sparse_assignment(
+        points_rows,
+        points_cols,
+        k,
+        epsilon,
+        initial_assignment,
+        prices,
+        cost,
+        max_neighbors,
+    )
+    elapsed = time.time() - start_time
+    print(f"Sparse matching completed in {elapsed:.2f} seconds (k={k})")
+
+    row_indices = np.arange(n_rows)
+    if cost is None:
+        distances = np.hypot(*(points_rows - points_cols[assignment]).T)
+    else:
+        distances = pair_costs(features[0], features[1][assignment], cost_weights)
+    info = _auction_info(assignment, prices, eps, initial_assignment)
+    info["neighbors"] = k
+    # Prices on the candidate graph are duals of the full problem too, once
+    # every row's minimum is taken over all columns
+    info["lower_bound"] = min(
+        _candidate_dual_bound(
+            points_rows,
+            points_cols,
+            prices,
+            cost,
+            values=distances + prices[assignment],
+        ),
+        distances.sum(),
+    )
+    return row_indices, assignment, distances, info
+
+
+def _solve_auction(
+    row_triangles,
+    col_triangles,
+    time_limit=None,
+    epsilon=None,
+    initial_assignment=None,
+    prices=None,
+    cost_weights=None,
+    features=None,
+    tolerance=AUCTION_RELATIVE_TOLERANCE,
+    exact=False,
+):
+    """
+    Solve the assignment on the dense cost matrix by epsilon-scaling auction.
+
+    Trades exactness for speed: the result is within ``n * epsilon`` of the
+    optimal total distance, and with a time limit the best assignment of the
+    last completed scaling phase is returned. By default epsilon is
+    ``tolerance`` times the mean cheapest cost of a row, so the total is
+    within that fraction of the sum of row minima and thus of the optimum.
+
+    Args:
+        time_limit (float, optional): Seconds to spend before returning the best
+            assignment found so far
+        epsilon (float, optional): Target epsilon, overriding ``tolerance``
+        tolerance (float): Relative bound on the excess over the optimum
+        exact (bool): Solve to within AUCTION_TOLERANCE of the optimum instead,
+            as close as the Hungarian solve but slower
+        initial_assignment (np.ndarray, optional): Warm-start column per row
+        prices (np.ndarray, optional): Warm-start column prices
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (row_features, col_features) for cost_weights
+
+    Returns:
+        tuple: (row_indices, col_indices, distances, info)
+    """
+    n_rows, n_cols = len(row_triangles), len(col_triangles)
+
+    with COST_MATRIX_POOL.matrix(n_rows, n_cols) as out:
+        if cost_weights is None:
+            cost_matrix = calculate_cost_matrix(row_triangles, col_triangles, out=out)
+        else:
+            cost_matrix = calculate_cost_matrix(
+                *features, out=out, weights=cost_weights
+            )
+        if epsilon is None and not exact:
+            # No assignment costs less than the sum of the row minima
+            scale = float(cost_matrix.min(axis=1).mean())
+            if scale > 0:
+                epsilon = tolerance * scale
+        if epsilon is None:
+            epsilon = AUCTION_TOLERANCE / n_rows
+
+        print("Running auction algorithm...")
+        start_time = time.time()
+        assignment, prices, eps = _auction(
+            None,
+            cost_matrix,
+            n_cols,
+            epsilon,
+            time_limit=time_limit,
+            prices=prices,
+            initial_assignment=initial_assignment,
+        )
+        elapsed = time.time() - start_time
+        info = _auction_info(assignment, prices, eps, initial_assignment)
+        print(
+            f"Auction algorithm completed in {elapsed:.2f} seconds "
+            f"(within {info['optimality_bound']:.3g} of optimal)"
+        )
+
+        row_indices = np.arange(n_rows)
+        distances = cost_matrix[row_indices, assignment].astype(np.float64)
+        # Prices on the dense matrix are duals of the full problem
+        info["lower_bound"] = min(_dual_bound(cost_matrix, prices), distances.sum())
+    return row_indices, assignment, distances, info
+
+
+def _distance_matrix(centroids_a, centroids_b, weights=None):
+    """Dense centroid distance (or weighted feature cost) matrix for a small problem, without logging."""
+    if weights is not None:
+        out = np.empty((len(centroids_a), len(centroids_b)))
+        _fill_cost_block(out, centroids_a, centroids_b, weights)
+        return out
+    return cdist(centroids_a, centroids_b)
+
+
+def partition_cells(centroids_rows, centroids_cols, cell_size=PARTITION_CELL_SIZE):
+    """
+    Split two centroid sets into quadtree cells with balanced triangle counts.
+
+    Each cell is split into four at the median x and y of the row and column
+    centroids it contains, so both sides shrink together, until it holds at
+    most ``cell_size`` triangles of each set.
+
+    Args:
+        centroids_rows (np.ndarray): (n, 2) row centroids
+        centroids_cols (np.ndarray): (m, 2) column centroids
+        cell_size (int): Maximum number of triangles per side in a leaf cell
+
+    Returns:
+        list: (row_indices, col_indices, bounds) per leaf cell, where bounds
+        is the (x_min, x_max, y_min, y_max) of the cell
+    """
+    cells = []
+    pending = [
+        (
+            np.arange(len(centroids_rows)),
+            np.arange(len(centroids_cols)),
+            (-np.inf, np.inf, -np.inf, np.inf),
+        )
+    ]
+    while pending:
+        rows, cols, bounds = pending.pop()
+        if max(len(rows), len(cols)) <= cell_size:
+            cells.append((rows, cols, bounds))
+            continue
+
+        points_rows, points_cols = centroids_rows[rows], centroids_cols[cols]
+        mid_x, mid_y = np.median(np.concatenate([points_rows, points_cols]), axis=0)
+        x_min, x_max, y_min, y_max = bounds
+        quadrants = []
+        for right in (False, True):
+            for top in (False, True):
+                in_rows = ((points_rows[:, 0] > mid_x) == right) & (
+                    (points_rows[:, 1] > mid_y) == top
+                )
+                in_cols = ((points_cols[:, 0] > mid_x) == right) & (
+                    (points_cols[:, 1] > mid_y) == top
+                )
+                quadrant_bounds = (
+                    mid_x if right else x_min,
+                    x_max if right else mid_x,
+                    mid_y if top else y_min,
+                    y_max if top else mid_y,
+                )
+                quadrants.append((rows[in_rows], cols[in_cols], quadrant_bounds))
+
+        # Coincident points cannot be split further
+        if any(len(r) == len(rows) and len(c) == len(cols) for r, c, _ in quadrants):
+            cells.append((rows, cols, bounds))
+            continue
+        pending.extend(q for q in quadrants if len(q[0]) or len(q[1]))
+    return cells
+
+
+def _boundary_distance(points, bounds):
+    """Distance of each point to the nearest edge of its cell."""
+    x_min, x_max, y_min, y_max = bounds
+    return np.minimum(
+        np.minimum(points[:, 0] - x_min, x_max - points[:, 0]),
+        np.minimum(points[:, 1] - y_min, y_max - points[:, 1]),
+    )
+
+
+def _solve_cell(centroids_rows, centroids_cols, weights=None):
+    """Exactly pair as many triangles as possible inside one cell."""
+    if len(centroids_rows) == 0 or len(centroids_cols) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    cost_matrix = _distance_matrix(centroids_rows, centroids_cols, weights)
+    return linear_sum_assignment(cost_matrix)
+
+
+def _solve_partitioned(
+    row_triangles,
+    col_triangles,
+    cell_size=PARTITION_CELL_SIZE,
+    workers=None,
+    passes=PARTITION_REFINE_PASSES,
+    cost_weights=None,
+    features=None,
+    max_neighbors=None,
+):
+    """
+    Solve the assignment cell by cell on a balanced quadtree.
+
+    Triangles of two slides sample the same square densely, so nearly all
+    optimal pairs are local. Each leaf cell is solved exactly and
+    independently (on a process pool when ``workers`` allows). Pairs that a
+    cell edge might have cut off from a better partner, those with an edge
+    closer than PARTITION_BAND times their length, and the overflow where
+    cell counts differ are re-paired by one small global sparse solve.
+    Refinement passes then re-solve groups of neighbouring pairs across the
+    cell edges, which moves the count surplus of a cell on to its
+    neighbours.
+
+    Args:
+        cell_size (int): Maximum number of triangles per side in a cell
+        workers (int, optional): Worker processes for the cell solves
+            (default: one per CPU, 1 solves in-process)
+        passes (int): Number of refinement passes
+        cost_weights (dict, optional): Weighted cost terms, see create_transition;
+            cells are still formed by position
+        features (tuple, optional): (row_features, col_features) for cost_weights
+        max_neighbors (int, optional): Largest k of the boundary band's
+            candidate graph, see _solve_sparse
+
+    Returns:
+        tuple: (row_indices, col_indices, distances, info)
+    """
+    if cost_weights is None:
+        centroids_rows = calculate_centroids(row_triangles)
+        centroids_cols = calculate_centroids(col_triangles)
+        points_rows, points_cols = centroids_rows, centroids_cols
+    else:
+        points_rows, points_cols = features
+        centroids_rows = _as_centroids(points_rows).astype(np.float64)
+        centroids_cols = _as_centroids(points_cols).astype(np.float64)
+    n_rows, n_cols = len(centroids_rows), len(centroids_cols)
+
+    print(f"Running partitioned matching for {n_rows} x {n_cols} triangles...")
+    start_time = time.time()
+    cells = partition_cells(centroids_rows, centroids_cols, cell_size)
+    jobs = [
+        (points_rows[rows], points_cols[cols], cost_weights) for rows, cols, _ in cells
+    ]
+
+    if workers == 1 or len(cells) == 1:
+        results = [_solve_cell(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_solve_cell, *zip(*jobs)))
+
+    # Keep the pairs that are short next to their distance from the cell
+    # edges; the others and the overflow of unbalanced cells are re-paired
+    assignment = np.full(n_rows, -1)
+    for (rows, cols, bounds), (local_rows, local_cols) in zip(cells, results):
+        pair_rows = centroids_rows[rows[local_rows]]
+        pair_cols = centroids_cols[cols[local_cols]]
+        reach = PARTITION_BAND * np.hypot(*(pair_rows - pair_cols).T)
+        inside = (_boundary_distance(pair_rows, bounds) > reach) & (
+            _boundary_distance(pair_cols, bounds) > reach
+        )
+        assignment[rows[local_rows[inside]]] = cols[local_cols[inside]]
+
+    released_rows = np.flatnonzero(assignment < 0)
+    if released_rows.size:
+        taken = np.zeros(n_cols, dtype=bool)
+        taken[assignment[assignment >= 0]] = True
+        released_cols = np.flatnonzero(~taken)
+        if cost_weights is None:
+            local_cols, _, _, _ = _sparse_assignment(
+                centroids_rows[released_rows],
+                centroids_cols[released_cols],
+                max_neighbors=max_neighbors,
+            )
+        else:
+            features_rows = points_rows[released_rows]
+            features_cols = points_cols[released_cols]
+            local_cols, _, _, _ = _sparse_assignment(
+                _candidate_points(features_rows, cost_weights),
+                _candidate_points(features_cols, cost_weights),
+                cost=(features_rows, features_cols, cost_weights),
+                max_neighbors=max_neighbors,
+            )
+        assignment[released_rows] = released_cols[local_cols]
+
+    if len(cells) > 1 and passes:
+        if cost_weights is None:
+            refine_rows, refine_cols = centroids_rows, centroids_cols
+        else:
+            refine_rows = _candidate_points(points_rows, cost_weights)
+            refine_cols = _candidate_points(points_cols, cost_weights)
+
+        def solve(rows, cols):
+            return _solve_cell(points_rows[rows], points_cols[cols], cost_weights)
+
+        rng = np.random.default_rng(0)
+        for _ in range(passes):
+            _refine_pairs(
+                refine_rows, refine_cols, assignment, solve, max(cell_size // 2, 1), rng
+            )
+
+    elapsed = time.time() - start_time
+    print(
+        f"Partitioned matching completed in {elapsed:.2f} seconds "
+        f"({len(cells)} cells, {released_rows.size} boundary triangles)"
+    )
+
+    row_indices = np.arange(n_rows)
+    if cost_weights is None:
+        distances = np.hypot(*(centroids_rows - centroids_cols[assignment]).T)
+    else:
+        distances = pair_costs(points_rows, points_cols[assignment], cost_weights)
+    info = {"cells": len(cells), "boundary": int(released_rows.size)}
+    return row_indices, assignment, distances, info
+
+
+def _transport(costs, supply, capacity):
+    """
+    Integral minimum-cost transport plan.
+
+    Source i ships exactly supply[i] units and target j receives at most
+    capacity[j]. Transport problems have integral vertex solutions, which
+    the dual simplex method returns.
+
+    Returns:
+        np.ndarray: (sources, targets) integer flow
+    """
+    n_sources, n_targets = costs.shape
+    ship = kron(eye(n_sources), np.ones((1, n_targets)), format="csr")
+    receive = hstack([eye(n_targets)] * n_sources, format="csr")
+    result = linprog(
+        costs.ravel(),
+        A_ub=receive,
+        b_ub=capacity,
+        A_eq=ship,
+        b_eq=supply,
+        method="highs-ds",
+    )
+    if not result.success:
+        raise RuntimeError(f"Transport problem failed: {result.message}")
+    return np.rint(result.x).astype(int).reshape(n_sources, n_targets)
+
+
+def _split_by_flow(points, labels, centers, flow):
+    """
+    Send the members of each cluster to the clusters its flow goes to.
+
+    Every target cluster receives as many members as its flow, those
+    closest to its center, so a cluster passes its surplus on through the
+    side facing the target.
+
+    Args:
+        points (np.ndarray): Clustering points
+        labels (np.ndarray): Cluster per point
+        centers (np.ndarray): Cluster centers
+        flow (np.ndarray): (clusters, clusters) number of points sent
+
+    Returns:
+        np.ndarray: Target cluster per point
+    """
+    target = labels.copy()
+    for cluster in range(len(flow)):
+        members = np.flatnonzero(labels == cluster)
+        targets = np.flatnonzero(flow[cluster])
+        if len(targets) < 2:
+            target[members] = targets[0] if len(targets) else cluster
+            continue
+        gaps = cdist(points[members], centers[targets])
+        plan = _transport(gaps, np.ones(len(members)), flow[cluster, targets])
+        target[members] = targets[plan.argmax(axis=1)]
+    return target
+
+
+def _kmeans(points, clusters, rng):
+    """
+    k-means clustering with k-means++ seeds drawn from a sample of the points.
+
+    Seeding all points would take a points x clusters distance matrix; the
+    sample of KMEANS_SEED_SAMPLE points per cluster bounds it, and the
+    iterations on all points only keep their labels.
+
+    Returns:
+        tuple: (centers, labels) as from kmeans2
+    """
+    sample = rng.choice(
+        len(points), min(len(points), KMEANS_SEED_SAMPLE * clusters), replace=False
+    )
+    seeds, _ = kmeans2(points[sample], clusters, iter=1, minit="++", seed=rng)
+    return kmeans2(points, seeds, minit="matrix")
+
+
+def multilevel_blocks(
+    points_rows,
+    points_cols,
+    block_size=MULTILEVEL_BLOCK_SIZE,
+    clusters=MULTILEVEL_CLUSTERS,
+    rng=None,
+):
+    """
+    Split two point sets into blocks by recursive k-means cluster matching.
+
+    Both sets are clustered around shared k-means centers, so cluster i of
+    the rows and of the columns cover the same region. A transport problem
+    between the centers, with the row count of each cluster as its supply
+    and the column count as its capacity, moves the row surplus of a cluster
+    to its neighbours. Each column cluster and the rows sent to it form a
+    block that is split again until it has at most ``block_size`` points
+    per side.
+
+    Args:
+        points_rows (np.ndarray): (n, d) row points, n not above the column count
+        points_cols (np.ndarray): (m, d) column points
+        block_size (int): Maximum number of points per side in a block
+        clusters (int): Number of clusters per level
+        rng (np.random.Generator, optional): Seeds the k-means initialisation
+
+    Returns:
+        tuple: (blocks, levels) with a list of (row_indices, col_indices)
+        per block, each with at most as many rows as columns, and the
+        recursion depth. Columns of clusters that receive no rows are in no
+        block.
+    """
+    if rng is None:
+        rng = np.random.default_rng(0)
+    n_rows, n_cols = len(points_rows), len(points_cols)
+    rows, cols = np.arange(n_rows), np.arange(n_cols)
+    if n_rows == 0 or max(n_rows, n_cols) <= block_size:
+        return [(rows, cols)], 1
+
+    clusters = min(clusters, n_rows + n_cols)
+    centers, labels = _kmeans(np.concatenate([points_rows, points_cols]), clusters, rng)
+    labels_rows, labels_cols = labels[:n_rows], labels[n_rows:]
+    counts_rows = np.bincount(labels_rows, minlength=clusters)
+    counts_cols = np.bincount(labels_cols, minlength=clusters)
+    # Squared distances favour passing a surplus on between neighbours over
+    # long direct moves
+    flow = _transport(cdist(centers, centers, "sqeuclidean"), counts_rows, counts_cols)
+    received = flow.sum(axis=0)
+    if np.count_nonzero(received) == 1:
+        # Clustering cannot split the points (e.g. duplicates)
+        return [(rows, cols)], 1
+
+    targets = _split_by_flow(points_rows, labels_rows, centers, flow)
+    blocks, levels = [], 0
+    for cluster in np.flatnonzero(received):
+        block_rows = rows[targets == cluster]
+        block_cols = cols[labels_cols == cluster]
+        sub_blocks, sub_levels = multilevel_blocks(
+            points_rows[block_rows],
+            points_cols[block_cols],
+            block_size,
+            clusters,
+            rng,
+        )
+        blocks.extend((block_rows[r], block_cols[c]) for r, c in sub_blocks)
+        levels = max(levels, sub_levels)
+    return blocks, levels + 1
+
+
+def _refine_pairs(points_rows, points_cols, assignment, solve, block_size, rng):
+    """
+    Re-pair groups of nearby pairs exactly, in place.
+
+    Pairs are grouped by k-means on their midpoints, with boundaries that
+    differ from the blocks they were solved in, and the rows of each group
+    are solved exactly against their columns plus the nearby unpaired
+    columns. This never increases the total cost. Groups with more than
+    ``2 * block_size`` columns (paired and unpaired) keep their pairs.
+    """
+    n_rows = len(points_rows)
+    groups = max(2, -(-n_rows // block_size))
+    if n_rows < groups:
+        return
+    centers, labels = _kmeans((points_rows + points_cols[assignment]) / 2, groups, rng)
+    free = np.ones(len(points_cols), dtype=bool)
+    free[assignment] = False
+    free_cols = np.flatnonzero(free)
+    free_labels = cdist(points_cols[free_cols], centers).argmin(axis=1)
+    for group in range(groups):
+        rows = np.flatnonzero(labels == group)
+        cols = np.concatenate([assignment[rows], free_cols[free_labels == group]])
+        if len(rows) == 0 or len(cols) > 2 * block_size:
+            continue
+        local_rows, local_cols = solve(rows, cols)
+        assignment[rows[local_rows]] = cols[local_cols]
+
+
+def _solve_multilevel(
+    row_triangles,
+    col_triangles,
+    block_size=MULTILEVEL_BLOCK_SIZE,
+    clusters=MULTILEVEL_CLUSTERS,
+    passes=MULTILEVEL_REFINE_PASSES,
+    seed=0,
+    cost_weights=None,
+    features=None,
+):
+    """
+    Solve the assignment coarse to fine on matched k-means clusters.
+
+    multilevel_blocks splits both slides into blocks of at most
+    ``block_size`` triangles per side. Unlike the quadtree cells of the
+    partitioned solver, clusters follow the triangle density, so blocks
+    stay balanced on uneven slides and the count surplus is moved at the
+    coarsest level. Each block is solved exactly, then refinement passes
+    re-solve groups of neighbouring pairs that straddle the block
+    boundaries, which recovers most of the cost the fixed blocks lose.
+
+    Args:
+        block_size (int): Maximum number of triangles per side in a block
+        clusters (int): Number of k-means clusters per level
+        passes (int): Number of refinement passes
+        seed (int): Seed of the k-means initialisation
+        cost_weights (dict, optional): Weighted cost terms, see create_transition;
+            clusters are formed in weighted feature space
+        features (tuple, optional): (row_features, col_features) for cost_weights
+
+    Returns:
+        tuple: (row_indices, col_indices, distances, info)
+    """
+    if cost_weights is None:
+        points_rows = calculate_centroids(row_triangles)
+        points_cols = calculate_centroids(col_triangles)
+        costs_rows, costs_cols = points_rows, points_cols
+    else:
+        costs_rows, costs_cols = features
+        points_rows = _candidate_points(costs_rows, cost_weights)
+        points_cols = _candidate_points(costs_cols, cost_weights)
+    n_rows, n_cols = len(points_rows), len(points_cols)
+
+    def solve(rows, cols):
+        return _solve_cell(costs_rows[rows], costs_cols[cols], cost_weights)
+
+    print(f"Running multilevel matching for {n_rows} x {n_cols} triangles...")
+    start_time = time.time()
+    rng = np.random.default_rng(seed)
+    blocks, levels = multilevel_blocks(
+        points_rows, points_cols, block_size, max(clusters, 2), rng
+    )
+
+    assignment = np.full(n_rows, -1)
+    for rows, cols in blocks:
+        if max(len(rows), len(cols)) <= block_size:
+            local_rows, local_cols = solve(rows, cols)
+        elif cost_weights is None:
+            # Unsplittable block, e.g. of duplicate centroids
+            local_rows = np.arange(len(rows))
+            local_cols, _, _, _ = _sparse_assignment(
+                points_rows[rows], points_cols[cols]
+            )
+        else:
+            local_rows = np.arange(len(rows))
+            local_cols, _, _, _ = _sparse_assignment(
+                points_rows[rows],
+                points_cols[cols],
+                cost=(costs_rows[rows], costs_cols[cols], cost_weights),
+            )
+        assignment[rows[local_rows]] = cols[local_cols]
+
+    if len(blocks) > 1:
+        for _ in range(passes):
+            _refine_pairs(points_rows, points_cols, assignment, solve, block_size, rng)
+
+    elapsed = time.time() - start_time
+    print(
+        f"Multilevel matching completed in {elapsed:.2f} seconds "
+        f"({levels} levels, {len(blocks)} blocks)"
+    )
+
+    row_indices = np.arange(n_rows)
+    if cost_weights is None:
+        distances = np.hypot(*(points_rows - points_cols[assignment]).T)
+    else:
+        distances = pair_costs(costs_rows, costs_cols[assignment], cost_weights)
+    return row_indices, assignment, distances, {"levels": levels, "blocks": len(blocks)}
+
+
+def _tile_gaps(points_a, tiles_a, points_b, tiles_b):
+    """Smallest distance between the bounding boxes of every pair of tiles."""
+    low_a = np.array([points_a[t].min(axis=0) for t in tiles_a])
+    high_a = np.array([points_a[t].max(axis=0) for t in tiles_a])
+    low_b = np.array([points_b[t].min(axis=0) for t in tiles_b])
+    high_b = np.array([points_b[t].max(axis=0) for t in tiles_b])
+    gap = np.maximum(
+        np.maximum(low_b[None, :] - high_a[:, None], low_a[:, None] - high_b[None, :]),
+        0.0,
+    )
+    return np.hypot(gap[..., 0], gap[..., 1])
+
+
+def _accumulate_tile(state, block, cols, reg, top):
+    """Fold one tile of potential_j - C_ij into a running log-sum-exp (and top-k)."""
+    running_max, total, best_cols, best_scores = state
+    if top:
+        best_cols = np.hstack([best_cols, np.broadcast_to(cols, block.shape)])
+        best_scores = np.hstack([best_scores, block])
+        if best_scores.shape[1] > top:
+            keep = np.argpartition(-best_scores, top - 1, axis=1)[:, :top]
+            best_cols = np.take_along_axis(best_cols, keep, axis=1)
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+    block /= reg
+    new_max = np.maximum(running_max, block.max(axis=1))
+    total = total * np.exp(running_max - new_max)
+    total += np.exp(block - new_max[:, None]).sum(axis=1)
+    return new_max, total, best_cols, best_scores
+
+
+def _tiled_kernel_pass(
+    points_a, tiles_a, points_b, tiles_b, potential, gaps, reg, weights, top=0
+):
+    """
+    Blocked log-sum-exp of (potential_j - C_ij) / reg over j for every i.
+
+    The cost matrix is only ever evaluated one tile pair at a time. The
+    nearest tile is evaluated first; every other tile is skipped when even its
+    most favourable term (highest potential at the smallest possible cost
+    ``gaps``) is SINKHORN_TRUNCATION log units below the largest term of
+    every row.
+
+    Returns:
+        np.ndarray or tuple: The log-sum-exp per point of a, or with ``top`` > 0
+        the (n, top) best candidate columns and their potential_j - C_ij
+    """
+    n = len(points_a)
+    result = np.empty(n)
+    top = min(top, len(points_b))
+    candidates = np.empty((n, top), dtype=int)
+    scores = np.empty((n, top))
+    tile_max = np.array([potential[t].max() for t in tiles_b])
+    log_sizes = np.log([len(t) for t in tiles_b])
+
+    for tile, rows in enumerate(tiles_a):
+        bounds = (tile_max - gaps[tile]) / reg + log_sizes
+        order = np.argsort(gaps[tile])
+        state = (
+            np.full(len(rows), -np.inf),
+            np.zeros(len(rows)),
+            np.empty((len(rows), 0), dtype=int),
+            np.empty((len(rows), 0)),
+        )
+        visit = order[:1]
+        while len(visit):
+            for other in visit:
+                if bounds[other] < state[0].min() - SINKHORN_TRUNCATION:
+                    continue
+                cols = tiles_b[other]
+                block = potential[cols] - _distance_matrix(
+                    points_a[rows], points_b[cols], weights
+                )
+                state = _accumulate_tile(state, block, cols, reg, top)
+            if visit[0] != order[0]:
+                break
+            # The nearest tile rules most of the others out at once
+            rest = order[1:]
+            visit = rest[bounds[rest] >= state[0].min() - SINKHORN_TRUNCATION]
+
+        running_max, total, best_cols, best_scores = state
+        result[rows] = running_max + np.log(total)
+        if top:
+            candidates[rows] = best_cols
+            scores[rows] = best_scores
+
+    if top:
+        return candidates, scores
+    return result
+
+
+def _round_plan(candidates, scores, n_cols):
+    """Greedily pair rows with their highest-plan candidate columns still free."""
+    n_rows, top = candidates.shape
+    assignment = np.full(n_rows, -1)
+    taken = np.zeros(n_cols, dtype=bool)
+    order = np.argsort(-scores, axis=None)
+    for row, col in zip(*np.divmod(order, top)):
+        if assignment[row] < 0:
+            target = candidates[row, col]
+            if not taken[target]:
+                assignment[row] = target
+                taken[target] = True
+    return assignment
+
+
+def _solve_sinkhorn(
+    row_triangles,
+    col_triangles,
+    regularization=None,
+    iterations=SINKHORN_ITERATIONS,
+    tile_size=SINKHORN_TILE_SIZE,
+    passes=SINKHORN_REPAIR_PASSES,
+    cost_weights=None,
+    features=None,
+):
+    """
+    Approximate the assignment by entropic optimal transport (Sinkhorn).
+
+    Every row carries unit mass and every column takes at most unit mass,
+    which log-domain Sinkhorn iterations solve by coordinate ascent on the
+    dual potentials f (rows) and g <= 0 (columns), annealing the
+    regularisation down to ``regularization``. The kernel is evaluated tile
+    by tile over a quadtree of the centroids, skipping far tiles whose terms
+    are negligible, so memory stays O(tile_size^2) and most of the n x m
+    costs are never computed.
+
+    The plan is rounded greedily: pairs are taken in order of their plan
+    value among the SINKHORN_CANDIDATES highest-plan columns of every row,
+    and rows whose candidates are all taken go to the nearest free column.
+    Refinement passes then re-solve groups of neighbouring pairs exactly,
+    in groups of half a tile, which repairs the greedy mistakes locally.
+    The column potentials give a proven lower bound like the sparse
+    solver's prices.
+
+    Smaller regularisation and more iterations give a plan closer to the
+    optimal assignment, and more passes repair more of the rounding, at a
+    higher cost.
+
+    Args:
+        regularization (float, optional): Final entropic regularisation in cost
+            units (default SINKHORN_REGULARIZATION x the mean nearest-neighbour cost)
+        iterations (int): Maximum number of Sinkhorn iterations (at least 1)
+        tile_size (int): Maximum triangles per side of one kernel tile
+        passes (int): Number of refinement passes after the greedy rounding
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (row_features, col_features) for cost_weights
+
+    Returns:
+        tuple: (row_indices, col_indices, distances, info)
+
+    Raises:
+        ValueError: If iterations is below 1
+    """
+    if iterations < 1:
+        raise ValueError(f"Sinkhorn needs at least 1 iteration, got {iterations}")
+    cost = None
+    if cost_weights is None:
+        points_rows = calculate_centroids(row_triangles)
+        points_cols = calculate_centroids(col_triangles)
+        centroids_rows, centroids_cols = points_rows, points_cols
+        position_weight = 1.0
+        nearest_rows, nearest_cols = points_rows, points_cols
+    else:
+        points_rows, points_cols = (f.astype(np.float64) for f in features)
+        centroids_rows, centroids_cols = points_rows[:, :2], points_cols[:, :2]
+        position_weight = cost_weights.get("position", 0.0)
+        nearest_rows = _candidate_points(points_rows, cost_weights)
+        nearest_cols = _candidate_points(points_cols, cost_weights)
+        cost = (points_rows, points_cols, cost_weights)
+    n_rows, n_cols = len(points_rows), len(points_cols)
+
+    print(f"Running Sinkhorn matching for {n_rows} x {n_cols} triangles...")
+    start_time = time.time()
+    if regularization is None:
+        scale, _ = cKDTree(nearest_cols).query(nearest_rows)
+        regularization = SINKHORN_REGULARIZATION * max(float(scale.mean()), 1e-9)
+
+    cells = partition_cells(centroids_rows, centroids_cols, tile_size)
+    row_tiles = [rows for rows, _, _ in cells if len(rows)]
+    col_tiles = [cols for _, cols, _ in cells if len(cols)]
+    gaps = position_weight * _tile_gaps(
+        centroids_rows, row_tiles, centroids_cols, col_tiles
+    )
+
+    f = np.zeros(n_rows)
+    g = np.zeros(n_cols)
+    reg = regularization * SINKHORN_START_REGULARIZATION / SINKHORN_REGULARIZATION
+    error = np.inf
+    for iteration in range(1, iterations + 1):
+        reg = max(reg * SINKHORN_ANNEALING, regularization)
+        # Rows carry unit mass
+        f_new = -reg * _tiled_kernel_pass(
+            points_rows,
+            row_tiles,
+            points_cols,
+            col_tiles,
+            g,
+            gaps,
+            reg,
+            cost_weights,
+        )
+        error = float(np.abs(f_new - f).max() / reg)
+        f = f_new
+        # Columns take at most unit mass, so their potentials stay <= 0
+        g = np.minimum(
+            -reg
+            * _tiled_kernel_pass(
+                points_cols,
+                col_tiles,
+                points_rows,
+                row_tiles,
+                f,
+                gaps.T,
+                reg,
+                cost_weights,
+            ),
+            0.0,
+        )
+        if reg == regularization and error < SINKHORN_TOLERANCE:
+            break
+
+    # The plan of row i ranks its columns by g_j - C_ij, offset by f_i
+    candidates, scores = _tiled_kernel_pass(
+        points_rows,
+        row_tiles,
+        points_cols,
+        col_tiles,
+        g,
+        gaps,
+        reg,
+        cost_weights,
+        top=SINKHORN_CANDIDATES,
+    )
+    assignment = _round_plan(candidates, scores + f[:, None], n_cols)
+    elapsed = time.time() - start_time
+
+    left = np.flatnonzero(assignment < 0)
+    if left.size:
+        free = np.ones(n_cols, dtype=bool)
+        free[assignment[assignment >= 0]] = False
+        free_cols = np.flatnonzero(free)
+        assignment[left] = free_cols[
+            _greedy_assignment(nearest_rows[left], nearest_cols[free_cols])
+        ]
+    greedy = assignment.copy()
+
+    def solve(rows, cols):
+        return _solve_cell(points_rows[rows], points_cols[cols], cost_weights)
+
+    rng = np.random.default_rng(0)
+    for _ in range(passes):
+        _refine_pairs(
+            nearest_rows, nearest_cols, assignment, solve, max(tile_size // 2, 1), rng
+        )
+
+    total = time.time() - start_time
+    print(
+        f"Sinkhorn matching completed in {total:.2f} seconds "
+        f"({iteration} iterations in {elapsed:.2f} seconds, "
+        f"{int(np.mean(greedy == assignment) * 100)}% of the greedy rounding kept)"
+    )
+
+    row_indices = np.arange(n_rows)
+    if cost is None:
+        distances = np.hypot(*(points_rows - points_cols[assignment]).T)
+    else:
+        distances = pair_costs(points_rows, points_cols[assignment], cost_weights)
+    # Negated column potentials are prices like an auction's
+    prices = -g
+    info = {
+        "regularization": float(regularization),
+        "iterations": iteration,
+        "marginal_error": error,
+        "lower_bound": min(
+            _candidate_dual_bound(
+                nearest_rows,
+                nearest_cols,
+                prices,
+                cost,
+                tile_size,
+                values=distances + prices[assignment],
+            ),
+            distances.sum(),
+        ),
+    }
+    return row_indices, assignment, distances, info
+
+
+def _greedy_assignment(points_rows, points_cols, k=SPARSE_NEIGHBORS):
+    """
+    Greedy matching that repeatedly takes the globally shortest free pair.
+
+    Each row gets its nearest columns from a kd-tree, and all these candidate
+    edges are scanned in order of length by kernels.greedy_scan. When a row's
+    candidates are all taken it queries a kd-tree of the still free columns,
+    which is rebuilt whenever half of its columns have been taken; such rows
+    continue from a priority queue that is merged with the scan, so the whole
+    matching runs in O(n log n).
+
+    Returns:
+        np.ndarray: Column per row, -1 for rows left over when n_rows > n_cols
+    """
+    n_rows, n_cols = len(points_rows), len(points_cols)
+    assignment = np.full(n_rows, -1)
+    taken = np.zeros(n_cols, dtype=bool)
+    target = min(n_rows, n_cols)
+
+    tree_columns = np.arange(n_cols)
+    tree = cKDTree(points_cols)
+    k = min(k, n_cols)
+    distances, neighbors = tree.query(points_rows, k=k)
+    distances = distances.reshape(n_rows, k)
+    neighbors = neighbors.reshape(n_rows, k)
+
+    # All candidate edges by length, then row and rank
+    ranks = np.broadcast_to(np.arange(k), (n_rows, k))
+    order = np.lexsort(
+        (ranks.ravel(), np.repeat(np.arange(n_rows), k), distances.ravel())
+    )
+    edge_distances = distances.ravel()[order]
+    edge_rows = order // k
+    edge_cols = neighbors.ravel()[order]
+    edge_last = order % k == k - 1
+
+    # Rows that ran out of candidates: (distance, row, rank) of their next one
+    candidates = {}
+    queue = []
+    position = paired = 0
+    while paired < target:
+        limit = queue[0][0] if queue else np.inf
+        position, paired, exhausted = kernels.greedy_scan(
+            edge_distances,
+            edge_rows,
+            edge_cols,
+            edge_last,
+            position,
+            limit,
+            assignment,
+            taken,
+            paired,
+            target,
+        )
+        if paired >= target:
+            break
+        if exhausted >= 0:
+            row, rank = exhausted, -1
+        elif queue:
+            _, row, rank = heapq.heappop(queue)
+            column = candidates[row][0][rank]
+            if not taken[column]:
+                assignment[row] = column
+                taken[column] = True
+                paired += 1
+                continue
+        else:
+            break
+
+        rank += 1
+        if row not in candidates or rank == len(candidates[row][0]):
+            # Out of candidates: look again among the free columns
+            free = np.flatnonzero(~taken)
+            if 2 * len(free) <= len(tree_columns):
+                tree_columns = free
+                tree = cKDTree(points_cols[free])
+            query_k = min(k, len(tree_columns))
+            while True:
+                found_distances, found = tree.query(points_rows[row], k=query_k)
+                found = tree_columns[np.atleast_1d(found)]
+                found_distances = np.atleast_1d(found_distances)
+                keep = ~taken[found]
+                if keep.any() or query_k == len(tree_columns):
+                    break
+                query_k = min(2 * query_k, len(tree_columns))
+            candidates[row] = (found[keep], found_distances[keep])
+            rank = 0
+        heapq.heappush(queue, (candidates[row][1][rank], row, rank))
+
+    return assignment
+
+
+def _solve_greedy(
+    row_triangles, col_triangles, k=SPARSE_NEIGHBORS, cost_weights=None, features=None
+):
     """
-    Calculate cost matrix for the Hungarian algorithm.
-    Cost is the Euclidean distance between triangle centroids.
+    Pair triangles greedily by shortest centroid distance, for fast previews.
+
+    Not optimal: a greedy matching leaves a few long pairs at the end that
+    an exact solver would avoid, so its total distance is typically some
+    percent above the optimum. It runs in O(n log n) time and O(n * k) memory.
+    With cost weights the greedy order is by distance in weighted feature
+    space, an approximation of the weighted cost.
 
     Args:
-        triangles_a (list): First set of triangles
-        triangles_b (list): Second set of triangles
+        k (int): Number of candidates per row taken from the kd-tree at once
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (row_features, col_features) for cost_weights
 
     Returns:
-        np.ndarray: Cost matrix where each cell is the distance between centroids
+        tuple: (row_indices, col_indices, distances, info)
+    """
+    if cost_weights is None:
+        points_rows = calculate_centroids(row_triangles)
+        points_cols = calculate_centroids(col_triangles)
+    else:
+        points_rows = _candidate_points(features[0], cost_weights)
+        points_cols = _candidate_points(features[1], cost_weights)
+    n_rows, n_cols = len(points_rows), len(points_cols)
 
-    Raises:
-        ValueError: If either triangle set is empty
+    print(f"Running greedy matching for {n_rows} x {n_cols} triangles...")
+    start_time = time.time()
+    assignment = _greedy_assignment(points_rows, points_cols, k)
+    elapsed = time.time() - start_time
+    print(f"Greedy matching completed in {elapsed:.2f} seconds")
+
+    row_indices = np.arange(n_rows)
+    if cost_weights is None:
+        distances = np.hypot(*(points_rows - points_cols[assignment]).T)
+    else:
+        distances = pair_costs(features[0], features[1][assignment], cost_weights)
+    return row_indices, assignment, distances, {}
+
+
+SOLVERS = {
+    "hungarian": _solve_hungarian,
+    "sparse": _solve_sparse,
+    "auction": _solve_auction,
+    "partitioned": _solve_partitioned,
+    "multilevel": _solve_multilevel,
+    "sinkhorn": _solve_sinkhorn,
+    "greedy": _solve_greedy,
+}
+
+# Solvers that accept an initial assignment and prices
+WARM_START_SOLVERS = ("auction", "sparse")
+
+# Solvers whose pairings are optimal, so their cost is also their lower bound
+EXACT_SOLVERS = ("hungarian",)
+
+
+def estimate_transition_memory(
+    n_from, n_to, solver="hungarian", solver_options=None, memory_budget=None
+):
     """
-    # Check for empty triangle sets
-    if not triangles_a or not triangles_b:
-        raise ValueError("Triangle sets cannot be empty")
+    Estimate the peak memory of one create_transition call.
 
-    print(
-        f"Calculating cost matrix for {len(triangles_a)} x {len(triangles_b)} triangles..."
+    Args:
+        n_from (int): Number of source triangles
+        n_to (int): Number of target triangles
+        solver (str/callable): Solver that will be used
+        solver_options (dict, optional): Solver options, e.g. cell_size
+        memory_budget (int, optional): Budget that solver="auto" selects for
+
+    Returns:
+        int: Estimated peak bytes
+    """
+    if solver == "auto":
+        solver, solver_options, _ = select_solver(n_from, n_to, memory_budget)
+    solver_options = solver_options or {}
+    n_rows, n_cols = min(n_from, n_to), max(n_from, n_to)
+    if solver == "greedy":
+        # Candidate lists and the priority queue
+        return int(n_rows * SPARSE_NEIGHBORS * 16 + (n_rows + n_cols) * 96)
+    if solver == "sparse":
+        # Candidate graph and its full-matching check; random layouts need
+        # one doubling of k, which max_neighbors caps
+        k = solver_options.get("k", SPARSE_NEIGHBORS)
+        k = min(solver_options.get("max_neighbors") or 2 * k, n_cols)
+        return int(n_rows * k * SPARSE_EDGE_BYTES + (n_rows + n_cols) * 64)
+    if solver == "partitioned":
+        # Every cell worker process holds the cost block of its own cell;
+        # afterwards the boundary band, up to every row, is re-paired on a
+        # candidate graph whose k the cell surplus often doubles twice
+        cell = min(solver_options.get("cell_size", PARTITION_CELL_SIZE), n_cols)
+        workers = solver_options.get("workers") or os.cpu_count() or 1
+        workers = max(min(workers, -(-n_cols // max(cell, 1))), 1)
+        k = min(solver_options.get("max_neighbors") or 4 * SPARSE_NEIGHBORS, n_cols)
+        return int(
+            max(workers * cell * cell * 8 * 2, n_rows * k * SPARSE_EDGE_BYTES)
+            + (n_rows + n_cols) * 96
+        )
+    if solver == "multilevel":
+        # One refinement group of up to two blocks per side
+        group = min(2 * solver_options.get("block_size", MULTILEVEL_BLOCK_SIZE), n_cols)
+        return int(group * group * 8 + (n_rows + n_cols) * 96)
+    if solver == "sinkhorn":
+        # Kernel tile temporaries, potentials, rounding candidates and the
+        # nearest columns of the dual bound
+        tile = min(solver_options.get("tile_size", SINKHORN_TILE_SIZE), n_cols)
+        return int(
+            tile * tile * 8 * 4 + (n_rows + n_cols) * (SPARSE_NEIGHBORS * 16 + 64)
+        )
+    # Dense float64 cost matrix plus the solver's working copy
+    return int(n_rows * n_cols * 8 * 2)
+
+
+def _format_bytes(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def select_solver(n_from, n_to, memory_budget=None):
+    """
+    Choose the solver for solver="auto" from the set sizes and a memory budget.
+
+    Prefers the exact dense Hungarian solve while its cost matrix fits the
+    budget and the sets are small enough for its O(n^3) time, then the sparse
+    solver (exact on the k-nearest-neighbour graph, O(n * k) memory) with k
+    capped to the budget, and finally the multilevel solver with blocks
+    small enough for the budget. The partitioned solver is never chosen, as
+    its boundary band can take as much memory as a sparse solve.
+    Every strategy pairs all triangles.
+
+    Args:
+        n_from (int): Number of source triangles
+        n_to (int): Number of target triangles
+        memory_budget (int, optional): Bytes one transition may use (None for no limit)
+
+    Returns:
+        tuple: (solver, solver_options, reason)
+    """
+    n_rows, n_cols = min(n_from, n_to), max(n_from, n_to)
+    budget = "no limit" if memory_budget is None else _format_bytes(memory_budget)
+
+    dense = estimate_transition_memory(n_rows, n_cols, "hungarian")
+    dense_fits = memory_budget is None or dense <= memory_budget
+    if dense_fits and n_rows <= AUTO_DENSE_MAX_TRIANGLES:
+        return (
+            "hungarian",
+            {},
+            f"dense {n_rows} x {n_cols} cost matrix needs {_format_bytes(dense)} "
+            f"of {budget}",
+        )
+
+    if dense_fits:
+        why_not_dense = (
+            f"{n_rows} triangles exceed the dense limit of {AUTO_DENSE_MAX_TRIANGLES}"
+        )
+    else:
+        why_not_dense = f"dense cost matrix needs {_format_bytes(dense)} of {budget}"
+    options = {}
+    if memory_budget is not None:
+        # Most candidates per row whose retries all fit the budget
+        k = 2 * SPARSE_NEIGHBORS
+        while 2 * k <= n_cols and memory_budget >= estimate_transition_memory(
+            n_rows, n_cols, "sparse", {"max_neighbors": 2 * k}
+        ):
+            k *= 2
+        options = {"max_neighbors": k}
+    sparse = estimate_transition_memory(n_rows, n_cols, "sparse", options)
+    if memory_budget is None or sparse <= memory_budget:
+        return (
+            "sparse",
+            options,
+            f"{why_not_dense}; sparse candidate graph needs {_format_bytes(sparse)}",
+        )
+
+    # Largest blocks whose refinement groups fit the budget; the multilevel
+    # solver needs the least memory, as no step spans the whole slide
+    group = np.sqrt(max(memory_budget - (n_rows + n_cols) * 96, 0) / 8)
+    block_size = int(group // 2)
+    block_size = min(max(block_size, MIN_MULTILEVEL_BLOCK_SIZE), MULTILEVEL_BLOCK_SIZE)
+    options = {"block_size": block_size}
+    multilevel = estimate_transition_memory(n_rows, n_cols, "multilevel", options)
+    reason = (
+        f"{why_not_dense}, sparse candidate graph needs {_format_bytes(sparse)}; "
+        f"multilevel blocks of {block_size} need {_format_bytes(multilevel)}"
     )
-    start_time = time.time()
+    if multilevel > memory_budget:
+        reason += " (over budget, smallest blocks used)"
+    return "multilevel", options, reason
 
-    # Pre-calculate all centroids
-    centroids_a = [calculate_centroid(t["coordinates"]) for t in triangles_a]
-    centroids_b = [calculate_centroid(t["coordinates"]) for t in triangles_b]
 
-    # Create cost matrix
-    cost_matrix = np.zeros((len(triangles_a), len(triangles_b)))
+def register_solver(name, solver):
+    """
+    Register a transition solver under a name usable as create_transition(solver=name).
 
-    for i, centroid_a in enumerate(centroids_a):
-        if i % 1000 == 0 and i > 0:
-            print(f"  Processed {i}/{len(triangles_a)} triangles...")
+    A solver is called as ``solver(row_triangles, col_triangles, **options)``
+    with ``len(row_triangles) <= len(col_triangles)`` and returns
+    ``(row_indices, col_indices, distances, info)``: one entry per paired row,
+    plus a dict of solver statistics. When create_transition gets cost
+    weights, the solver is also passed ``cost_weights`` and
+    ``features=(row_features, col_features)``.
 
-        for j, centroid_b in enumerate(centroids_b):
-            # Euclidean distance between centroids
-            cost_matrix[i, j] = np.linalg.norm(centroid_a - centroid_b)
+    Args:
+        name (str): Solver name
+        solver (callable): Solver function
+    """
+    SOLVERS[name] = solver
 
-    elapsed = time.time() - start_time
-    print(f"Cost matrix calculation completed in {elapsed:.2f} seconds")
-    return cost_matrix
+
+def transition_cache_key(
+    cache,
+    triangles_from,
+    triangles_to,
+    max_triangles=None,
+    solver="hungarian",
+    solver_options=None,
+    cost_weights=None,
+    memory_budget=None,
+    refine=None,
+):
+    """
+    Cache key of the transition create_transition would compute for these arguments.
+
+    Args:
+        cache (TransitionCache): Cache the key is for
+        triangles_from (list): Source triangle set
+        triangles_to (list): Target triangle set
+        max_triangles (int, optional): Maximum number of triangles to use
+        solver (str/callable): Solver name or function
+        solver_options (dict, optional): Keyword arguments for the solver
+        cost_weights (dict, optional): Weighted cost terms
+        memory_budget (int, optional): Budget that solver="auto" selects for
+        refine (float, optional): Seconds of swap refinement after the solve
+
+    Returns:
+        str: Cache key
+    """
+    if solver == "auto":
+        n_from, n_to = len(triangles_from), len(triangles_to)
+        if max_triangles:
+            n_from, n_to = min(n_from, max_triangles), min(n_to, max_triangles)
+        solver, solver_options, _ = select_solver(n_from, n_to, memory_budget)
+    weights = normalize_cost_weights(cost_weights)
+    # Keys of unrefined transitions stay as they were
+    params = {"refine": refine} if refine else {}
+    # Colour terms make the pairings depend on more than the coordinates
+    include_color = weights is not None and bool({"rgb", "color"} & set(weights))
+    return cache.key(
+        triangles_from,
+        triangles_to,
+        include_color=include_color,
+        max_triangles=max_triangles,
+        solver=solver,
+        solver_options=solver_options,
+        cost=COST_FUNCTION if weights is None else weights,
+        **params,
+    )
+
+
+def _identical_pairs(triangles_from, triangles_to, weights):
+    """
+    Pairs of identical triangles, which an optimal transition can pair at zero cost.
+
+    Triangles count as identical when their coordinates are (and, for a cost
+    with colour terms, their colours too). Every cost term is a metric, so
+    swapping any optimal solution onto such a zero-cost pair never raises its
+    total.
+
+    Returns:
+        tuple: (from_indices, to_indices) of the identical pairs
+    """
+    include_color = weights is not None and any(
+        term in weights for term in ("rgb", "color")
+    )
+    matches = match_triangles(triangles_from, triangles_to, include_color)
+    from_indices = np.flatnonzero(matches >= 0)
+    return from_indices, matches[from_indices]
+
+
+def _resolve_solver(solver):
+    """Solver function for a name in SOLVERS or a callable."""
+    if callable(solver):
+        return solver
+    if solver in SOLVERS:
+        return SOLVERS[solver]
+    raise ValueError(f"Unknown solver '{solver}', expected one of {sorted(SOLVERS)}")
+
+
+def _deadline_worker(connection, solve, row_triangles, col_triangles, options):
+    """Child process entry point of _solve_with_deadline."""
+    try:
+        result = solve(row_triangles, col_triangles, **options)
+    except Exception as error:
+        connection.send((False, error))
+    else:
+        connection.send((True, result))
+    connection.close()
+
+
+def _solve_with_deadline(solve, row_triangles, col_triangles, options, deadline):
+    """
+    Run a solver in a child process that is killed if it misses the deadline.
+
+    Solvers such as linear_sum_assignment cannot be interrupted in-process,
+    so the solve runs in its own process and is terminated when no result
+    has arrived after ``deadline`` seconds.
+
+    Returns:
+        tuple/None: The solver's result, or None if it missed the deadline
+            or its process died
+
+    Raises:
+        Exception: Whatever the solver raised
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_deadline_worker,
+        args=(sender, solve, row_triangles, col_triangles, options),
+    )
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(max(deadline, 0)):
+            succeeded, result = receiver.recv()
+            if not succeeded:
+                raise result
+            return result
+    except EOFError:
+        print("Solver process exited without a result")
+    finally:
+        receiver.close()
+        process.terminate()
+        process.join()
+    return None
+
+
+def _warm_start_options(warm_start, n_from, n_to, is_source_rows):
+    """Solver options seeding a row-oriented solve with a from->to warm start."""
+    assignment, prices = warm_start
+    assignment = np.asarray(assignment)[:n_from]
+    assignment = np.where(assignment < n_to, assignment, -1)
+    if is_source_rows:
+        if prices is not None and len(prices) != n_to:
+            prices = None
+        return {"initial_assignment": assignment, "prices": prices}
+
+    # Rows are the targets: invert the assignment; target prices do not apply
+    inverse = np.full(n_to, -1)
+    paired = assignment >= 0
+    inverse[assignment[paired]] = np.flatnonzero(paired)
+    return {"initial_assignment": inverse}
+
+
+def _ascent_bound(points_rows, points_cols, k, rounds):
+    """
+    Dual bound sum_i min_j (c_ij + p_j) - sum_j p_j from nearest candidates.
+
+    Starting from zero prices (the row minima), every column that is the
+    cheapest of several rows is raised by the smallest margin of those rows
+    to their second choice, which never lowers the bound. Columns beyond a
+    row's k nearest cost at least its k-th distance plus the lowest price.
+    """
+    n_rows, n_cols = len(points_rows), len(points_cols)
+    neighbors, distances = build_candidate_graph(points_rows, points_cols, k)
+    if neighbors.shape[1] == n_cols:
+        beyond = np.full(n_rows, np.inf)
+    else:
+        beyond = distances[:, -1]
+    # A second candidate at the k-th distance keeps single candidates valid
+    neighbors = np.column_stack([neighbors, neighbors[:, -1]])
+    distances = np.column_stack([distances, beyond])
+    rows = np.arange(n_rows)
+    prices = np.zeros(n_cols)
+
+    bound = -np.inf
+    for _ in range(rounds):
+        values = distances + prices[neighbors]
+        values[:, -1] = beyond + prices.min()
+        order = np.argpartition(values, 1, axis=1)
+        best = values[rows, order[:, 0]]
+        margin = values[rows, order[:, 1]] - best
+        bound = max(bound, best.sum() - prices.sum())
+
+        # Only real candidates can be raised, not the stand-in for the rest
+        bidding = order[:, 0] < neighbors.shape[1] - 1
+        columns = neighbors[rows, order[:, 0]][bidding]
+        step = np.full(n_cols, np.inf)
+        np.minimum.at(step, columns, margin[bidding])
+        step[np.bincount(columns, minlength=n_cols) < 2] = 0
+        if not step.any():
+            break
+        prices += step
+    return float(bound)
+
+
+def _grid_transport_bound(points_rows, points_cols, cells):
+    """
+    Transport bound between grid cells, each pair costing the cells' gap.
+
+    The grid spans the two coordinates of widest spread; every pairing of a
+    row in one cell with a column in another costs at least the distance
+    between the cells, so the optimal cell-level transport is a lower bound.
+    """
+    both = np.concatenate([points_rows, points_cols])
+    axes = np.argsort(np.ptp(both, axis=0))[-2:]
+    low = both[:, axes].min(axis=0)
+    size = np.maximum(np.ptp(both[:, axes], axis=0), 1e-9) / cells
+
+    def cell_of(points):
+        index = np.minimum(((points[:, axes] - low) / size).astype(int), cells - 1)
+        return index[:, 0] * cells + index[:, 1]
+
+    counts_rows = np.bincount(cell_of(points_rows), minlength=cells * cells)
+    counts_cols = np.bincount(cell_of(points_cols), minlength=cells * cells)
+    sources, targets = np.flatnonzero(counts_rows), np.flatnonzero(counts_cols)
+    grid = np.stack([sources // cells, sources % cells], axis=1)
+    other = np.stack([targets // cells, targets % cells], axis=1)
+    steps = np.maximum(np.abs(grid[:, None] - other[None]) - 1, 0) * size
+    gaps = np.hypot(steps[..., 0], steps[..., 1])
+    flow = _transport(gaps, counts_rows[sources], counts_cols[targets])
+    return float((flow * gaps).sum())
+
+
+def _projection_bound(points_a, points_b, projections):
+    """
+    Largest one-dimensional transport cost of two equal-sized point sets.
+
+    Projecting onto a unit direction never lengthens a pair, and in one
+    dimension pairing the sorted values is optimal. The direction between
+    the two means is tried first, as it carries a translation in full.
+    """
+    rng = np.random.default_rng(0)
+    directions = rng.normal(size=(projections, points_a.shape[1]))
+    shift = points_b.mean(axis=0) - points_a.mean(axis=0)
+    if np.any(shift):
+        directions = np.vstack([shift, directions])
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    projected_a = np.sort(points_a @ directions.T, axis=0)
+    projected_b = np.sort(points_b @ directions.T, axis=0)
+    return float(np.abs(projected_a - projected_b).sum(axis=0).max())
+
+
+def transition_lower_bound(
+    triangles_from,
+    triangles_to,
+    max_triangles=None,
+    cost_weights=None,
+    features=None,
+):
+    """
+    Lower bound on the total cost of any transition between two triangle sets.
+
+    The largest of a few cheap bounds, in O(n * k) plus a small linear
+    program: a dual bound from each triangle's cheapest partners (see
+    _ascent_bound), a transport bound between coarse grid cells, which
+    catches redistributed triangles, and for sets of equal size the
+    transport cost along single directions, which catches a shifted slide.
+    All measure distances between weighted feature points, which never
+    exceed the weighted cost. The bound is conservative: on two uniform
+    random slides even the optimal transition is about twice the bound.
+
+    Args:
+        triangles_from (list): Source triangle set
+        triangles_to (list): Target triangle set
+        max_triangles (int, optional): Maximum number of triangles to use
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (features_from, features_to) from
+            calculate_features
+
+    Returns:
+        float: Lower bound on the total pairing cost of min(n, m) pairs
+    """
+    weights = normalize_cost_weights(cost_weights)
+    if features is None:
+        features = (triangles_from, triangles_to)
+    sides = [side[:max_triangles] if max_triangles else side for side in features]
+    if weights is None:
+        points = [_as_centroids(side).astype(np.float64) for side in sides]
+    else:
+        points = [_candidate_points(_as_features(side), weights) for side in sides]
+
+    points_rows, points_cols = sorted(points, key=len)
+    if len(points_rows) == 0:
+        return 0.0
+    bound = _ascent_bound(
+        points_rows, points_cols, LOWER_BOUND_NEIGHBORS, LOWER_BOUND_ROUNDS
+    )
+    if len(points_rows) == len(points_cols):
+        # Both sides are fully paired, so the columns' view is a bound too
+        bound = max(
+            bound,
+            _ascent_bound(
+                points_cols, points_rows, LOWER_BOUND_NEIGHBORS, LOWER_BOUND_ROUNDS
+            ),
+            _projection_bound(points_rows, points_cols, LOWER_BOUND_PROJECTIONS),
+        )
+    bound = max(
+        bound, _grid_transport_bound(points_rows, points_cols, LOWER_BOUND_GRID)
+    )
+    return max(bound, 0.0)
+
+
+def transition_quality(
+    pairings,
+    triangles_from,
+    triangles_to,
+    max_triangles=None,
+    cost_weights=None,
+    features=None,
+    lower_bound=None,
+    estimate=True,
+):
+    """
+    Total cost of a transition and how far it may be from the optimum.
+
+    Args:
+        pairings (Transition/list): Pairings of the transition; fade and
+            spawn entries are ignored
+        triangles_from (list): Source triangle set
+        triangles_to (list): Target triangle set
+        max_triangles (int, optional): Maximum number of triangles used
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (features_from, features_to) from
+            calculate_features
+        lower_bound (float, optional): Bound proven by the solver, e.g. the
+            cost of an exact solve or the dual bound of an auction's prices
+        estimate (bool): Also estimate a bound with transition_lower_bound,
+            which is usually far looser than a solver's, and report the
+            larger of the two
+
+    Returns:
+        dict: "cost" (total pairing cost) and, if a bound is known or
+        estimated, "lower_bound" and "gap", the share of the cost the bound
+        does not cover; the transition is at most that far above the optimum
+    """
+    cost = Transition.from_pairings(pairings).matched().total_distance()
+    bounds = [] if lower_bound is None else [float(lower_bound)]
+    # A proven bound that already meets the cost needs no estimate
+    if estimate and not (bounds and cost - bounds[0] <= QUALITY_TOLERANCE * cost):
+        bounds.append(
+            transition_lower_bound(
+                triangles_from, triangles_to, max_triangles, cost_weights, features
+            )
+        )
+    if not bounds:
+        return {"cost": cost}
+    bound = min(max(*bounds, 0.0), cost)
+    # Pairing distances are stored in float32; closer than that is optimal
+    if cost - bound <= QUALITY_TOLERANCE * cost:
+        bound = cost
+    gap = (cost - bound) / cost if cost > 0 else 0.0
+    return {"cost": cost, "lower_bound": bound, "gap": gap}
 
 
-def create_transition(triangles_from, triangles_to, max_triangles=None):
+def create_transition(
+    triangles_from,
+    triangles_to,
+    max_triangles=None,
+    solver="hungarian",
+    solver_options=None,
+    info=None,
+    cache=None,
+    warm_start=None,
+    cost_weights=None,
+    features=None,
+    memory_budget=None,
+    deadline=None,
+    fallback_solver=DEFAULT_FALLBACK_SOLVER,
+    anchor=False,
+    refine=None,
+    estimate_bound=False,
+):
     """
     Create a transition between two sets of triangles using the Hungarian algorithm.
 
@@ -67,71 +2832,813 @@ def create_transition(triangles_from, triangles_to, max_triangles=None):
         triangles_from (list): Source triangle set
         triangles_to (list): Target triangle set
         max_triangles (int, optional): Maximum number of triangles to use (for memory optimization)
+        solver (str/callable): "hungarian" for the dense exact solve, "sparse" for a
+            min-weight matching restricted to each triangle's nearest candidates
+            (O(n*k) memory, practical for tens of thousands of triangles),
+            "auction" for a faster near-optimal dense solve, "partitioned" for
+            independent exact solves on quadtree cells, "multilevel" for exact
+            solves inside recursively matched k-means clusters, "sinkhorn" for an
+            approximate entropic optimal-transport solve with tiled kernels
+            (O(n) memory, tunable speed/quality), "greedy" for a fast
+            non-optimal nearest-pair-first matching for previews, any name added with
+            register_solver, a solver function itself, or "auto" to let
+            select_solver pick one for ``memory_budget``
+        solver_options (dict, optional): Keyword arguments for the solver,
+            e.g. {"time_limit": 5.0}, {"tolerance": 0.001} or {"exact": True}
+            for "auction"
+        info (dict, optional): Updated in place with solver statistics,
+            e.g. "epsilon" and "optimality_bound" for auction-based solvers,
+            and with the "seconds" the transition took and its total "cost".
+            Solvers that prove a "lower_bound" ("hungarian", whose bound is
+            its cost, and "auction" and "sparse" from the dual bound of their
+            prices) also give the relative optimality "gap", see
+            transition_quality
+        cache (TransitionCache, optional): On-disk cache to look the pairings up
+            in before solving, and to store them in afterwards
+        warm_start (tuple, optional): (assignment, prices) to seed a solver in
+            WARM_START_SOLVERS with, where assignment is the target index per
+            source triangle (-1 for none) and prices are target prices from a
+            previous info["target_prices"] (or None). Useful when a good guess
+            exists, e.g. the composition of A->B and B->C for A->C
+        cost_weights (dict, optional): Pairing cost as a weighted sum of feature
+            distances, by term of COST_TERMS: "position" (centroid distance in
+            pixels), "rgb" or "color" (RGB or CIELAB colour distance), "area"
+            (absolute log area ratio) and "orientation" (0-1). Default is
+            {"position": 1.0}, the plain centroid distance
+        features (tuple, optional): (features_from, features_to) from
+            calculate_features, to reuse per-slide features across transitions
+        memory_budget (int, optional): Bytes the solve may use, for solver="auto"
+        deadline (float, optional): Seconds the solver may take. The solve then
+            runs in a child process that is killed at the deadline, and the
+            transition is solved with ``fallback_solver`` instead; info gets
+            "approximate" True, "fallback_solver" and the achieved "cost".
+            Approximate pairings are not cached
+        fallback_solver (str/callable): Solver used after a missed deadline,
+            without the solver options or warm start of the original solve
+        anchor (bool): Add fade and spawn entries for the triangles left
+            unpaired when the sets differ in size, see anchor_unmatched
+        refine (float, optional): Seconds to spend improving the solved
+            pairings by swapping the targets of nearby pairs, see
+            refine_pairings. Worth it after the fast solvers, including a
+            fallback after a missed deadline
+        estimate_bound (bool): Estimate the lower bound and gap with
+            transition_lower_bound, for solvers that prove none (e.g.
+            "partitioned", "multilevel" or "greedy") or a weaker one. The
+            estimate is loose (about half the optimal cost of two random
+            slides) and takes about 0.3 s at 20k triangles
 
     Returns:
-        list: List of pairings (dictionaries with from_index, to_index, distance keys)
+        Transition: The pairings as typed arrays, sorted by source index; read
+        as a sequence, each pairing is a dict with from_index, to_index and
+        distance (the pairing cost) keys. With ``anchor`` the fade and spawn
+        entries follow the matched pairs. Solver statistics go to ``info``
+
+    Raises:
+        ValueError: If the solver or fallback solver is unknown, the solver
+            does not support warm starts, or the cost weights are invalid
     """
+    start_time = time.time()
+    pairings = _create_pairings(
+        triangles_from,
+        triangles_to,
+        max_triangles,
+        solver,
+        solver_options,
+        info,
+        cache,
+        warm_start,
+        cost_weights,
+        features,
+        memory_budget,
+        deadline,
+        fallback_solver,
+        refine,
+    )
+    if info is not None and len(pairings):
+        info["seconds"] = time.time() - start_time
+        info.update(
+            transition_quality(
+                pairings,
+                triangles_from,
+                triangles_to,
+                max_triangles,
+                cost_weights,
+                features,
+                lower_bound=info.get("lower_bound"),
+                estimate=estimate_bound,
+            )
+        )
+    if anchor:
+        return anchor_unmatched(pairings, triangles_from, triangles_to, max_triangles)
+    return pairings
+
+
+def _create_pairings(
+    triangles_from,
+    triangles_to,
+    max_triangles,
+    solver,
+    solver_options,
+    info,
+    cache,
+    warm_start,
+    cost_weights,
+    features,
+    memory_budget,
+    deadline,
+    fallback_solver,
+    refine,
+):
+    """Solve the pairings of a transition, see create_transition."""
+    if solver == "auto":
+        if solver_options:
+            raise ValueError("solver_options cannot be combined with solver='auto'")
+        n_from, n_to = len(triangles_from), len(triangles_to)
+        if max_triangles:
+            n_from, n_to = min(n_from, max_triangles), min(n_to, max_triangles)
+        solver, solver_options, reason = select_solver(n_from, n_to, memory_budget)
+        print(f"Using {solver} solver: {reason}")
+        if info is not None:
+            info["solver"] = solver
+            info["solver_reason"] = reason
+        if solver not in WARM_START_SOLVERS:
+            warm_start = None
+
+    solve = _resolve_solver(solver)
+    if deadline is not None:
+        fallback = _resolve_solver(fallback_solver)
+    if warm_start is not None and solver not in WARM_START_SOLVERS:
+        raise ValueError(
+            f"Solver '{solver}' does not support warm starts, "
+            f"expected one of {list(WARM_START_SOLVERS)}"
+        )
+
+    weights = normalize_cost_weights(cost_weights)
+
+    if cache is not None:
+        cache_key = transition_cache_key(
+            cache,
+            triangles_from,
+            triangles_to,
+            max_triangles,
+            solver,
+            solver_options,
+            cost_weights,
+            refine=refine,
+        )
+        pairings = cache.get(cache_key)
+        if pairings is not None:
+            if info is not None:
+                info["cached"] = True
+                if solver in EXACT_SOLVERS:
+                    info["lower_bound"] = pairings.total_distance()
+            print(f"Loaded {len(pairings)} triangle pairings from cache")
+            return Transition.from_pairings(pairings)
+
     # Include all triangles in the transition, regardless of opacity
     source_triangles = triangles_from
     target_triangles = triangles_to
 
-    # Create identity mapping for indices (no filtering)
-    source_index_map = list(range(len(source_triangles)))
-    target_index_map = list(range(len(target_triangles)))
-
     # Limit triangles if specified (for memory efficiency)
     if max_triangles:
         source_triangles = source_triangles[:max_triangles]
-        source_index_map = source_index_map[:max_triangles]
         target_triangles = target_triangles[:max_triangles]
-        target_index_map = target_index_map[:max_triangles]
 
     # If either set is empty, handle this case
     if not source_triangles or not target_triangles:
         print("Warning: No triangles found")
-        return []
+        return Transition()
+
+    # Pair identical triangles (e.g. a recoloured copy of a slide) directly
+    # and solve only the remainder
+    if warm_start is None:
+        same_from, same_to = _identical_pairs(
+            source_triangles, target_triangles, weights
+        )
+        if len(same_from):
+            print(f"Pairing {len(same_from)} identical triangles directly")
+            from_indices, to_indices = [same_from], [same_to]
+            distances = [np.zeros(len(same_from))]
+            rest_from = np.setdiff1d(np.arange(len(source_triangles)), same_from)
+            rest_to = np.setdiff1d(np.arange(len(target_triangles)), same_to)
+            rest_info = {} if info is None else info
+            if len(rest_from) and len(rest_to):
+                rest_features = None
+                if weights is not None and features is not None:
+                    rest_features = (features[0][rest_from], features[1][rest_to])
+                rest = _create_pairings(
+                    [source_triangles[i] for i in rest_from],
+                    [target_triangles[i] for i in rest_to],
+                    None,
+                    solver,
+                    solver_options,
+                    rest_info,
+                    None,
+                    None,
+                    cost_weights,
+                    rest_features,
+                    None,
+                    deadline,
+                    fallback_solver,
+                    refine,
+                )
+                from_indices.append(rest_from[rest.from_index])
+                to_indices.append(rest_to[rest.to_index])
+                distances.append(rest.distance)
+            pairings = _sorted_transition(
+                np.concatenate(from_indices),
+                np.concatenate(to_indices),
+                np.concatenate(distances),
+            )
+            if info is not None:
+                info["identical"] = len(same_from)
+                if not (len(rest_from) and len(rest_to)):
+                    # Nothing left to solve: the transition costs nothing
+                    info["lower_bound"] = 0.0
+            if cache is not None and not rest_info.get("approximate"):
+                cache.put(cache_key, pairings)
+            print(f"Created {len(pairings)} triangle pairings")
+            return pairings
 
     # Determine which set needs to be the rows (smaller set)
     if len(source_triangles) <= len(target_triangles):
         row_triangles, col_triangles = source_triangles, target_triangles
-        row_index_map, col_index_map = source_index_map, target_index_map
         is_source_rows = True
     else:
         row_triangles, col_triangles = target_triangles, source_triangles
-        row_index_map, col_index_map = target_index_map, source_index_map
         is_source_rows = False
 
-    # Calculate cost matrix
-    cost_matrix = calculate_cost_matrix(row_triangles, col_triangles)
+    options = dict(solver_options or {})
+    if weights is not None:
+        if features is None:
+            features_from = calculate_features(source_triangles)
+            features_to = calculate_features(target_triangles)
+        else:
+            features_from = features[0][: len(source_triangles)]
+            features_to = features[1][: len(target_triangles)]
+        options["cost_weights"] = weights
+        options["features"] = (
+            (features_from, features_to)
+            if is_source_rows
+            else (features_to, features_from)
+        )
+    if warm_start is not None:
+        options.update(
+            _warm_start_options(
+                warm_start, len(source_triangles), len(target_triangles), is_source_rows
+            )
+        )
+
+    if deadline is None:
+        result = solve(row_triangles, col_triangles, **options)
+    else:
+        result = _solve_with_deadline(
+            solve, row_triangles, col_triangles, options, deadline
+        )
+    approximate = result is None
+    if approximate:
+        fallback_name = getattr(fallback_solver, "__name__", fallback_solver)
+        print(
+            f"Solver missed the {deadline:g} s deadline, "
+            f"falling back to the {fallback_name} solver"
+        )
+        fallback_options = {
+            key: options[key] for key in ("cost_weights", "features") if key in options
+        }
+        result = fallback(row_triangles, col_triangles, **fallback_options)
+    row_indices, col_indices, distances, solver_info = result
+    if info is not None:
+        info.update(solver_info)
+        if is_source_rows and "prices" in solver_info:
+            info["target_prices"] = solver_info["prices"]
+        if approximate:
+            info["approximate"] = True
+            info["fallback_solver"] = fallback_name
+
+    # Convert assignments to pairings (indices are positions in the original lists)
+    if is_source_rows:
+        from_indices, to_indices = row_indices, col_indices
+    else:
+        from_indices, to_indices = col_indices, row_indices
+
+    pairings = _sorted_transition(from_indices, to_indices, distances)
+    if refine:
+        pairings = refine_pairings(
+            pairings,
+            source_triangles,
+            target_triangles,
+            cost_weights=cost_weights,
+            features=None if weights is None else (features_from, features_to),
+            time_limit=refine,
+            info=info,
+        )
+
+    if cache is not None and not approximate:
+        cache.put(cache_key, pairings)
+
+    print(f"Created {len(pairings)} triangle pairings")
+    return pairings
+
+
+def _sorted_transition(from_indices, to_indices, distances, kinds=None):
+    """Transition with its pairings ordered by kind, then source index."""
+    from_indices = np.asarray(from_indices)
+    kinds = np.zeros(len(from_indices), dtype=np.int8) if kinds is None else kinds
+    kinds = np.asarray(kinds)
+    order = np.argsort(from_indices, kind="stable")
+    if kinds.any():
+        order = order[np.argsort(kinds[order], kind="stable")]
+    return Transition(
+        from_indices[order],
+        np.asarray(to_indices)[order],
+        np.asarray(distances)[order],
+        np.asarray(kinds)[order],
+    )
+
+
+def _swap_refine(
+    pair_cost, points_rows, points_cols, assignment, k, time_limit, active=None
+):
+    """
+    Pairwise swap local search on a row->column assignment.
+
+    Every round, each active row looks at its k nearest columns and finds the
+    best exchange of columns with their current rows (or the best free
+    column). The improving exchanges are taken best first as long as they
+    touch distinct columns, so a whole round is applied at once. The next
+    round looks only at rows a swap could have changed: the swapped rows,
+    rows with a swapped column among their candidates and rows whose swap
+    was postponed. Rounds repeat until none improves or the time limit has
+    passed.
+
+    Returns:
+        tuple: (assignment, swaps, rounds, converged)
+    """
+    n_rows, n_cols = len(points_rows), len(points_cols)
+    k = min(k, n_cols)
+    _, candidates = cKDTree(points_cols).query(points_rows, k=k)
+    candidates = candidates.reshape(n_rows, k)
+    rows = np.arange(n_rows)
+    candidate_costs = pair_cost(np.repeat(rows, k), candidates.ravel())
+    candidate_costs = candidate_costs.reshape(n_rows, k)
+    assignment = np.array(assignment)
+    owner = np.full(n_cols, -1)
+    owner[assignment] = rows
+    current = pair_cost(rows, assignment)
+    active = rows if active is None else np.unique(active)
+
+    stop = time.time() + time_limit
+    swaps = rounds = 0
+    while time.time() < stop:
+        if not len(active):
+            return assignment, swaps, rounds, True
+        rounds += 1
+        found_rows, found_slots, found_gains = [], [], []
+        for start in range(0, len(active), REFINE_BATCH_SIZE):
+            batch = active[start : start + REFINE_BATCH_SIZE]
+            others = owner[candidates[batch]]
+            paired = others >= 0
+            # Cost of the other row taking over this row's column
+            back = np.zeros(others.shape)
+            own = np.broadcast_to(assignment[batch, None], others.shape)
+            back[paired] = pair_cost(others[paired], own[paired])
+            gains = (
+                current[batch, None]
+                + np.where(paired, current[others], 0.0)
+                - candidate_costs[batch]
+                - back
+            )
+            gains[others == batch[:, None]] = 0
+            slots = gains.argmax(axis=1)
+            best = gains[np.arange(len(batch)), slots]
+            better = best > REFINE_TOLERANCE
+            found_rows.append(batch[better])
+            found_slots.append(slots[better])
+            found_gains.append(best[better])
+            if time.time() >= stop:
+                break
+        swap_rows = np.concatenate(found_rows)
+        if not len(swap_rows):
+            return assignment, swaps, rounds, True
+
+        # Best swaps first, each column in at most one swap per round
+        order = np.argsort(-np.concatenate(found_gains), kind="stable")
+        swap_rows = swap_rows[order]
+        swap_slots = np.concatenate(found_slots)[order]
+        old_cols = assignment[swap_rows]
+        new_cols = candidates[swap_rows, swap_slots]
+        rank = np.arange(len(swap_rows))
+        first = np.full(n_cols, len(rank))
+        np.minimum.at(first, old_cols, rank)
+        np.minimum.at(first, new_cols, rank)
+        chosen = (first[old_cols] == rank) & (first[new_cols] == rank)
+        postponed = swap_rows[~chosen]
+
+        swap_rows, old_cols = swap_rows[chosen], old_cols[chosen]
+        new_cols, swap_slots = new_cols[chosen], swap_slots[chosen]
+        others = owner[new_cols]
+        assignment[swap_rows] = new_cols
+        current[swap_rows] = candidate_costs[swap_rows, swap_slots]
+        owner[new_cols] = swap_rows
+        owner[old_cols] = -1
+        changed_cols = np.zeros(n_cols, dtype=bool)
+        changed_cols[old_cols] = changed_cols[new_cols] = True
+        paired = others >= 0
+        others, old_cols = others[paired], old_cols[paired]
+        assignment[others] = old_cols
+        current[others] = pair_cost(others, old_cols)
+        owner[old_cols] = others
+        swaps += len(swap_rows)
+
+        near_changed = np.flatnonzero(changed_cols[candidates].any(axis=1))
+        active = np.unique(np.concatenate([near_changed, swap_rows, others, postponed]))
+    return assignment, swaps, rounds, False
+
+
+def refine_pairings(
+    pairings,
+    triangles_from,
+    triangles_to,
+    max_triangles=None,
+    cost_weights=None,
+    features=None,
+    time_limit=REFINE_TIME_LIMIT,
+    neighbors=REFINE_NEIGHBORS,
+    info=None,
+    focus=None,
+):
+    """
+    Improve a transition by swapping the targets of nearby pairs.
+
+    Meant for the output of the fast solvers ("greedy", "partitioned",
+    "multilevel", a "sparse" solve with few candidates, or a fallback after
+    a missed deadline): two pairs exchange their targets, or a pair moves to
+    a free target, whenever that lowers the total cost. Candidates are the
+    nearest targets of each triangle found with a KD-tree, and all swaps of a
+    round are evaluated together in batches of REFINE_BATCH_SIZE triangles.
+    The result is a local optimum unless the time limit ends the search.
+
+    Args:
+        pairings (list/Transition): Pairings of the transition; fade and
+            spawn entries are dropped
+        triangles_from (list): Source triangle set
+        triangles_to (list): Target triangle set
+        max_triangles (int, optional): Maximum number of triangles used
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        features (tuple, optional): (features_from, features_to) from
+            calculate_features
+        time_limit (float): Seconds after which no new round is started
+        neighbors (int): Candidate targets per triangle
+        info (dict, optional): Updated in place with the number of
+            "refine_swaps" and "refine_rounds" and whether the search
+            "refine_converged"
+        focus (tuple, optional): (source indices, target indices) of the
+            triangles to start from when the rest is known to be a local
+            optimum, e.g. the re-paired triangles of a repair; the search
+            spreads from them only as far as swaps are made
+
+    Returns:
+        Transition: The refined pairs, each triangle keeping one partner
+    """
+    pairings = Transition.from_pairings(pairings).matched()
+    weights = normalize_cost_weights(cost_weights)
+    if features is None:
+        features = (triangles_from, triangles_to)
+    sides = [side[:max_triangles] if max_triangles else side for side in features]
+    if weights is None:
+        sides = [_as_centroids(side).astype(np.float64) for side in sides]
+        points = sides
+    else:
+        sides = [_as_features(side) for side in sides]
+        points = [_candidate_points(side, weights) for side in sides]
+    if not len(pairings):
+        return pairings
+
+    # Search from the smaller side, whose triangles are all paired
+    is_source_rows = len(points[0]) <= len(points[1])
+    if is_source_rows:
+        row_indices, col_indices = pairings.from_index, pairings.to_index
+    else:
+        row_indices, col_indices = pairings.to_index, pairings.from_index
+        sides, points = sides[::-1], points[::-1]
+    if len(row_indices) != len(points[0]):
+        raise ValueError("Pairings must pair every triangle of the smaller set")
+    features_rows, features_cols = sides
+
+    def pair_cost(rows, cols):
+        if weights is None:
+            return np.linalg.norm(features_rows[rows] - features_cols[cols], axis=1)
+        return pair_costs(features_rows[rows], features_cols[cols], weights)
 
-    # Apply Hungarian algorithm
-    print("Running Hungarian algorithm...")
     start_time = time.time()
-    row_indices, col_indices = linear_sum_assignment(cost_matrix)
+    assignment = np.empty(len(row_indices), dtype=np.int64)
+    assignment[row_indices] = col_indices
+    active = None
+    if focus is not None:
+        focus_rows, focus_cols = (np.asarray(f, dtype=np.int64) for f in focus)
+        if not is_source_rows:
+            focus_rows, focus_cols = focus_cols, focus_rows
+        owner = np.full(len(points[1]), -1)
+        owner[assignment] = np.arange(len(assignment))
+        active = np.concatenate([focus_rows, owner[focus_cols]])
+        active = active[active >= 0]
+    assignment, swaps, rounds, converged = _swap_refine(
+        pair_cost, points[0], points[1], assignment, neighbors, time_limit, active
+    )
     elapsed = time.time() - start_time
-    print(f"Hungarian algorithm completed in {elapsed:.2f} seconds")
-
-    # Convert assignments to pairings
-    pairings = []
-    for row_idx, col_idx in zip(row_indices, col_indices):
-        if is_source_rows:
-            # Source is rows, target is columns
-            pairings.append(
-                {
-                    "from_index": int(source_index_map[row_idx]),
-                    "to_index": int(target_index_map[col_idx]),
-                    "distance": float(cost_matrix[row_idx, col_idx]),
-                }
+    print(
+        f"Swap refinement completed in {elapsed:.2f} seconds "
+        f"({swaps} swaps in {rounds} rounds"
+        f"{'' if converged else ', stopped at the time limit'})"
+    )
+    if info is not None:
+        info["refine_swaps"] = swaps
+        info["refine_rounds"] = rounds
+        info["refine_converged"] = converged
+
+    rows = np.arange(len(assignment))
+    distances = pair_cost(rows, assignment)
+    if is_source_rows:
+        return _sorted_transition(rows, assignment, distances)
+    return _sorted_transition(assignment, rows, distances)
+
+
+def anchor_unmatched(pairings, triangles_from, triangles_to, max_triangles=None):
+    """
+    Add fade and spawn entries for the triangles a transition leaves unpaired.
+
+    When the slides have different triangle counts, each source triangle
+    without partner gets a "fade" entry towards its nearest target triangle
+    (by centroid) and each target triangle without partner a "spawn" entry
+    from its nearest source triangle, so the frontend can fade surplus
+    triangles out and grow new ones in without padding slides with invisible
+    dummy triangles.
+
+    Args:
+        pairings (list/Transition): Matched pairs of the transition
+        triangles_from (list): Source triangle set
+        triangles_to (list): Target triangle set
+        max_triangles (int, optional): Maximum number of triangles the
+            transition was created with
+
+    Returns:
+        Transition: The matched pairs followed by the fade and spawn entries
+    """
+    pairings = Transition.from_pairings(pairings).matched()
+    if max_triangles:
+        triangles_from = triangles_from[:max_triangles]
+        triangles_to = triangles_to[:max_triangles]
+    if not triangles_from or not triangles_to:
+        return pairings
+
+    fading = np.setdiff1d(np.arange(len(triangles_from)), pairings.from_index)
+    spawning = np.setdiff1d(np.arange(len(triangles_to)), pairings.to_index)
+    from_indices, to_indices = [pairings.from_index], [pairings.to_index]
+    distances, kinds = [pairings.distance], [pairings.kind]
+    for unmatched, own, other, kind in (
+        (fading, triangles_from, triangles_to, FADE),
+        (spawning, triangles_to, triangles_from, SPAWN),
+    ):
+        if not len(unmatched):
+            continue
+        centroids = calculate_centroids(own)[unmatched]
+        anchor_distances, anchors = cKDTree(calculate_centroids(other)).query(centroids)
+        if kind == FADE:
+            from_indices.append(unmatched)
+            to_indices.append(anchors)
+        else:
+            from_indices.append(anchors)
+            to_indices.append(unmatched)
+        distances.append(anchor_distances)
+        kinds.append(np.full(len(unmatched), kind, dtype=np.int8))
+
+    return _sorted_transition(
+        np.concatenate(from_indices),
+        np.concatenate(to_indices),
+        np.concatenate(distances),
+        np.concatenate(kinds),
+    )
+
+
+def reverse_pairings(pairings):
+    """
+    Pairings of the reverse transition, B->A from A->B.
+
+    The pairing cost is symmetric, so the inverse of an optimal A->B
+    assignment is an optimal B->A assignment with the same distances.
+
+    Args:
+        pairings (list/Transition): Pairings of a transition
+
+    Returns:
+        Transition: Pairings with from_index and to_index swapped, ordered
+        by from_index
+    """
+    pairings = Transition.from_pairings(pairings)
+    # A fade of A->B is a spawn of B->A and vice versa
+    kind = np.array([PAIR, SPAWN, FADE], dtype=np.int8)[pairings.kind]
+    return _sorted_transition(
+        pairings.to_index, pairings.from_index, pairings.distance, kind
+    )
+
+
+def _triangle_key(triangle, include_color=False):
+    key = np.asarray(triangle["coordinates"], dtype=np.float64).tobytes()
+    if include_color:
+        key += np.asarray(triangle.get("color", ()), dtype=np.float64).tobytes()
+    return key
+
+
+def match_triangles(previous, current, include_color=False):
+    """
+    Find each triangle of a previous version of a slide in its current version.
+
+    Triangles are matched by a hash of their exact coordinates, so unchanged
+    triangles are found wherever they moved in the list.
+
+    Args:
+        previous (list): Previous triangle list
+        current (list): Current triangle list
+        include_color (bool): Only match triangles whose colour is unchanged too
+
+    Returns:
+        np.ndarray: Index in ``current`` per previous triangle, -1 if it is gone
+    """
+    positions = {}
+    for index, triangle in enumerate(current):
+        key = _triangle_key(triangle, include_color)
+        positions.setdefault(key, []).append(index)
+
+    matches = np.full(len(previous), -1)
+    for index, triangle in enumerate(previous):
+        key = _triangle_key(triangle, include_color)
+        candidates = positions.get(key)
+        if candidates:
+            matches[index] = candidates.pop(0)
+    return matches
+
+
+def repair_transition(
+    pairings,
+    triangles_from,
+    triangles_to,
+    previous_from=None,
+    previous_to=None,
+    max_triangles=None,
+    info=None,
+    cost_weights=None,
+    **options,
+):
+    """
+    Update a transition after one or both of its slides changed.
+
+    Pairs whose two triangles still exist (see match_triangles) are kept.
+    The new triangles and the partners of removed ones are paired by one
+    sparse solve of just that sub-problem, which is then grown by pairwise
+    swaps with the kept pairs around it as far as they lower the total cost
+    (see refine_pairings). If more than REPAIR_MAX_FRACTION of the triangles
+    are new or lost their partner, the transition is solved from scratch
+    with create_transition instead.
+
+    Args:
+        pairings (list): Pairings of the transition before the change
+        triangles_from (list): Current source triangle set
+        triangles_to (list): Current target triangle set
+        previous_from (list, optional): Source set the pairings were made for
+            (None if it did not change)
+        previous_to (list, optional): Target set the pairings were made for
+            (None if it did not change)
+        max_triangles (int, optional): Maximum number of triangles to use
+        info (dict, optional): Updated in place with "kept" and "repaired"
+            pair counts (repaired pairs are new or have a different partner),
+            or the solver statistics of a full solve
+        cost_weights (dict, optional): Weighted cost terms, see create_transition
+        **options: Further create_transition arguments for the fallback solve;
+            anchor is also applied to the repaired pairs
+
+    Returns:
+        Transition: Pairings for the current triangle sets
+    """
+    weights = normalize_cost_weights(cost_weights)
+    source_triangles, target_triangles = triangles_from, triangles_to
+    if max_triangles:
+        source_triangles = source_triangles[:max_triangles]
+        target_triangles = target_triangles[:max_triangles]
+    n_from, n_to = len(source_triangles), len(target_triangles)
+    if n_from == 0 or n_to == 0:
+        return Transition()
+
+    # Carry the old pairs over to the current indices
+    from_map = to_map = None
+    if previous_from is not None:
+        from_map = match_triangles(previous_from, source_triangles)
+    if previous_to is not None:
+        to_map = match_triangles(previous_to, target_triangles)
+    # Triangles that are new or lost their partner
+    dirty_from = np.zeros(n_from, dtype=bool)
+    dirty_to = np.zeros(n_to, dtype=bool)
+    if from_map is not None:
+        dirty_from[:] = True
+        dirty_from[from_map[from_map >= 0]] = False
+    if to_map is not None:
+        dirty_to[:] = True
+        dirty_to[to_map[to_map >= 0]] = False
+
+    assignment = np.full(n_from, -1)
+    if pairings:
+        old = pairings_to_assignment(
+            pairings, max(p["from_index"] for p in pairings) + 1
+        )
+        old_from = np.flatnonzero(old >= 0)
+        new_from = old_from if from_map is None else from_map[old_from]
+        new_to = old[old_from] if to_map is None else to_map[old[old_from]]
+        new_from[new_from >= n_from] = -1
+        new_to[new_to >= n_to] = -1
+        valid = (new_from >= 0) & (new_to >= 0)
+        assignment[new_from[valid]] = new_to[valid]
+        dirty_from[new_from[~valid & (new_from >= 0)]] = True
+        dirty_to[new_to[~valid & (new_to >= 0)]] = True
+
+    if weights is None:
+        points_from = calculate_centroids(source_triangles)
+        points_to = calculate_centroids(target_triangles)
+    else:
+        points_from = calculate_features(source_triangles)
+        points_to = calculate_features(target_triangles)
+
+    taken = np.zeros(n_to, dtype=bool)
+    taken[assignment[assignment >= 0]] = True
+    carried = assignment.copy()
+
+    free_from = np.flatnonzero(assignment < 0)
+    free_to = np.flatnonzero(~taken)
+    n_pairs = min(n_from, n_to)
+    resolved = min(len(free_from), len(free_to))
+    if resolved > REPAIR_MAX_FRACTION * n_pairs:
+        print(
+            f"Repair would re-pair {resolved} of {n_pairs} triangles, "
+            f"solving the transition again"
+        )
+        return create_transition(
+            triangles_from,
+            triangles_to,
+            max_triangles,
+            info=info,
+            cost_weights=cost_weights,
+            **options,
+        )
+
+    if resolved:
+        # Pair the smaller side of the sub-problem completely
+        if len(free_from) <= len(free_to):
+            rows, cols = free_from, free_to
+            rows_points, cols_points = points_from, points_to
+        else:
+            rows, cols = free_to, free_from
+            rows_points, cols_points = points_to, points_from
+        if weights is None:
+            local_cols, _, _, _ = _sparse_assignment(
+                rows_points[rows], cols_points[cols]
             )
         else:
-            # Target is rows, source is columns
-            pairings.append(
-                {
-                    "from_index": int(source_index_map[col_idx]),
-                    "to_index": int(target_index_map[row_idx]),
-                    "distance": float(cost_matrix[row_idx, col_idx]),
-                }
+            local_cols, _, _, _ = _sparse_assignment(
+                _candidate_points(rows_points[rows], weights),
+                _candidate_points(cols_points[cols], weights),
+                cost=(rows_points[rows], cols_points[cols], weights),
             )
+        if rows is free_from:
+            assignment[rows] = cols[local_cols]
+        else:
+            assignment[cols[local_cols]] = rows
 
-    print(f"Created {len(pairings)} triangle pairings")
-    return pairings
+    from_indices = np.flatnonzero(assignment >= 0)
+    to_indices = assignment[from_indices]
+    if weights is None:
+        distances = np.hypot(*(points_from[from_indices] - points_to[to_indices]).T)
+    else:
+        distances = pair_costs(
+            points_from[from_indices], points_to[to_indices], weights
+        )
+    repaired = Transition(from_indices, to_indices, distances)
+    if dirty_from.any() or dirty_to.any():
+        # Kept pairs around the edit may now be better off exchanging partners
+        repaired = refine_pairings(
+            repaired,
+            source_triangles,
+            target_triangles,
+            cost_weights=cost_weights,
+            features=None if weights is None else (points_from, points_to),
+            focus=(free_from, free_to),
+        )
+
+    assignment = np.full(n_from, -1)
+    assignment[repaired.from_index] = repaired.to_index
+    changed = int(np.count_nonzero((assignment >= 0) & (assignment != carried)))
+    if info is not None:
+        info["kept"] = n_pairs - changed
+        info["repaired"] = changed
+
+    print(f"Repaired transition: kept {n_pairs - changed}, re-paired {changed}")
+    if options.get("anchor"):
+        return anchor_unmatched(repaired, triangles_from, triangles_to, max_triangles)
+    return repaired
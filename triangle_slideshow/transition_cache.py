@@ -0,0 +1,188 @@
+"""
+Transition cache module for triangle slideshow.
+
+This module stores computed transition pairings on disk, keyed by the content
+of both triangle sets and the solver parameters, so unchanged slide pairs do
+not have to be solved again when a slideshow is rebuilt.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from triangle_slideshow.transition import Transition
+
+# Binary record layout of one pairing in a cache file
+PAIRING_DTYPE = np.dtype([("from", "<i4"), ("to", "<i4"), ("distance", "<f4")])
+
+# Default size cap of the cache directory in bytes
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+CACHE_SUFFIX = ".pairings"
+
+
+def _coordinates_digest(triangles, include_color=False):
+    """Hash the coordinates (and optionally the RGB colours) of a triangle set."""
+    coordinates = np.asarray(
+        [t["coordinates"] for t in triangles], dtype=np.float64
+    ).reshape(len(triangles), -1)
+    digest = hashlib.sha256(np.ascontiguousarray(coordinates).tobytes())
+    if include_color:
+        colors = np.asarray(
+            [list(t.get("color", (0, 0, 0)))[:3] for t in triangles],
+            dtype=np.float64,
+        ).reshape(len(triangles), 3)
+        digest.update(np.ascontiguousarray(colors).tobytes())
+    return digest.hexdigest()
+
+
+def _describe(value):
+    """JSON-friendly description of a parameter value for the cache key."""
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    if isinstance(value, dict):
+        return {str(k): _describe(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class TransitionCache:
+    """Content-addressed on-disk cache of transition pairings with LRU eviction."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        """
+        Initialize a cache in a directory, creating it if needed.
+
+        Args:
+            directory (str/Path): Directory holding the cache files
+            max_bytes (int, optional): Size cap; least recently used entries are
+                evicted beyond it (None for no cap)
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, triangles_from, triangles_to, include_color=False, **params):
+        """
+        Compute the cache key for a transition.
+
+        Args:
+            triangles_from (list): Source triangle set
+            triangles_to (list): Target triangle set
+            include_color (bool): Hash the triangle colours as well, for costs
+                that depend on them
+            **params: Everything else that affects the pairings, e.g.
+                max_triangles, solver, solver_options and the cost function
+
+        Returns:
+            str: Hex digest identifying the transition
+        """
+        digest = hashlib.sha256()
+        digest.update(_coordinates_digest(triangles_from, include_color).encode())
+        digest.update(_coordinates_digest(triangles_to, include_color).encode())
+        digest.update(json.dumps(_describe(params), sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key):
+        """
+        Look up cached pairings.
+
+        Args:
+            key (str): Cache key from key()
+
+        Returns:
+            Transition/None: Cached pairings, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            records = np.fromfile(path, dtype=PAIRING_DTYPE)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+
+        # Mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return Transition(records["from"], records["to"], records["distance"])
+
+    def put(self, key, pairings):
+        """
+        Store pairings and evict old entries if the cache grows beyond its cap.
+
+        Args:
+            key (str): Cache key from key()
+            pairings (list/Transition): Pairings to store; fade and spawn
+                entries are dropped, they are cheap to add again
+        """
+        pairings = Transition.from_pairings(pairings).matched()
+        records = np.empty(len(pairings), dtype=PAIRING_DTYPE)
+        records["from"] = pairings.from_index
+        records["to"] = pairings.to_index
+        records["distance"] = pairings.distance
+
+        # Write atomically so a crash never leaves a truncated entry behind
+        path = self._path(key)
+        temp_path = path.with_suffix(".tmp")
+        records.tofile(temp_path)
+        os.replace(temp_path, path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits its size cap.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        if self.max_bytes is None:
+            return 0
+
+        entries = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        deleted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= size
+            deleted += 1
+
+        self.evictions += deleted
+        return deleted
+
+    def size(self):
+        """Total size of the cache entries in bytes."""
+        return sum(p.stat().st_size for p in self.directory.glob(f"*{CACHE_SUFFIX}"))
+
+    def stats(self):
+        """
+        Hit/miss statistics of this cache instance.
+
+        Returns:
+            dict: hits, misses, evictions, entries and bytes
+        """
+        entries = list(self.directory.glob(f"*{CACHE_SUFFIX}"))
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(p.stat().st_size for p in entries),
+        }